@@ -0,0 +1,376 @@
+"""Benchmark the integration against fleets of simulated chargers.
+
+Every scenario starts a fresh Home Assistant instance, sets up one config
+entry per simulated charger and lets the fleet stream rt frames through the
+in-process broker of ``viaris_sim``. The real sensor, number, switch and
+button platforms handle the traffic: the rt period is configured through
+the number and button entities, and during the measurement start/stop
+switches and current limits are operated on random chargers.
+
+For each fleet size the benchmark reports:
+
+* ``messages_per_s``: charger messages delivered to Home Assistant.
+* ``cpu_us_per_frame``: process CPU time per delivered message.
+* ``state_changed_per_s``: ``state_changed`` events fired.
+* ``loop_lag_p50_ms`` / ``loop_lag_p99_ms``: event loop scheduling delay.
+* ``rss_mb``: resident memory at the end of the measurement.
+* ``setup_s`` and ``subscriptions``: time to set up the fleet and number of
+  broker subscriptions held by Home Assistant.
+* ``repeat_hit_rate``: share of dispatched messages that repeated the
+  previous payload of their topic and skipped decoding.
+
+With ``--reloads N`` every config entry is then reloaded N times, and the
+benchmark also reports:
+
+* ``reload_p50_ms`` / ``reload_max_ms``: time to reload one entry.
+* ``listeners_before`` / ``listeners_after``: frame listeners of every
+  charger before and after the reloads, which must match.
+* ``subscriptions_after``: broker subscriptions after the reloads.
+* ``coordinators_alive``: coordinators left in memory after a garbage
+  collection, which must equal the number of chargers.
+* ``reload_rss_growth_mb``: resident memory growth over the reloads.
+
+Run with ``python benchmarks/bench_fleet.py [--chargers 1 50 200 1000]
+[--reloads 20] [--json results.json]``. Home Assistant and orjson must be installed; the
+MQTT integration is replaced by the in-process broker.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from contextlib import ExitStack
+import gc
+import inspect
+import json
+import os
+from pathlib import Path
+import platform
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from types import MappingProxyType
+from unittest.mock import patch
+
+from homeassistant import bootstrap, config_entries, loader
+from homeassistant.const import EVENT_STATE_CHANGED, __version__ as HA_VERSION
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from viaris_sim import FakeBroker, create_fleet
+
+INTEGRATION_PATH = Path(__file__).resolve().parents[1] / "custom_components" / "viaris"
+DOMAIN = "viaris"
+CONF_SERIAL_NUMBER = "serial_number"
+LAG_INTERVAL = 0.005
+SETTLE = 2
+
+
+def _rss_mb() -> float:
+    """Return the resident memory of the process in MiB."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file:
+            pages = int(file.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    """Return a percentile of the samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _config_entry(serial_number: str) -> config_entries.ConfigEntry:
+    """Return a config entry for a charger, whatever the core version."""
+    kwargs = {
+        "version": 1,
+        "minor_version": 1,
+        "domain": DOMAIN,
+        "title": f"Viaris {serial_number}",
+        "data": {CONF_SERIAL_NUMBER: serial_number},
+        "source": config_entries.SOURCE_USER,
+        "options": {},
+        "unique_id": serial_number,
+        "discovery_keys": MappingProxyType({}),
+        "subentries_data": None,
+    }
+    parameters = inspect.signature(config_entries.ConfigEntry).parameters
+    return config_entries.ConfigEntry(
+        **{key: value for key, value in kwargs.items() if key in parameters}
+    )
+
+
+class _MqttStandIn:
+    """Route the MQTT calls of the integration to the in-process broker."""
+
+    def __init__(self, broker: FakeBroker) -> None:
+        self.broker = broker
+        self.received = 0
+        self.subscriptions = 0
+
+    async def async_subscribe(
+        self, hass, topic, msg_callback, qos=0, encoding="utf-8"
+    ):
+        self.subscriptions += 1
+
+        def received(message) -> None:
+            self.received += 1
+            msg_callback(message)
+
+        unsubscribe = self.broker.subscribe(topic, received)
+
+        def remove() -> None:
+            self.subscriptions -= 1
+            unsubscribe()
+
+        return remove
+
+    async def async_publish(
+        self, hass, topic, payload, qos=0, retain=False, encoding="utf-8"
+    ) -> None:
+        self.broker.publish(topic, payload, qos, retain)
+
+
+async def _async_start_hass(config_dir: str) -> HomeAssistant:
+    """Start a bare Home Assistant instance able to load the integration."""
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    # Loading the base functionality also initializes the config entries.
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await bootstrap.async_load_base_functionality(hass)
+    hass.config.components.add("mqtt")
+    await hass.async_start()
+    return hass
+
+
+async def _async_lag_sampler(samples: list[float]) -> None:
+    """Record how late the event loop wakes up a sleeping task."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(loop.time() - start - LAG_INTERVAL)
+
+
+async def _async_operate(hass: HomeAssistant, serials: list[str], rng) -> None:
+    """Operate switches, numbers and buttons of random chargers."""
+    while True:
+        await asyncio.sleep(1)
+        serial = rng.choice(serials).lower()
+        calls = (
+            ("switch", "turn_on", {"entity_id": f"switch.{serial}_start_stop_conn1"}),
+            ("switch", "turn_off", {"entity_id": f"switch.{serial}_start_stop_conn1"}),
+            (
+                "number",
+                "set_value",
+                {
+                    "entity_id": f"number.{serial}_curr_lim_conn1",
+                    "value": rng.randint(6, 32),
+                },
+            ),
+            ("button", "press", {"entity_id": f"button.{serial}_send_cfg_rt"}),
+        )
+        hass.async_create_task(_async_call(hass, *rng.choice(calls)))
+
+
+async def _async_call(hass: HomeAssistant, domain: str, service: str, data) -> None:
+    """Call a service, ignoring chargers that do not answer."""
+    try:
+        await hass.services.async_call(domain, service, data, blocking=True)
+    except HomeAssistantError as err:
+        print(f"{domain}.{service}: {err}", file=sys.stderr)
+
+
+def _listener_count(hass: HomeAssistant) -> int:
+    """Return the frame listeners of every charger."""
+    return sum(
+        entry.runtime_data.dispatcher.listener_count()
+        for entry in hass.config_entries.async_entries(DOMAIN)
+    )
+
+
+async def _async_reload(hass: HomeAssistant, reloads: int) -> dict[str, float]:
+    """Reload every entry repeatedly and check nothing piles up."""
+    await hass.async_block_till_done()
+    listeners_before = _listener_count(hass)
+    gc.collect()
+    rss = _rss_mb()
+    durations = []
+    for _ in range(reloads):
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            start = time.perf_counter()
+            await hass.config_entries.async_reload(entry.entry_id)
+            durations.append(time.perf_counter() - start)
+    # Let the rt stream requests made by the reloads be answered.
+    await asyncio.sleep(SETTLE)
+    await hass.async_block_till_done()
+    gc.collect()
+    return {
+        "reloads": reloads,
+        "reload_p50_ms": round(_percentile(durations, 0.5) * 1000, 1),
+        "reload_max_ms": round(max(durations) * 1000, 1),
+        "listeners_before": listeners_before,
+        "listeners_after": _listener_count(hass),
+        "coordinators_alive": sum(
+            type(obj).__name__ == "ViarisCoordinator" and obj.hass is hass
+            for obj in gc.get_objects()
+        ),
+        "reload_rss_growth_mb": round(_rss_mb() - rss, 1),
+    }
+
+
+async def async_run_scenario(
+    chargers: int,
+    period: int,
+    warmup: float,
+    duration: float,
+    seed: int,
+    reloads: int = 0,
+) -> dict[str, float]:
+    """Run one fleet size and return its metrics."""
+    broker = FakeBroker()
+    mqtt = _MqttStandIn(broker)
+    fleet = create_fleet(broker, chargers, seed=seed)
+    serials = [charger.serial_number for charger in fleet]
+    with tempfile.TemporaryDirectory() as config_dir, ExitStack() as stack:
+        custom_components = Path(config_dir, "custom_components")
+        custom_components.mkdir()
+        (custom_components / DOMAIN).symlink_to(INTEGRATION_PATH)
+        # The package imported by a previous scenario points to its config dir.
+        for name in list(sys.modules):
+            if name.partition(".")[0] == "custom_components":
+                del sys.modules[name]
+        stack.enter_context(
+            patch("homeassistant.components.mqtt.async_subscribe", mqtt.async_subscribe)
+        )
+        stack.enter_context(
+            patch("homeassistant.components.mqtt.async_publish", mqtt.async_publish)
+        )
+        hass = await _async_start_hass(config_dir)
+        for charger in fleet:
+            charger.start()
+
+        setup_start = time.perf_counter()
+        for serial in serials:
+            await hass.config_entries.async_add(_config_entry(serial))
+        await hass.async_block_till_done()
+        setup_s = time.perf_counter() - setup_start
+
+        for serial in serials:
+            await hass.services.async_call(
+                "number",
+                "set_value",
+                {"entity_id": f"number.{serial.lower()}_period_rt", "value": period},
+                blocking=True,
+            )
+            await hass.services.async_call(
+                "button",
+                "press",
+                {"entity_id": f"button.{serial.lower()}_send_cfg_rt"},
+                blocking=True,
+            )
+
+        state_changes = 0
+
+        @callback
+        def count_state_change(event) -> None:
+            nonlocal state_changes
+            state_changes += 1
+
+        hass.bus.async_listen(EVENT_STATE_CHANGED, count_state_change)
+        operator = hass.async_create_background_task(
+            _async_operate(hass, serials, random.Random(seed)), "viaris operator"
+        )
+        await asyncio.sleep(warmup)
+
+        lag: list[float] = []
+        sampler = asyncio.get_running_loop().create_task(_async_lag_sampler(lag))
+        received = mqtt.received
+        state_changes = 0
+        cpu_start = time.process_time()
+        await asyncio.sleep(duration)
+        cpu = time.process_time() - cpu_start
+        received = mqtt.received - received
+        changes = state_changes
+        rss = _rss_mb()
+        subscriptions = mqtt.subscriptions
+        dispatchers = [
+            entry.runtime_data.dispatcher
+            for entry in hass.config_entries.async_entries(DOMAIN)
+        ]
+        dispatched = sum(dispatcher.messages for dispatcher in dispatchers)
+        repeated = sum(dispatcher.repeated for dispatcher in dispatchers)
+        sampler.cancel()
+        operator.cancel()
+        reload = {}
+        if reloads:
+            reload = await _async_reload(hass, reloads)
+            reload["subscriptions_after"] = mqtt.subscriptions
+
+        for charger in fleet:
+            charger.stop()
+        await hass.async_stop(force=True)
+
+    return {
+        "chargers": chargers,
+        "setup_s": round(setup_s, 3),
+        "subscriptions": subscriptions,
+        "messages_per_s": round(received / duration, 1),
+        "cpu_us_per_frame": round(cpu / received * 1e6, 1) if received else None,
+        "state_changed_per_s": round(changes / duration, 1),
+        "loop_lag_p50_ms": round(_percentile(lag, 0.5) * 1000, 3),
+        "loop_lag_p99_ms": round(_percentile(lag, 0.99) * 1000, 3),
+        "loop_lag_mean_ms": round(statistics.fmean(lag) * 1000, 3) if lag else 0,
+        "rss_mb": round(rss, 1),
+        "repeat_hit_rate": round(repeated / dispatched, 3) if dispatched else 0,
+        **reload,
+    }
+
+
+async def async_run(args: argparse.Namespace) -> dict:
+    """Run every scenario."""
+    scenarios = []
+    for chargers in args.chargers:
+        result = await async_run_scenario(
+            chargers, args.period, args.warmup, args.duration, args.seed, args.reloads
+        )
+        scenarios.append(result)
+        print(json.dumps(result), file=sys.stderr)
+    return {
+        "homeassistant": HA_VERSION,
+        "python": platform.python_version(),
+        "period_s": args.period,
+        "duration_s": args.duration,
+        "scenarios": scenarios,
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print or save the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chargers", type=int, nargs="+", default=[1, 50, 200, 1000])
+    parser.add_argument("--period", type=int, default=1, help="rt period in seconds")
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--reloads", type=int, default=0, help="reloads of every entry at the end"
+    )
+    parser.add_argument("--json", metavar="FILE", help="write the results to FILE")
+    args = parser.parse_args()
+    results = asyncio.run(async_run(args))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
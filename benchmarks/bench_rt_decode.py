@@ -0,0 +1,284 @@
+"""Benchmark the decoding of viaris rt frames.
+
+Compares three ways of turning a ``streamrt/modulator`` payload into the
+values of the rt sensors:
+
+* ``per_entity``: the payload is decoded to ``str`` and every sensor parses
+  and walks the frame on its own (the original behaviour).
+* ``str_plan``: the payload is decoded to ``str``, parsed once and run
+  through a compiled extraction plan.
+* ``bytes_plan``: the raw bytes are parsed once with orjson and run through
+  the same plan (the current behaviour).
+
+Run with ``python benchmarks/bench_rt_decode.py [--json]``. With
+``--capture FILE`` the rt frames of a traffic capture recorded with the
+``viaris.start_capture`` service are decoded as well. Only orjson is
+required; Home Assistant does not need to be installed.
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+from pathlib import Path
+import sys
+import timeit
+
+import orjson
+
+INTEGRATION_PATH = Path(__file__).resolve().parents[1] / "custom_components" / "viaris"
+EXTRACT_PATH = INTEGRATION_PATH / "extract.py"
+CAPTURE_PATH = INTEGRATION_PATH / "capture.py"
+RT_SUFFIX = "/streamrt/modulator"
+
+UNI_FRAME = {
+    "idTrans": 0,
+    "header": {"timestamp": 1700000000000, "heapFree": 84512},
+    "data": {
+        "evsePower": 7360,
+        "homePower": 2150,
+        "totalPower": 9510,
+        "relOverload": 0.43,
+        "totalCurrent": [41300, 0, 0],
+        "ctxDetected": True,
+        "mbusDetected": False,
+        "maxPower": 9200,
+        "instPower": 9510,
+        "elements": [
+            {
+                "connectorName": "mennekes",
+                "state": 5,
+                "now": {
+                    "aPow": [7360, 0, 0],
+                    "rPow": [120, 0, 0],
+                    "active": 1234567,
+                    "reactive": 23456,
+                },
+            },
+            {
+                "connectorName": "schuko",
+                "state": 0,
+                "now": {
+                    "aPow": [0, 0, 0],
+                    "rPow": [0, 0, 0],
+                    "active": 56789,
+                    "reactive": 123,
+                },
+            },
+        ],
+    },
+}
+
+COMBIPLUS_FRAME = {
+    "idTrans": 0,
+    "header": {"timestamp": 1700000000000, "heapFree": 79120},
+    "data": {
+        "evsePower": 22080,
+        "homePower": 3400,
+        "totalPower": 25480,
+        "relOverload": 0.81,
+        "totalCurrent": [36900, 36800, 37100],
+        "ctxDetected": True,
+        "mbusDetected": True,
+        "fvPower": 4200,
+        "maxPower": 27700,
+        "instPower": 21280,
+        "elements": [
+            {
+                "connectorName": "mennekes1",
+                "state": 5,
+                "now": {
+                    "aPow": [7360, 7340, 7380],
+                    "rPow": [110, 105, 98],
+                    "active": 9876543,
+                    "reactive": 87654,
+                },
+            },
+            {
+                "connectorName": "mennekes2",
+                "state": 3,
+                "now": {
+                    "aPow": [0, 0, 0],
+                    "rPow": [0, 0, 0],
+                    "active": 4567890,
+                    "reactive": 34567,
+                },
+            },
+        ],
+    },
+}
+
+MENNEKES = {
+    0: "Standby",
+    3: "Connected",
+    5: "Charging",
+}
+
+
+def _status(elements, index):
+    if len(elements) <= index:
+        return "Disabled"
+    return MENNEKES.get(elements[index]["state"], "Unknown")
+
+
+def _phases(values):
+    return "[{:.2f}, {:.2f}, {:.2f}]".format(*values)
+
+
+def _sum(values):
+    return round(sum(values), 2)
+
+
+def _legacy_getters():
+    """Return the original per-sensor extractors, one decode each."""
+
+    def element(data, index, name):
+        return data["data"]["elements"][index]["now"][name]
+
+    return [
+        lambda d: _status(d["data"]["elements"], 0),
+        lambda d: _status(d["data"]["elements"], 1),
+        lambda d: round(float(element(d, 0, "active") / 1000), 2),
+        lambda d: round(float(element(d, 1, "active") / 1000), 2),
+        lambda d: round(float(element(d, 0, "reactive") / 1000), 2),
+        lambda d: round(float(element(d, 1, "reactive") / 1000), 2),
+        lambda d: round(float(d["data"]["evsePower"]) / 1000, 2),
+        lambda d: _phases([x / 1000 for x in d["data"]["totalCurrent"]]),
+        lambda d: round(float(d["data"]["homePower"]) / 1000, 2),
+        lambda d: round(float(d["data"]["totalPower"]) / 1000, 2),
+        lambda d: round(float(d["data"].get("fvPower", 0) / 1000), 2),
+        lambda d: d["data"]["mbusDetected"] is True,
+        lambda d: d["data"]["ctxDetected"] is True,
+        lambda d: round(float(d["data"]["relOverload"]), 2),
+        lambda d: _phases([x / 1000 for x in element(d, 0, "aPow")]),
+        lambda d: _phases([x / 1000 for x in element(d, 1, "aPow")]),
+        lambda d: _phases([x / 1000 for x in element(d, 1, "rPow")]),
+        lambda d: _phases([x / 1000 for x in element(d, 0, "rPow")]),
+        lambda d: round(float(d["data"]["maxPower"] / 1000), 2),
+        lambda d: round(float(d["data"]["instPower"] / 1000), 2),
+    ]
+
+
+def _load(name: str, path: Path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _load_extract():
+    return _load("viaris_extract", EXTRACT_PATH)
+
+
+def _captured_frames(path: Path) -> list[bytes]:
+    """Return the rt payloads of a traffic capture."""
+    capture = _load("viaris_capture", CAPTURE_PATH)
+    return [
+        message.payload
+        for message in capture.read_capture(path)
+        if message.topic.endswith(RT_SUFFIX)
+    ]
+
+
+def _rt_plan(extract):
+    """Return a plan equivalent to the rt sensor table."""
+    field = extract.FieldSpec
+    kw = {"scale": 0.001, "ndigits": 2}
+
+    def phases(key, path, connector=None):
+        total = field(path, connector=connector, scale=0.001, convert=_sum)
+        return [(key, total)] + [
+            (f"{key}_l{phase + 1}", field((*path, phase), connector=connector, **kw))
+            for phase in range(3)
+        ]
+
+    return extract.ExtractionPlan(
+        [
+            ("status_conn1", field(("elements",), convert=lambda e: _status(e, 0))),
+            ("status_conn2", field(("elements",), convert=lambda e: _status(e, 1))),
+            ("active_energy_conn1", field(("now", "active"), connector=0, **kw)),
+            ("active_energy_conn2", field(("now", "active"), connector=1, **kw)),
+            ("reactive_energy_conn1", field(("now", "reactive"), connector=0, **kw)),
+            ("reactive_energy_conn2", field(("now", "reactive"), connector=1, **kw)),
+            ("evse_power", field(("evsePower",), **kw)),
+            *phases("total_current", ("totalCurrent",)),
+            ("home_power", field(("homePower",), **kw)),
+            ("total_power", field(("totalPower",), **kw)),
+            ("solar_power_plus_bat", field(("fvPower",), **kw)),
+            ("secondary_meter", field(("mbusDetected",), convert=bool)),
+            ("main_meter", field(("ctxDetected",), convert=bool)),
+            ("overload_rel", field(("relOverload",), ndigits=2)),
+            *phases("active_power_conn1", ("now", "aPow"), 0),
+            *phases("active_power_conn2", ("now", "aPow"), 1),
+            *phases("reactive_power_conn2", ("now", "rPow"), 1),
+            *phases("reactive_power_conn1", ("now", "rPow"), 0),
+            ("current_max_power", field(("maxPower",), **kw)),
+            ("grid_power", field(("instPower",), **kw)),
+        ]
+    )
+
+
+def run(number: int, capture: Path | None = None) -> dict[str, dict[str, float]]:
+    """Return the time per frame, in microseconds, of every path."""
+    plan = _rt_plan(_load_extract())
+    getters = _legacy_getters()
+    samples = {
+        "uni": [json.dumps(UNI_FRAME).encode()],
+        "combiplus": [json.dumps(COMBIPLUS_FRAME).encode()],
+    }
+    if capture is not None:
+        samples["capture"] = _captured_frames(capture)
+    results = {}
+    for name, payloads in samples.items():
+        if not payloads:
+            continue
+
+        def per_entity(payloads=payloads):
+            for payload in payloads:
+                text = payload.decode()
+                [getter(orjson.loads(text)) for getter in getters]
+
+        def str_plan(payloads=payloads):
+            for payload in payloads:
+                plan.extract(orjson.loads(payload.decode()))
+
+        def bytes_plan(payloads=payloads):
+            for payload in payloads:
+                plan.extract(orjson.loads(payload))
+
+        loops = max(1, number // len(payloads))
+        results[name] = {
+            "payload_bytes": sum(map(len, payloads)) // len(payloads),
+            **{
+                func.__name__: min(timeit.repeat(func, number=loops, repeat=5))
+                / (loops * len(payloads))
+                * 1e6
+                for func in (per_entity, str_plan, bytes_plan)
+            },
+        }
+    return results
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--json", action="store_true", help="print JSON results")
+    parser.add_argument("--capture", type=Path, help="also decode a traffic capture")
+    args = parser.parse_args()
+    results = run(args.number, args.capture)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'frame':<10} {'bytes':>6} {'per_entity':>11} {'str_plan':>9} {'bytes_plan':>11}")
+    for name, result in results.items():
+        print(
+            f"{name:<10} {result['payload_bytes']:>6} "
+            f"{result['per_entity']:>9.1f}us {result['str_plan']:>7.1f}us "
+            f"{result['bytes_plan']:>9.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
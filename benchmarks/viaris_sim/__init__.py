@@ -0,0 +1,26 @@
+"""Simulator of viaris chargers for offline load tests.
+
+Simulated UNI and COMBIPLUS chargers speak the MQTT topic protocol of the
+integration, either through the in-process ``FakeBroker`` or through a
+local broker with ``MqttBroker`` (requires paho-mqtt).
+"""
+from .broker import FakeBroker, Message, MqttBroker, topic_matches
+from .charger import (
+    ChargerProfile,
+    Connector,
+    SimulatedCharger,
+    create_fleet,
+    serial_number,
+)
+
+__all__ = [
+    "ChargerProfile",
+    "Connector",
+    "FakeBroker",
+    "Message",
+    "MqttBroker",
+    "SimulatedCharger",
+    "create_fleet",
+    "serial_number",
+    "topic_matches",
+]
@@ -0,0 +1,82 @@
+"""Run a fleet of simulated viaris chargers.
+
+With ``--host`` the chargers connect to a local MQTT broker and serve a
+Home Assistant instance until interrupted. Without it they run on the
+in-process broker for ``--duration`` seconds, streaming at ``--period``,
+and the traffic is summarized as JSON.
+
+Run from the ``benchmarks`` directory with ``python -m viaris_sim``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+
+import orjson
+
+from .broker import FakeBroker, MqttBroker
+from .charger import TOPIC_PREFIX, create_fleet
+
+
+async def run(args: argparse.Namespace) -> dict[str, float] | None:
+    """Run the fleet and return the traffic summary."""
+    broker = MqttBroker(args.host, args.port) if args.host else FakeBroker()
+    chargers = create_fleet(
+        broker, args.chargers, combiplus_ratio=args.combiplus_ratio, seed=args.seed
+    )
+    for charger in chargers:
+        charger.start()
+    if args.host:
+        try:
+            await asyncio.Event().wait()
+        finally:
+            broker.close()
+        return None
+
+    received = 0
+
+    def count(message) -> None:
+        nonlocal received
+        received += 1
+
+    broker.subscribe(f"{TOPIC_PREFIX}+/stat/0/+/#", count)
+    request = orjson.dumps(
+        {"idTrans": 0, "data": {"status": True, "period": args.period, "timeout": -1}}
+    )
+    for charger in chargers:
+        broker.publish(charger.topic("set", "rt/modulator"), request)
+    await asyncio.sleep(args.duration)
+    for charger in chargers:
+        charger.stop()
+    return {
+        "chargers": args.chargers,
+        "duration_s": args.duration,
+        "frames_sent": sum(charger.frames_sent for charger in chargers),
+        "messages_received": received,
+        "messages_per_s": received / args.duration,
+        "bytes_published": broker.published_bytes,
+    }
+
+
+def main() -> None:
+    """Parse the arguments and run the fleet."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chargers", type=int, default=10)
+    parser.add_argument("--combiplus-ratio", type=float, default=0.5)
+    parser.add_argument("--period", type=float, default=1.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", help="local MQTT broker to connect to")
+    parser.add_argument("--port", type=int, default=1883)
+    args = parser.parse_args()
+    try:
+        summary = asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return
+    if summary is not None:
+        print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Broker stand-ins for the viaris charger simulator."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import time
+
+MessageCallback = Callable[["Message"], None]
+
+
+@dataclass(frozen=True)
+class Message:
+    """An MQTT message, shaped like the messages Home Assistant delivers."""
+
+    topic: str
+    payload: bytes
+    qos: int = 0
+    retain: bool = False
+    timestamp: float = field(default_factory=time.monotonic)
+
+
+def topic_matches(pattern: str, topic: str) -> bool:
+    """Return True when a topic matches an MQTT subscription pattern."""
+    pattern_levels = pattern.split("/")
+    topic_levels = topic.split("/")
+    for index, level in enumerate(pattern_levels):
+        if level == "#":
+            return True
+        if index >= len(topic_levels):
+            return False
+        if level not in ("+", topic_levels[index]):
+            return False
+    return len(pattern_levels) == len(topic_levels)
+
+
+class FakeBroker:
+    """In-process broker delivering messages on the running event loop.
+
+    Exact topics are looked up in a dict and wildcard patterns are matched
+    one by one, so chargers subscribe to exact topics and the integration to
+    a single wildcard. Messages are delivered with ``call_soon``, never from
+    inside ``publish``, like a network broker would.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the broker."""
+        self._exact: dict[str, list[MessageCallback]] = {}
+        self._wildcards: list[tuple[str, MessageCallback]] = []
+        self.published = 0
+        self.delivered = 0
+        self.published_bytes = 0
+
+    def subscribe(self, pattern: str, callback: MessageCallback) -> Callable[[], None]:
+        """Subscribe to a topic or pattern and return an unsubscribe callable."""
+        if "+" in pattern or "#" in pattern:
+            entry = (pattern, callback)
+            self._wildcards.append(entry)
+
+            def unsubscribe() -> None:
+                if entry in self._wildcards:
+                    self._wildcards.remove(entry)
+
+            return unsubscribe
+
+        callbacks = self._exact.setdefault(pattern, [])
+        callbacks.append(callback)
+
+        def unsubscribe_exact() -> None:
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks and self._exact.get(pattern) is callbacks:
+                del self._exact[pattern]
+
+        return unsubscribe_exact
+
+    @property
+    def subscription_count(self) -> int:
+        """Return the number of active subscriptions."""
+        return len(self._wildcards) + sum(map(len, self._exact.values()))
+
+    def publish(
+        self, topic: str, payload: bytes | str, qos: int = 0, retain: bool = False
+    ) -> None:
+        """Publish a message to every matching subscriber."""
+        if isinstance(payload, str):
+            payload = payload.encode()
+        self.published += 1
+        self.published_bytes += len(payload)
+        message = Message(topic, payload, qos, retain)
+        callbacks = list(self._exact.get(topic, ()))
+        callbacks.extend(
+            callback
+            for pattern, callback in self._wildcards
+            if topic_matches(pattern, topic)
+        )
+        if not callbacks:
+            return
+        loop = asyncio.get_running_loop()
+        for callback in callbacks:
+            self.delivered += 1
+            loop.call_soon(callback, message)
+
+
+class MqttBroker:
+    """Connection to a local MQTT broker with the FakeBroker interface.
+
+    Requires paho-mqtt. Messages are handed over to the event loop the
+    broker was created on.
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 1883) -> None:
+        """Connect to the broker."""
+        try:
+            import paho.mqtt.client as paho  # pylint: disable=import-outside-toplevel
+        except ImportError as err:
+            raise RuntimeError("paho-mqtt is required to use a local broker") from err
+
+        self._loop = asyncio.get_running_loop()
+        self._callbacks: list[tuple[str, MessageCallback]] = []
+        self._client = paho.Client()
+        self._client.on_message = self._on_message
+        self._client.connect(host, port)
+        self._client.loop_start()
+        self.published = 0
+        self.delivered = 0
+        self.published_bytes = 0
+
+    def _on_message(self, client, userdata, msg) -> None:
+        """Hand a message received by the network thread to the loop."""
+        message = Message(msg.topic, msg.payload, msg.qos, msg.retain)
+        for pattern, callback in list(self._callbacks):
+            if topic_matches(pattern, msg.topic):
+                self.delivered += 1
+                self._loop.call_soon_threadsafe(callback, message)
+
+    def subscribe(self, pattern: str, callback: MessageCallback) -> Callable[[], None]:
+        """Subscribe to a topic or pattern and return an unsubscribe callable."""
+        entry = (pattern, callback)
+        self._callbacks.append(entry)
+        self._client.subscribe(pattern)
+
+        def unsubscribe() -> None:
+            if entry in self._callbacks:
+                self._callbacks.remove(entry)
+            if all(pattern != other for other, _ in self._callbacks):
+                self._client.unsubscribe(pattern)
+
+        return unsubscribe
+
+    @property
+    def subscription_count(self) -> int:
+        """Return the number of active subscriptions."""
+        return len(self._callbacks)
+
+    def publish(
+        self, topic: str, payload: bytes | str, qos: int = 0, retain: bool = False
+    ) -> None:
+        """Publish a message."""
+        if isinstance(payload, str):
+            payload = payload.encode()
+        self.published += 1
+        self.published_bytes += len(payload)
+        self._client.publish(topic, payload, qos, retain)
+
+    def close(self) -> None:
+        """Disconnect from the broker."""
+        self._client.loop_stop()
+        self._client.disconnect()
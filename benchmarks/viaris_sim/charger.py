@@ -0,0 +1,393 @@
+"""Simulated viaris chargers."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+import math
+import random
+import time
+from typing import Any
+
+import orjson
+
+from .broker import FakeBroker, Message
+
+TOPIC_PREFIX = "XEO/VIARIS/"
+SERIAL_PREFIX_UNI = "EVVC3"
+SERIAL_PREFIX_COMBI = "EVVC4"
+VOLTAGE = 230
+
+# Mennekes connector states.
+STANDBY = 0
+CONNECTED = 3
+CHARGING = 5
+FINISHED = 8
+# Schuko connector states.
+SCHUKO_STANDBY = 0
+SCHUKO_ON_LOAD = 14
+SCHUKO_ON_NOT_LOAD = 30
+
+
+@dataclass
+class ChargerProfile:
+    """Mean time, in seconds, a connector stays in each state."""
+
+    standby: float = 900.0
+    connected: float = 60.0
+    charging: float = 3600.0
+    finished: float = 600.0
+    phases: int = 3
+    max_current: float = 32.0
+    home_power: float = 1500.0
+
+
+def serial_number(index: int, combiplus: bool = False) -> str:
+    """Return the serial number of the simulated charger ``index``."""
+    prefix = SERIAL_PREFIX_COMBI if combiplus else SERIAL_PREFIX_UNI
+    return f"{prefix}SIM{index:05d}"
+
+
+class Connector:
+    """State machine of one connector."""
+
+    def __init__(self, name: str, profile: ChargerProfile, rng: random.Random) -> None:
+        """Initialize the connector."""
+        self.name = name
+        self.schuko = name.startswith("schuko")
+        self.profile = profile
+        self.rng = rng
+        self.state = SCHUKO_STANDBY if self.schuko else STANDBY
+        self.current_limit = profile.max_current
+        self.active = rng.randint(0, 5_000_000)
+        self.reactive = rng.randint(0, 50_000)
+        self.user = ""
+        self.power: list[float] = [0.0, 0.0, 0.0]
+
+    def _leave(self, mean: float, dt: float) -> bool:
+        """Return True when the current state ends within ``dt`` seconds."""
+        return self.rng.random() < 1 - math.exp(-dt / mean)
+
+    def step(self, dt: float) -> None:
+        """Advance the state machine and the energy counters by ``dt`` seconds."""
+        profile = self.profile
+        if self.schuko:
+            if self.state == SCHUKO_STANDBY and self._leave(profile.standby, dt):
+                self.state = SCHUKO_ON_LOAD
+            elif self.state == SCHUKO_ON_LOAD and self._leave(profile.charging, dt):
+                self.state = SCHUKO_STANDBY
+        elif self.state == STANDBY and self._leave(profile.standby, dt):
+            self.state = CONNECTED
+            self.user = f"user{self.rng.randint(1, 50)}"
+        elif self.state == CONNECTED and self._leave(profile.connected, dt):
+            self.state = CHARGING
+        elif self.state == CHARGING and self._leave(profile.charging, dt):
+            self.state = FINISHED
+        elif self.state == FINISHED and self._leave(profile.finished, dt):
+            self.state = STANDBY
+            self.user = ""
+        if self.state in (CHARGING, SCHUKO_ON_LOAD):
+            if self.schuko:
+                self.power = [2300.0 * self.rng.uniform(0.9, 1.0), 0.0, 0.0]
+            else:
+                phase = VOLTAGE * self.current_limit * self.rng.uniform(0.95, 1.0)
+                self.power = [
+                    phase if index < profile.phases else 0.0 for index in range(3)
+                ]
+        else:
+            self.power = [0.0, 0.0, 0.0]
+        self.active += round(sum(self.power) * dt / 3600)
+        self.reactive += round(sum(self.power) * 0.02 * dt / 3600)
+
+    def start(self) -> None:
+        """Start charging on request."""
+        if not self.schuko and self.state == CONNECTED:
+            self.state = CHARGING
+
+    def stop(self) -> None:
+        """Stop charging on request."""
+        if not self.schuko and self.state == CHARGING:
+            self.state = FINISHED
+
+    def element(self) -> dict[str, Any]:
+        """Return the rt frame element of the connector."""
+        return {
+            "connectorName": self.name,
+            "state": self.state,
+            "now": {
+                "aPow": [round(power) for power in self.power],
+                "rPow": [round(power * 0.02) for power in self.power],
+                "active": self.active,
+                "reactive": self.reactive,
+            },
+        }
+
+
+class SimulatedCharger:
+    """A UNI or COMBIPLUS charger speaking the viaris MQTT protocol.
+
+    The charger answers ``boot/sys``, ``evsm``, ``cfg/mqtt_user``,
+    ``rt/modulator``, start/stop and current limit requests, and streams rt
+    frames at the requested period until its lease times out.
+    """
+
+    def __init__(
+        self,
+        broker: FakeBroker,
+        serial: str,
+        *,
+        schuko: bool = False,
+        solar: bool = False,
+        profile: ChargerProfile | None = None,
+        seed: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the charger."""
+        self.broker = broker
+        self.serial_number = serial
+        self.combiplus = serial.startswith(SERIAL_PREFIX_COMBI)
+        self.schuko = schuko and not self.combiplus
+        self.solar = solar
+        self.profile = profile or ChargerProfile()
+        self.rng = random.Random(seed if seed is not None else serial)
+        self.clock = clock
+        names = ["mennekes1", "mennekes2"] if self.combiplus else ["mennekes"]
+        if self.schuko:
+            names.append("schuko")
+        self.connectors = [Connector(name, self.profile, self.rng) for name in names]
+        self.period = 0.0
+        self.lease_expiry: float | None = None
+        self.frames_sent = 0
+        self.requests_received = 0
+        self._base = f"{TOPIC_PREFIX}0{serial[-5:]}"
+        self._last_step = clock()
+        self._unsubscribe: list[Callable[[], None]] = []
+        self._stream_task: asyncio.Task | None = None
+
+    def topic(self, direction: str, suffix: str) -> str:
+        """Return a topic of the charger."""
+        return f"{self._base}/{direction}/0/{self.serial_number}/{suffix}"
+
+    def start(self) -> None:
+        """Subscribe to the request topics and announce the boot."""
+        handlers: dict[str, Callable[[str, dict[str, Any]], None]] = {
+            self.topic("get", "boot/sys"): self._boot_sys,
+            self.topic("get", "cfg/mqtt_user"): self._mqtt_user,
+            self.topic("set", "rt/modulator"): self._rt_modulator,
+        }
+        for connector in self.connectors:
+            if connector.schuko:
+                continue
+            name = connector.name
+            handlers[self.topic("get", f"value/evsm/{name}")] = self._evsm
+            handlers[self.topic("set", f"request/reqman/{name}")] = self._reqman
+            handlers[self.topic("set", f"value/{name}")] = self._current_limit
+        for topic, handler in handlers.items():
+            self._unsubscribe.append(
+                self.broker.subscribe(topic, self._dispatch(handler))
+            )
+        self._reply("init_boot/sys", 0, self._boot_data())
+
+    def stop(self) -> None:
+        """Stop streaming and drop every subscription."""
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe.clear()
+        if self._stream_task is not None:
+            self._stream_task.cancel()
+            self._stream_task = None
+
+    def _dispatch(
+        self, handler: Callable[[str, dict[str, Any]], None]
+    ) -> Callable[[Message], None]:
+        """Return a subscriber decoding requests for ``handler``."""
+
+        def received(message: Message) -> None:
+            self.requests_received += 1
+            try:
+                request = orjson.loads(message.payload)
+            except orjson.JSONDecodeError:
+                return
+            handler(message.topic, request)
+
+        return received
+
+    def _reply(self, suffix: str, id_trans: int, data: dict[str, Any]) -> None:
+        """Publish a stat frame."""
+        frame = {
+            "idTrans": id_trans,
+            "header": {
+                "timestamp": int(time.time() * 1000),
+                "heapFree": self.rng.randint(60000, 90000),
+            },
+            "data": data,
+        }
+        self.broker.publish(self.topic("stat", suffix), orjson.dumps(frame))
+
+    def _suffix(self, topic: str) -> str:
+        """Return the part of a topic after the serial number."""
+        return topic.split(f"/{self.serial_number}/", 1)[1]
+
+    def _connector(self, topic: str) -> Connector:
+        """Return the connector a topic refers to."""
+        name = topic.rsplit("/", 1)[1]
+        return next(c for c in self.connectors if c.name == name)
+
+    def _boot_data(self) -> dict[str, Any]:
+        """Return the data of a boot/sys frame."""
+        return {
+            "fwv": "3.2.1",
+            "hwv": "2.0",
+            "fwv_pot": "1.4.0",
+            "hwv_pot": "1.1",
+            "fwv_cortex": "1.0.7",
+            "serial": self.serial_number,
+            "model": "VIARIS COMBIPLUS" if self.combiplus else "VIARIS UNI",
+            "mac": "02:00:00:{:02X}:{:02X}:{:02X}".format(
+                *self.serial_number[-3:].encode()
+            ),
+            "schuko": self.schuko,
+            "rfid": True,
+            "ethernet": True,
+            "spl": False,
+            "ocpp": False,
+            "modbus": False,
+            "solar": self.solar,
+            "maxPower": round(VOLTAGE * self.profile.max_current * 3),
+            "limitPower": round(VOLTAGE * self.profile.max_current * 3),
+            "selectorPower": round(VOLTAGE * self.profile.max_current * 3),
+        }
+
+    def _boot_sys(self, topic: str, request: dict[str, Any]) -> None:
+        self._reply(self._suffix(topic), request.get("idTrans", 0), self._boot_data())
+
+    def _mqtt_user(self, topic: str, request: dict[str, Any]) -> None:
+        self._reply(
+            self._suffix(topic),
+            request.get("idTrans", 0),
+            {
+                "cfg": {
+                    "mqttUrl": "mqtt://localhost",
+                    "mqttPort": 1883,
+                    "mqttUser": "viaris",
+                    "mqttClientId": self.serial_number,
+                    "qos": 0,
+                    "keepAlive": 60,
+                    "pingInterval": 30,
+                }
+            },
+        )
+
+    def _evsm(self, topic: str, request: dict[str, Any]) -> None:
+        connector = self._connector(topic)
+        self._reply(
+            self._suffix(topic),
+            request.get("idTrans", 0),
+            {
+                "name": connector.name,
+                "stat": {"state": connector.state, "user": connector.user},
+            },
+        )
+
+    def _reqman(self, topic: str, request: dict[str, Any]) -> None:
+        connector = self._connector(topic)
+        if request.get("data", {}).get("action"):
+            connector.start()
+        else:
+            connector.stop()
+        self._reply(self._suffix(topic), request.get("idTrans", 0), {"status": True})
+
+    def _current_limit(self, topic: str, request: dict[str, Any]) -> None:
+        connector = self._connector(topic)
+        ampacity = request.get("data", {}).get("stat", {}).get("ampacitySmCh")
+        if ampacity is not None:
+            connector.current_limit = min(ampacity / 1000, self.profile.max_current)
+        self._reply(self._suffix(topic), request.get("idTrans", 0), {"status": True})
+
+    def _rt_modulator(self, topic: str, request: dict[str, Any]) -> None:
+        data = request.get("data", {})
+        if not data.get("status", True):
+            self.period = 0.0
+        else:
+            self.period = max(float(data.get("period", 1)), 0.1)
+            timeout = data.get("timeout", -1)
+            self.lease_expiry = self.clock() + timeout if timeout > 0 else None
+            if self._stream_task is None:
+                self._stream_task = asyncio.get_running_loop().create_task(
+                    self._async_stream()
+                )
+        self._reply(self._suffix(topic), request.get("idTrans", 0), {"status": True})
+
+    def rt_frame(self) -> dict[str, Any]:
+        """Advance the simulation to now and return the data of an rt frame."""
+        now = self.clock()
+        dt, self._last_step = now - self._last_step, now
+        for connector in self.connectors:
+            connector.step(dt)
+        elements = [connector.element() for connector in self.connectors]
+        phases = [
+            sum(connector.power[index] for connector in self.connectors)
+            for index in range(3)
+        ]
+        evse_power = sum(phases)
+        home_power = self.profile.home_power * self.rng.uniform(0.8, 1.2)
+        total_power = evse_power + home_power
+        max_power = VOLTAGE * self.profile.max_current * 3
+        data = {
+            "evsePower": round(evse_power),
+            "homePower": round(home_power),
+            "totalPower": round(total_power),
+            "relOverload": round(total_power / max_power, 2),
+            "totalCurrent": [
+                round((power + home_power / 3) / VOLTAGE * 1000) for power in phases
+            ],
+            "ctxDetected": True,
+            "mbusDetected": self.combiplus,
+            "maxPower": round(max_power),
+            "instPower": round(total_power),
+            "elements": elements,
+        }
+        if self.solar:
+            data["fvPower"] = round(self.rng.uniform(0, 4000))
+        return data
+
+    async def _async_stream(self) -> None:
+        """Publish rt frames until the lease expires or streaming stops."""
+        suffix = "streamrt/modulator"
+        try:
+            while self.period > 0:
+                if self.lease_expiry is not None and self.clock() >= self.lease_expiry:
+                    break
+                self._reply(suffix, 0, self.rt_frame())
+                self.frames_sent += 1
+                await asyncio.sleep(self.period)
+        finally:
+            self._stream_task = None
+
+
+def create_fleet(
+    broker: FakeBroker,
+    count: int,
+    *,
+    combiplus_ratio: float = 0.5,
+    schuko_ratio: float = 0.3,
+    solar_ratio: float = 0.2,
+    profile: ChargerProfile | None = None,
+    seed: int = 0,
+) -> list[SimulatedCharger]:
+    """Return ``count`` chargers with a reproducible mix of models."""
+    rng = random.Random(seed)
+    chargers = []
+    for index in range(count):
+        combiplus = rng.random() < combiplus_ratio
+        chargers.append(
+            SimulatedCharger(
+                broker,
+                serial_number(index, combiplus),
+                schuko=rng.random() < schuko_ratio,
+                solar=rng.random() < solar_ratio,
+                profile=profile,
+                seed=seed * 100_003 + index,
+            )
+        )
+    return chargers
@@ -3,7 +3,9 @@ from __future__ import annotations
 
 from collections.abc import Callable
 from dataclasses import dataclass
+from functools import partial
 import logging
+from pathlib import Path
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
@@ -11,8 +13,23 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import EntityDescription
 from homeassistant.helpers.typing import ConfigType
 
-from .const import CONF_SERIAL_NUMBER, DOMAIN
-from .manage_yaml_file import ConfigurationManager
+from .const import (
+    CAPABILITIES_TIMEOUT,
+    CONF_PERSIST_HISTORY,
+    CONF_SERIAL_NUMBER,
+    DATA_ROUTER,
+    DATA_RT_SCHEDULER,
+    HISTORY_DIR,
+    HISTORY_MEMORY_TIERS,
+    HISTORY_SAMPLES,
+    HISTORY_TIERS,
+)
+from .coordinator import ViarisCoordinator
+from .history import RtHistory
+from .router import ViarisRouter
+from .scheduler import ViarisRtScheduler
+from .services import async_setup_services
+from .store import async_get_store
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,26 +38,66 @@ PLATFORMS = [Platform.BUTTON, Platform.NUMBER, Platform.SENSOR, Platform.SWITCH]
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up the VIARIS integration."""
+    serial_number = entry.data[CONF_SERIAL_NUMBER]
+    store = await async_get_store(hass)
+    history = None
+    if entry.options.get(CONF_PERSIST_HISTORY):
+        path = _history_path(hass, serial_number)
+        try:
+            history = await hass.async_add_executor_job(
+                RtHistory, HISTORY_SAMPLES, HISTORY_TIERS, path
+            )
+        except OSError as err:
+            _LOGGER.warning("Unable to open %s, keeping it in memory: %s", path, err)
+    if history is None:
+        history = RtHistory(HISTORY_SAMPLES, HISTORY_MEMORY_TIERS)
+    coordinator = ViarisCoordinator(hass, entry, store, history)
+    entry.runtime_data = coordinator
+    entry.async_on_unload(coordinator.async_shutdown)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    if (scheduler := hass.data.get(DATA_RT_SCHEDULER)) is None:
+        scheduler = hass.data[DATA_RT_SCHEDULER] = ViarisRtScheduler(hass)
+    entry.async_on_unload(scheduler.async_add_charger(coordinator))
+    if (router := hass.data.get(DATA_ROUTER)) is None:
+        router = hass.data[DATA_ROUTER] = ViarisRouter(hass)
+    entry.async_on_unload(
+        await router.async_add_charger(serial_number, coordinator.dispatcher)
+    )
+    coordinator.async_request_snapshot()
+    scheduler.async_request_stream(serial_number)
+    await coordinator.async_get_capabilities(CAPABILITIES_TIMEOUT)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
 
+def _history_path(hass: HomeAssistant, serial_number: str) -> Path:
+    """Return the history file of a charger."""
+    return Path(hass.config.path(HISTORY_DIR, f"{serial_number}.rrd"))
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    hass.data.setdefault(DOMAIN, {})
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        serial_number = entry.data.get(CONF_SERIAL_NUMBER)
-        config_manager = ConfigurationManager(serial_number)
-        await config_manager.ensure_configuration_file()
-        configuration = await config_manager.load_configuration()
-        del configuration["devices"][serial_number]
-        await config_manager.save_configuration(configuration)
         _LOGGER.info("Unload entry OK")
     else:
         _LOGGER.info("Unload entry not OK")
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the settings and the history of a removed charger."""
+    serial_number = entry.data[CONF_SERIAL_NUMBER]
+    (await async_get_store(hass)).async_remove_device(serial_number)
+    await hass.async_add_executor_job(
+        partial(_history_path(hass, serial_number).unlink, missing_ok=True)
+    )
+
+
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up integration."""
     # Make sure MQTT is available and the entry is loaded
@@ -55,6 +112,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     # return True
 
     # _LOGGER.info("MQTT integration available")
+    async_setup_services(hass)
     return True
 
 
@@ -67,3 +125,5 @@ class ViarisEntityDescription(EntityDescription):
     domain: str = "generic"
     disabled: bool | None = None
     disabled_reason: str | None = None
+    # Capability of the charger the entity needs, see Capabilities.
+    requires: str | None = None
@@ -4,7 +4,6 @@ from __future__ import annotations
 import logging
 
 from homeassistant import config_entries
-from homeassistant.components import mqtt
 from homeassistant.components.button import (
     ButtonDeviceClass,
     ButtonEntity,
@@ -12,13 +11,11 @@ from homeassistant.components.button import (
 )
 from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.json import json_dumps
 
 from . import ViarisEntityDescription
-from .const import CONF_SERIAL_NUMBER
+from .const import CONF_SERIAL_NUMBER, DATA_RT_SCHEDULER
 from .entity import ViarisEntity
-from .manage_yaml_file import ConfigurationManager
-from .number import numbers_buffer
+from .store import async_get_store
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -72,39 +69,21 @@ class ViarisButton(ViarisEntity, ButtonEntity):
 
     async def async_press(self) -> None:
         """Trigger the button action."""
-        if self.serial_number in numbers_buffer:
-            period_value = None
-            timeout_value = None
-            for entity in numbers_buffer[self.serial_number]:
-                if entity.entity_id == f"number.{self.serial_number.lower()}_period_rt":
-                    period_value = entity.state
-                elif (
-                    entity.entity_id
-                    == f"number.{self.serial_number.lower()}_timeout_rt"
-                ):
-                    timeout_value = entity.state
-            value = {
-                "idTrans": 0,
-                "data": {
-                    "status": True,
-                    "period": period_value,
-                    "timeout": timeout_value,
-                },
-            }
-            _LOGGER.info(value)
-            value_json = json_dumps(value)
-            mqtt.publish(self.hass, self._topic_rt_pub, value_json)
-            config_manager = ConfigurationManager(self.serial_number)
-            await config_manager.ensure_configuration_file()
-            configuration = await config_manager.load_configuration()
-            configuration["devices"][self.serial_number]["rt_frame"][
-                "period"
-            ] = period_value
-            configuration["devices"][self.serial_number]["rt_frame"][
-                "timeout"
-            ] = timeout_value
-            await config_manager.save_configuration(configuration)
-        else:
-            _LOGGER.warning(
-                "No Viaris entity found for serial number: %s", self.serial_number
-            )
+        coordinator = self.coordinator
+        _LOGGER.info(
+            "Sending rt config period=%s timeout=%s idle_period=%s",
+            coordinator.rt_period,
+            coordinator.rt_timeout,
+            coordinator.rt_idle_period,
+        )
+        (await async_get_store(self.hass)).async_set_rt_frame(
+            self.serial_number,
+            period=coordinator.rt_period,
+            timeout=coordinator.rt_timeout,
+            idle_period=coordinator.rt_idle_period,
+        )
+        request = self.hass.data[DATA_RT_SCHEDULER].async_request_stream(
+            self.serial_number
+        )
+        if request is not None:
+            await request
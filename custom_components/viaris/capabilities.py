@@ -0,0 +1,84 @@
+"""What a viaris charger is fitted with."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, fields
+from typing import Any
+
+from .const import MODEL_COMBIPLUS
+from .extract import ExtractionPlan, FieldSpec
+
+BOOT_CAPABILITIES_PLAN = ExtractionPlan(
+    (key, FieldSpec((key,))) for key in ("schuko", "solar")
+)
+# Fields of the rt frame the capabilities come from.
+RT_CAPABILITIES_FIELDS = (
+    ("ctxDetected", FieldSpec(("ctxDetected",))),
+    ("mbusDetected", FieldSpec(("mbusDetected",))),
+)
+
+
+@dataclass(frozen=True)
+class Capabilities:
+    """Connectors and meters of a charger.
+
+    Entity descriptions name the capability they require, if any, and are
+    only created when the charger has it. Anything not known yet is assumed
+    present, so a charger that never answered gets every entity.
+    """
+
+    # A second connector: the second mennekes of a COMBIPLUS, or the
+    # schuko of a UNI.
+    connector2: bool = True
+    # A second mennekes connector, with its own events and current limit.
+    mennekes2: bool = True
+    # A Contax D0613 main meter.
+    main_meter: bool = True
+    # Solar production, configured or measured by a TMC100 secondary meter.
+    solar: bool = True
+
+    def supports(self, requirement: str | None) -> bool:
+        """Return True when the charger has a required capability."""
+        return requirement is None or getattr(self, requirement)
+
+    def exceeds(self, other: Capabilities) -> bool:
+        """Return True when the charger has a capability ``other`` lacks."""
+        return any(
+            getattr(self, field.name) and not getattr(other, field.name)
+            for field in fields(self)
+        )
+
+    def as_dict(self) -> dict[str, bool]:
+        """Return the capabilities as a dictionary to store."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, values: dict[str, Any]) -> Capabilities:
+        """Return stored capabilities, ignoring unknown ones."""
+        return cls(
+            **{
+                field.name: values[field.name]
+                for field in fields(cls)
+                if isinstance(values.get(field.name), bool)
+            }
+        )
+
+
+def detect_capabilities(
+    model: str, boot: dict[str, Any] | None, rt: dict[str, Any] | None
+) -> Capabilities:
+    """Return the capabilities of the boot/sys and rt values of a charger.
+
+    Values missing from the frames, e.g. on firmware that does not report
+    them, are unknown and the capability is assumed present.
+    """
+    combiplus = model == MODEL_COMBIPLUS
+    values = {"mennekes2": combiplus}
+    if boot is not None:
+        values["connector2"] = combiplus or boot["schuko"] is not False
+    if rt is not None:
+        values["main_meter"] = rt["ctxDetected"] is not False
+    solar_config = None if boot is None else boot["solar"]
+    solar_meter = None if rt is None else rt["mbusDetected"]
+    if solar_config is False and solar_meter is False:
+        values["solar"] = False
+    return Capabilities(**values)
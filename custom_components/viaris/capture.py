@@ -0,0 +1,53 @@
+"""File format of viaris MQTT traffic captures.
+
+A capture starts with ``MAGIC`` and is followed by one record per message:
+a header with the receive time (seconds since the epoch, float64), the
+topic length (uint16) and the payload length (uint32), all little endian,
+then the topic and the raw payload. Files are only ever appended to.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+import struct
+from typing import NamedTuple
+
+MAGIC = b"VIARISCAP1\n"
+_RECORD = struct.Struct("<dHI")
+
+
+class CapturedMessage(NamedTuple):
+    """A message read from a capture."""
+
+    timestamp: float
+    topic: str
+    payload: bytes
+
+
+def encode_record(timestamp: float, topic: str, payload: bytes) -> bytes:
+    """Return the record of a message."""
+    encoded = topic.encode()
+    return _RECORD.pack(timestamp, len(encoded), len(payload)) + encoded + payload
+
+
+def append_records(path: Path, records: Iterable[bytes]) -> None:
+    """Append records to a capture, creating it when needed."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("ab") as file:
+        if file.tell() == 0:
+            file.write(MAGIC)
+        file.writelines(records)
+
+
+def read_capture(path: Path) -> Iterator[CapturedMessage]:
+    """Yield the messages of a capture, ignoring a truncated last record."""
+    with path.open("rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a viaris capture")
+        while len(header := file.read(_RECORD.size)) == _RECORD.size:
+            timestamp, topic_length, payload_length = _RECORD.unpack(header)
+            topic = file.read(topic_length)
+            payload = file.read(payload_length)
+            if len(topic) != topic_length or len(payload) != payload_length:
+                return
+            yield CapturedMessage(timestamp, topic.decode(), payload)
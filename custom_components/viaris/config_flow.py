@@ -7,17 +7,19 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 
 from .const import (
+    CONF_PERSIST_HISTORY,
     CONF_SERIAL_NUMBER,
     DEFAULT_NAME,
     DOMAIN,
     SERIAL_PREFIX_COMBI,
     SERIAL_PREFIX_UNI,
 )
+from .topics import parse_topic
 
 try:
     # < HA 2022.8.0
@@ -89,6 +91,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Initialize flow."""
         self._serial_number = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_mqtt(self, discovery_info: MqttServiceInfo) -> FlowResult:
         """Handle a flow initialized by MQTT discovery."""
         subscribed_topic = discovery_info.subscribed_topic
@@ -96,8 +106,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         # Subscribed topic must be in sync with the manifest.json
         assert subscribed_topic == "XEO/VIARIS/#"
 
-        topic = discovery_info.topic.split("/")
-        self._serial_number = topic[5]
+        if (info := parse_topic(discovery_info.topic)) is None:
+            return self.async_abort(reason="invalid_discovery_info")
+        self._serial_number = info.serial_number
         if len(self._serial_number) == 13:
             if (
                 self._serial_number[0:5] == SERIAL_PREFIX_UNI
@@ -168,6 +179,33 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the options of a charger."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_PERSIST_HISTORY,
+                        default=self._entry.options.get(CONF_PERSIST_HISTORY, False),
+                    ): bool,
+                }
+            ),
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
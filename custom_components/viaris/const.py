@@ -63,6 +63,7 @@ SERIAL_PREFIX_COMBI = "EVVC4"
 MODEL_UNI = "Uni"
 MODEL_COMBIPLUS = "Combiplus"
 KVARH_UNITS: Final = "kVarh"
+KVAR_UNITS: Final = "kVar"
 START_STOP_CONN1_KEY = "start_stop_conn1"
 START_STOP_CONN2_KEY = "start_stop_conn2"
 CURRENT_LIMIT_CONN1_KEY = "curr_lim_conn1"
@@ -70,9 +71,63 @@ CURRENT_LIMIT_CONN2_KEY = "curr_lim_conn2"
 SEND_CFG_RT = "send_cfg_rt"
 PERIOD_RT_KEY = "period_rt"
 TIMEOUT_RT_KEY = "timeout_rt"
+PERIOD_RT_IDLE_KEY = "period_rt_idle"
+DEFAULT_RT_PERIOD = 3
+DEFAULT_RT_TIMEOUT = 60
+DEFAULT_RT_IDLE_PERIOD = 30
+RT_IDLE_HOLD = 120
+RT_STALE_MARGIN = 2
+RT_REQUEST_JITTER = 1.0
+RT_LEASE_MARGIN = 5
+DATA_RT_SCHEDULER = f"{DOMAIN}_rt_scheduler"
+DATA_STORE = f"{DOMAIN}_store"
+DATA_ROUTER = f"{DOMAIN}_router"
+CAPTURE_DIR = "viaris_captures"
+CAPTURE_FLUSH_INTERVAL = 5
+CAPTURE_FLUSH_RECORDS = 1000
+SERVICE_START_CAPTURE = "start_capture"
+SERVICE_STOP_CAPTURE = "stop_capture"
+SERVICE_REPLAY_CAPTURE = "replay_capture"
+ATTR_FILENAME = "filename"
+ATTR_SPEED = "speed"
+# One hour of samples at the shortest rt period.
+HISTORY_SAMPLES = 3600
+# Aggregation step and rows of every tier: a week of 1 minute and a year of
+# 15 minute aggregates in a history file, a day and a week of them when the
+# history is only kept in memory.
+HISTORY_TIERS = ((60, 7 * 24 * 60), (900, 365 * 24 * 4))
+HISTORY_MEMORY_TIERS = ((60, 24 * 60), (900, 7 * 24 * 4))
+HISTORY_MINUTES = 10
+# Seconds between writes of a history file to disk.
+HISTORY_FLUSH_INTERVAL = 300
+HISTORY_DIR = "viaris_history"
+CONF_PERSIST_HISTORY = "persist_history"
+SERVICE_GET_RT_HISTORY = "get_rt_history"
+ATTR_MINUTES = "minutes"
+ATTR_STEP = "step"
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10
+# Snapshot frames older than this are requested again at startup.
+SNAPSHOT_MAX_AGE = 24 * 60 * 60
+# Seconds to wait for the frames of a new charger before creating entities.
+CAPABILITIES_TIMEOUT = 10
+REQUEST_WINDOW = 0.1
+REQUEST_TIMEOUT = 5
+REQUEST_RETRIES = 2
+REQUEST_BACKOFF = 1
+REQUEST_MAX_IN_FLIGHT = 4
 STATE_CHARGING = 5
 STATE_CHARGING_POWER_LIMIT = 6
 STATE_PAUSED_CHARGING = 7
+STATE_SCHUKO_ON_LOAD = 14
+CHARGING_STATES = frozenset(
+    (
+        STATE_CHARGING,
+        STATE_CHARGING_POWER_LIMIT,
+        STATE_PAUSED_CHARGING,
+        STATE_SCHUKO_ON_LOAD,
+    )
+)
 
 
 class ChargerStatusCodes:
@@ -0,0 +1,342 @@
+"""Runtime state of a viaris charger."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from functools import partial
+import hashlib
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+import orjson
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.event import async_track_time_interval
+
+from .capabilities import (
+    BOOT_CAPABILITIES_PLAN,
+    RT_CAPABILITIES_FIELDS,
+    Capabilities,
+    detect_capabilities,
+)
+from .const import (
+    CONF_SERIAL_NUMBER,
+    DOMAIN,
+    HISTORY_FLUSH_INTERVAL,
+    SNAPSHOT_MAX_AGE,
+)
+from .dispatcher import ViarisDispatcher
+from .extract import ExtractionPlan, FieldSpec
+from .history import HISTORY_COLUMNS, RtHistory
+from .request import ViarisRequester
+from .topics import get_topics
+
+if TYPE_CHECKING:
+    from .store import ViarisStore
+
+_LOGGER = logging.getLogger(__name__)
+
+# Topics whose latest frame is kept in the snapshot, with the topic that
+# requests it. The boot announcement of a charger is kept as its boot/sys.
+SNAPSHOT_TOPICS: dict[str, str | None] = {
+    "boot_sys_subs": "boot_sys_pub",
+    "mqtt_subs": "mqtt_pub",
+    "evsm_mennekes_subs": None,
+    "evsm_menek_value_subs": "evsm_mennekes_pub",
+    "evsm_mennekes2_subs": None,
+    "evsm_menek2_value_subs": "evsm_mennekes2_pub",
+}
+SNAPSHOT_ALIASES = {"init_boot_sys_subs": "boot_sys_subs"}
+
+DEVICE_INFO_PLAN = ExtractionPlan(
+    (key, FieldSpec((key,)))
+    for key in ("fwv", "fwv_pot", "fwv_cortex", "hwv", "hwv_pot", "serial", "mac")
+)
+
+# The rt values recorded in the history and those of the capabilities.
+RT_PLAN = ExtractionPlan(
+    (
+        *((name, field) for name, _, field in HISTORY_COLUMNS),
+        *RT_CAPABILITIES_FIELDS,
+    )
+)
+
+
+def _version(main: Any, **parts: Any) -> str | None:
+    """Join the version of a charger with the versions of its boards."""
+    if main is None:
+        return None
+    extra = ", ".join(f"{name} {value}" for name, value in parts.items() if value)
+    return f"{main} ({extra})" if extra else str(main)
+
+
+def device_info_from_values(values: dict[str, Any]) -> dict[str, Any]:
+    """Return the device registry fields of the values of a boot/sys frame."""
+    info: dict[str, Any] = {
+        "sw_version": _version(
+            values["fwv"], power=values["fwv_pot"], cortex=values["fwv_cortex"]
+        ),
+        "hw_version": _version(values["hwv"], power=values["hwv_pot"]),
+        "serial_number": values["serial"],
+    }
+    if mac := values["mac"]:
+        info["connections"] = {(dr.CONNECTION_NETWORK_MAC, dr.format_mac(mac))}
+    return {key: value for key, value in info.items() if value is not None}
+
+
+class ViarisCoordinator:
+    """Everything a charger needs while its config entry is loaded.
+
+    The coordinator is stored in ``entry.runtime_data``. It owns the topic
+    table, the frame dispatcher, and with it every subscription and the
+    latest frame of each topic, the request client, the rt stream settings
+    and the history of the rt samples. Shutting it down releases all
+    of them. A history file is written to disk by the executor every
+    HISTORY_FLUSH_INTERVAL seconds and when shutting down.
+
+    The latest configuration and status frames are kept in a snapshot in
+    the store. At startup they are restored as the latest frames of their
+    topics, and only the frames that are missing or older than a day are
+    requested. When the boot/sys frame of a charger changes, e.g. after a
+    firmware update, every other frame is requested again.
+
+    The versions, serial number and MAC address of the boot/sys frame are
+    kept in ``device_info`` for the device of the entities, and written to
+    the device registry when they change.
+
+    The entities of a charger are created for its ``capabilities``, detected
+    from the boot/sys and rt frames and cached in the store. When the frames
+    later show a capability they lack, e.g. after a meter was fitted, the
+    config entry is reloaded. Capabilities that disappear are only cached,
+    and dropped at the next start, so a flapping meter flag does not keep
+    reloading it.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        store: ViarisStore,
+        history: RtHistory,
+    ) -> None:
+        """Initialize the coordinator."""
+        self.hass = hass
+        self.entry = entry
+        self.serial_number: str = entry.data[CONF_SERIAL_NUMBER]
+        self.topics = get_topics(self.serial_number)
+        self.model = self.topics.model
+        self.dispatcher = ViarisDispatcher(hass)
+        self.requests = ViarisRequester(hass, self.dispatcher)
+        self._store = store
+        rt_frame = store.rt_frame(self.serial_number)
+        self.rt_period = rt_frame["period"]
+        self.rt_timeout = rt_frame["timeout"]
+        self.rt_idle_period = rt_frame["idle_period"]
+        self.suppressed_writes = 0
+        self.history = history
+        self._history_flush: asyncio.Future[None] | None = None
+        self._unsub_history_flush: CALLBACK_TYPE | None = None
+        if history.path is not None:
+            self._unsub_history_flush = async_track_time_interval(
+                hass,
+                self._async_flush_history,
+                timedelta(seconds=HISTORY_FLUSH_INTERVAL),
+            )
+        self.dispatcher.async_add_listener(
+            self.topics.rt_subs,
+            self._async_rt_values_received,
+            RT_PLAN,
+            repeats=True,
+        )
+        self.snapshot = store.snapshot(self.serial_number)
+        for attribute in (*SNAPSHOT_TOPICS, *SNAPSHOT_ALIASES):
+            if (topic := getattr(self.topics, attribute)) is None:
+                continue
+            name = SNAPSHOT_ALIASES.get(attribute, attribute)
+            if name == attribute and (frame := self.snapshot.get(name)):
+                self.dispatcher.frames[topic] = frame["data"]
+            self.dispatcher.async_add_listener(
+                topic, partial(self._async_snapshot_frame_received, name)
+            )
+        self.device_info: dict[str, Any] = {}
+        if (frame := self.last_frame(self.topics.boot_sys_subs)) is not None:
+            self.device_info = device_info_from_values(DEVICE_INFO_PLAN.extract(frame))
+        for topic in (self.topics.boot_sys_subs, self.topics.init_boot_sys_subs):
+            self.dispatcher.async_add_listener(
+                topic, self._async_device_values_received, DEVICE_INFO_PLAN
+            )
+        self.capabilities: Capabilities | None = None
+        self._boot_capabilities: dict[str, Any] | None = None
+        self._rt_capabilities: dict[str, Any] | None = None
+        self._capabilities_detected = asyncio.Event()
+        if (frame := self.last_frame(self.topics.boot_sys_subs)) is not None:
+            self._boot_capabilities = BOOT_CAPABILITIES_PLAN.extract(frame)
+        for topic in (self.topics.boot_sys_subs, self.topics.init_boot_sys_subs):
+            self.dispatcher.async_add_listener(
+                topic, self._async_boot_capabilities_received, BOOT_CAPABILITIES_PLAN
+            )
+
+    def last_frame(self, topic: str) -> dict[str, Any] | None:
+        """Return the latest frame received on a topic."""
+        return self.dispatcher.frames.get(topic)
+
+    @callback
+    def _async_rt_values_received(self, values: dict[str, Any]) -> None:
+        """Add an rt sample to the history and follow the meters."""
+        self.history.append(time.time(), values)
+        rt = self._rt_capabilities
+        if (
+            rt is None
+            or rt["ctxDetected"] is not values["ctxDetected"]
+            or rt["mbusDetected"] is not values["mbusDetected"]
+        ):
+            self._rt_capabilities = {
+                key: values[key] for key, _ in RT_CAPABILITIES_FIELDS
+            }
+            self._async_update_capabilities()
+
+    @callback
+    def _async_boot_capabilities_received(self, values: dict[str, Any]) -> None:
+        """Follow the connectors and solar setting of a boot/sys frame."""
+        if values != self._boot_capabilities:
+            self._boot_capabilities = values
+            self._async_update_capabilities()
+
+    @callback
+    def _async_update_capabilities(self) -> None:
+        """Cache the capabilities once detected and reload when one appears."""
+        if self._boot_capabilities is None or self._rt_capabilities is None:
+            return
+        capabilities = detect_capabilities(
+            self.model, self._boot_capabilities, self._rt_capabilities
+        )
+        self._store.async_set_capabilities(self.serial_number, capabilities.as_dict())
+        self._capabilities_detected.set()
+        if self.capabilities is None or not capabilities.exceeds(self.capabilities):
+            return
+        _LOGGER.info("Capabilities of %s grew, reloading", self.serial_number)
+        self.capabilities = capabilities
+        self.hass.config_entries.async_schedule_reload(self.entry.entry_id)
+
+    async def async_get_capabilities(self, timeout: float) -> Capabilities:
+        """Return the capabilities to create the entities for.
+
+        Cached capabilities are used at once. Otherwise the first boot/sys
+        and rt frames are awaited for up to ``timeout`` seconds, and
+        whatever is still unknown then is assumed present.
+        """
+        if (cached := self._store.capabilities(self.serial_number)) is None:
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._capabilities_detected.wait()
+            except TimeoutError:
+                _LOGGER.warning(
+                    "%s did not answer in %s s, creating every entity",
+                    self.serial_number,
+                    timeout,
+                )
+            cached = self._store.capabilities(self.serial_number)
+        if cached is not None:
+            self.capabilities = Capabilities.from_dict(cached)
+        else:
+            self.capabilities = detect_capabilities(
+                self.model, self._boot_capabilities, self._rt_capabilities
+            )
+        return self.capabilities
+
+    @callback
+    def _async_device_values_received(self, values: dict[str, Any]) -> None:
+        """Update the device registry when the boot/sys values change."""
+        if (info := device_info_from_values(values)) == self.device_info:
+            return
+        self.device_info = info
+        registry = dr.async_get(self.hass)
+        if device := registry.async_get_device(
+            identifiers={(DOMAIN, self.serial_number)}
+        ):
+            update = dict(info)
+            if connections := update.pop("connections", None):
+                update["merge_connections"] = connections
+            registry.async_update_device(device.id, **update)
+
+    @callback
+    def _async_snapshot_frame_received(self, name: str, data: Any) -> None:
+        """Keep the latest frame of a topic in the snapshot.
+
+        A frame with the same data as the stored one is only saved again
+        when the stored one is halfway to SNAPSHOT_MAX_AGE, so it is not
+        requested again at startup.
+        """
+        if not isinstance(data, dict):
+            return
+        frame = {"data": data.get("data")}
+        digest = hashlib.blake2b(
+            orjson.dumps(frame, option=orjson.OPT_SORT_KEYS), digest_size=8
+        ).hexdigest()
+        now = time.time()
+        previous = self.snapshot.get(name)
+        if (
+            previous is not None
+            and previous["hash"] == digest
+            and now - previous["time"] < SNAPSHOT_MAX_AGE / 2
+        ):
+            return
+        self.snapshot[name] = {"time": now, "hash": digest, "data": frame}
+        self._store.async_set_snapshot_frame(
+            self.serial_number, name, self.snapshot[name]
+        )
+        if name == "boot_sys_subs" and previous and previous["hash"] != digest:
+            _LOGGER.debug("boot/sys of %s changed", self.serial_number)
+            self.async_request_snapshot(refresh=True)
+
+    @callback
+    def async_request_snapshot(self, refresh: bool = False) -> None:
+        """Request the snapshot frames that are missing or stale.
+
+        With ``refresh`` every frame but boot/sys is requested.
+        """
+        stale = time.time() - SNAPSHOT_MAX_AGE
+        for name, request_name in SNAPSHOT_TOPICS.items():
+            if request_name is None:
+                continue
+            if (topic := getattr(self.topics, request_name)) is None:
+                continue
+            if refresh:
+                wanted = name != "boot_sys_subs"
+            else:
+                frame = self.snapshot.get(name)
+                wanted = frame is None or frame["time"] < stale
+            if wanted:
+                self.requests.async_request(topic)
+
+    @callback
+    def _async_flush_history(self, now=None) -> None:
+        """Write the history file to disk unless a write is running."""
+        if self._history_flush is None or self._history_flush.done():
+            self._history_flush = self.hass.async_add_executor_job(
+                self._flush_history
+            )
+
+    def _flush_history(self) -> None:
+        """Write the history file to disk, in the executor."""
+        try:
+            self.history.flush()
+        except OSError as err:
+            _LOGGER.warning("Unable to write %s: %s", self.history.path, err)
+
+    async def async_shutdown(self) -> None:
+        """Drop every pending request and subscription and close the history."""
+        self.requests.async_shutdown()
+        self.dispatcher.async_shutdown()
+        if self._unsub_history_flush is not None:
+            self._unsub_history_flush()
+            self._unsub_history_flush = None
+        if self._history_flush is not None:
+            await self._history_flush
+        try:
+            await self.hass.async_add_executor_job(self.history.close)
+        except OSError as err:
+            _LOGGER.warning("Unable to write %s: %s", self.history.path, err)
@@ -0,0 +1,48 @@
+"""Diagnostics support for viaris."""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import HISTORY_MINUTES
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = entry.runtime_data
+    return {
+        "serial_number": coordinator.serial_number,
+        "model": coordinator.model,
+        "rt_frame": {
+            "period": coordinator.rt_period,
+            "timeout": coordinator.rt_timeout,
+            "idle_period": coordinator.rt_idle_period,
+        },
+        "capabilities": coordinator.capabilities and coordinator.capabilities.as_dict(),
+        "suppressed_writes": coordinator.suppressed_writes,
+        "dispatcher": {
+            "messages": coordinator.dispatcher.messages,
+            "repeated": coordinator.dispatcher.repeated,
+            "hit_rate": round(coordinator.dispatcher.hit_rate, 3),
+            "listeners": coordinator.dispatcher.listener_count(),
+        },
+        "snapshot": {
+            name: {"time": frame["time"], "hash": frame["hash"]}
+            for name, frame in coordinator.snapshot.items()
+        },
+        "last_rt_frame": coordinator.last_frame(coordinator.topics.rt_subs),
+        "rt_history": {
+            "memory": coordinator.history.memory,
+            "path": coordinator.history.path and str(coordinator.history.path),
+            "samples": len(coordinator.history.raw),
+            "tiers": {
+                step: len(tier.ring) for step, tier in coordinator.history.tiers.items()
+            },
+            "latest": coordinator.history.as_dict(time.time() - HISTORY_MINUTES * 60),
+        },
+    }
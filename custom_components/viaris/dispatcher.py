@@ -0,0 +1,160 @@
+"""Per-charger MQTT frame dispatcher for viaris."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import hashlib
+import logging
+from typing import Any
+
+import orjson
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .extract import ExtractionPlan
+
+_LOGGER = logging.getLogger(__name__)
+
+FrameListener = Callable[[dict[str, Any]], None]
+
+# Payloads up to this size are compared as they are, longer ones by digest.
+DIGEST_THRESHOLD = 256
+
+
+class ViarisDispatcher:
+    """Decode each charger frame once and share it with every consumer.
+
+    The dispatcher receives every ``stat`` message of its charger from the
+    router, and decodes only the frames of topics that have listeners.
+    Listeners registered with an extraction plan receive the values of the
+    plan instead of the raw frame; each plan runs once per frame. The latest
+    frame of every listened topic is kept in ``frames``. Frames are decoded
+    straight from the received bytes.
+
+    A payload identical to the previous one of its topic is not decoded
+    again: only the listeners registered with ``repeats`` are called, with
+    the frame and values of the previous payload. ``repeated`` counts such
+    messages among the ``messages`` received.
+
+    Listeners of entities register as ``consumer``; the rt stream is only
+    kept alive while its topic has consumers.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the dispatcher."""
+        self.hass = hass
+        self._listeners: dict[
+            str, list[tuple[FrameListener, ExtractionPlan | None, bool]]
+        ] = {}
+        self._last: dict[
+            str, tuple[tuple[int, bytes], Any, dict[ExtractionPlan, dict[str, Any]]]
+        ] = {}
+        self._consumers: dict[str, int] = {}
+        self.frames: dict[str, Any] = {}
+        self.messages = 0
+        self.repeated = 0
+
+    @callback
+    def async_add_listener(
+        self,
+        topic: str,
+        listener: FrameListener,
+        plan: ExtractionPlan | None = None,
+        repeats: bool = False,
+        consumer: bool = False,
+    ) -> CALLBACK_TYPE:
+        """Register a frame listener for a topic.
+
+        Listeners that track the arrival of frames rather than their content
+        set ``repeats`` to also be called for repeated payloads.
+        """
+        listeners = self._listeners.setdefault(topic, [])
+        entry = (listener, plan, repeats)
+        listeners.append(entry)
+        if consumer:
+            self._consumers[topic] = self._consumers.get(topic, 0) + 1
+        # The new listener has not seen the previous payload.
+        self._last.pop(topic, None)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove the listener and forget the topic when unused."""
+            if entry not in listeners:
+                return
+            listeners.remove(entry)
+            if consumer:
+                self._consumers[topic] -= 1
+            if not listeners and self._listeners.get(topic) is listeners:
+                del self._listeners[topic]
+                self._last.pop(topic, None)
+                self.frames.pop(topic, None)
+
+        return remove_listener
+
+    def listener_count(self, topic: str | None = None) -> int:
+        """Return the number of listeners of a topic, or of every topic."""
+        if topic is None:
+            return sum(len(listeners) for listeners in self._listeners.values())
+        return len(self._listeners.get(topic, ()))
+
+    def consumer_count(self, topic: str) -> int:
+        """Return the number of consumers of a topic."""
+        return self._consumers.get(topic, 0)
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the share of messages that repeated the previous payload."""
+        return self.repeated / self.messages if self.messages else 0.0
+
+    @callback
+    def async_message_received(self, message) -> None:
+        """Decode a frame once and fan it out to every listener."""
+        topic = message.topic
+        if (listeners := self._listeners.get(topic)) is None:
+            return
+        self.messages += 1
+        payload = message.payload
+        key = (
+            len(payload),
+            payload
+            if len(payload) <= DIGEST_THRESHOLD
+            else hashlib.blake2b(payload, digest_size=16).digest(),
+        )
+        if (last := self._last.get(topic)) is not None and last[0] == key:
+            self.repeated += 1
+            self._fan_out(listeners, last[1], last[2], True)
+            return
+        try:
+            data = orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            _LOGGER.debug("Invalid frame received on %s: %s", topic, payload)
+            return
+        self.frames[topic] = data
+        extracted: dict[ExtractionPlan, dict[str, Any]] = {}
+        self._last[topic] = (key, data, extracted)
+        self._fan_out(listeners, data, extracted, False)
+
+    @staticmethod
+    def _fan_out(
+        listeners: list[tuple[FrameListener, ExtractionPlan | None, bool]],
+        data: Any,
+        extracted: dict[ExtractionPlan, dict[str, Any]],
+        repeated: bool,
+    ) -> None:
+        """Call the listeners, running each plan at most once per payload."""
+        for listener, plan, repeats in tuple(listeners):
+            if repeated and not repeats:
+                continue
+            if plan is None:
+                listener(data)
+                continue
+            if (values := extracted.get(plan)) is None:
+                values = extracted[plan] = plan.extract(data)
+            listener(values)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Drop every listener."""
+        self._listeners.clear()
+        self._consumers.clear()
+        self._last.clear()
+        self.frames.clear()
@@ -6,17 +6,15 @@ from homeassistant.helpers.entity import DeviceInfo, Entity
 
 # from . import ViarisEntityDescription, ViarisEntityDescription2
 from . import ViarisEntityDescription
-from .const import (  # CONF_TOPIC_PREFIX,
+from .const import (
     CONF_SERIAL_NUMBER,
-    DEFAULT_TOPIC_PREFIX,
     DEVICE_INFO_MANUFACTURER,
     DEVICE_INFO_MODEL_COMBIPLUS,
     DEVICE_INFO_MODEL_UNI,
     DOMAIN,
     MODEL_COMBIPLUS,
-    MODEL_UNI,
-    SERIAL_PREFIX_UNI,
 )
+from .coordinator import ViarisCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,72 +28,23 @@ class ViarisEntity(Entity):
         description: ViarisEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-        # topic_prefix = config_entry.data[CONF_TOPIC_PREFIX]
-        topic_prefix = DEFAULT_TOPIC_PREFIX
         serial_number = config_entry.data[CONF_SERIAL_NUMBER]
-
-        self._topic_rt_subs = f"{topic_prefix}0{serial_number[-5:]}/stat/0/{serial_number}/streamrt/modulator"
+        self.coordinator: ViarisCoordinator = config_entry.runtime_data
+        self._topics = self.coordinator.topics
+        self._model = self._topics.model
 
         self.entity_id = f"{description.domain}.{serial_number}_{description.key}".lower()
         self._attr_unique_id = "-".join(
             [serial_number, description.domain, description.key, description.attribute]
         ).lower()
-        self._topic_rt_pub = (
-            f"{topic_prefix}0{serial_number[-5:]}/set/0/{serial_number}/rt/modulator"
-        )
-
-        if serial_number[0:5] == SERIAL_PREFIX_UNI:
-            self._model = MODEL_UNI
-            self._topic_evsm_mennekes_pub = f"{topic_prefix}0{serial_number[-5:]}/get/0/{serial_number}/value/evsm/mennekes"
-            self._topic_evsm_mennekes_subs = f"{topic_prefix}0{serial_number[-5:]}/stat/0/{serial_number}/evt/evsm/mennekes"
-            self._topic_evsm_menek_value_subs = f"{topic_prefix}0{serial_number[-5:]}/stat/0/{serial_number}/value/evsm/mennekes"
-            self._topic_startstop_conn1_pub = f"{topic_prefix}0{serial_number[-5:]}/set/0/{serial_number}/request/reqman/mennekes"
-            self._topic_startstop_conn2_pub = f"{topic_prefix}0{serial_number[-5:]}/set/0/{serial_number}/request/reqman/schuko"
-            self._topic_set_current_conn1 = f"{topic_prefix}0{serial_number[-5:]}/set/0/{serial_number}/value/mennekes"
-            self._topic_get_conf_conn1 = f"{topic_prefix}0{serial_number[-5:]}/set/0/{serial_number}/cfg/mennekes"
-            self._topic_stat_conf_conn1 = f"{topic_prefix}0{serial_number[-5:]}/stat/0/{serial_number}/cfg/mennekes"
-        else:
-            self._model = MODEL_COMBIPLUS
-            self._topic_evsm_mennekes_pub = f"{topic_prefix}0{serial_number[-5:]}/get/0/{serial_number}/value/evsm/mennekes1"
-            self._topic_evsm_mennekes_subs = f"{topic_prefix}0{serial_number[-5:]}/stat/0/{serial_number}/evt/evsm/mennekes1"
-            self._topic_evsm_menek_value_subs = f"{topic_prefix}0{serial_number[-5:]}/stat/0/{serial_number}/value/evsm/mennekes1"
-            self._topic_evsm_mennekes2_pub = f"{topic_prefix}0{serial_number[-5:]}/get/0/{serial_number}/value/evsm/mennekes2"
-            self._topic_evsm_mennekes2_subs = f"{topic_prefix}0{serial_number[-5:]}/stat/0/{serial_number}/evt/evsm/mennekes2"
-            self._topic_evsm_menek2_value_subs = f"{topic_prefix}0{serial_number[-5:]}/stat/0/{serial_number}/value/evsm/mennekes2"
-            self._topic_startstop_conn1_pub = f"{topic_prefix}0{serial_number[-5:]}/set/0/{serial_number}/request/reqman/mennekes1"
-            self._topic_startstop_conn2_pub = f"{topic_prefix}0{serial_number[-5:]}/set/0/{serial_number}/request/reqman/mennekes2"
-            self._topic_set_current_conn1 = f"{topic_prefix}0{serial_number[-5:]}/set/0/{serial_number}/value/mennekes1"
-            self._topic_set_current_conn2 = f"{topic_prefix}0{serial_number[-5:]}/set/0/{serial_number}/value/mennekes2"
-            self._topic_get_conf_conn1 = f"{topic_prefix}0{serial_number[-5:]}/set/0/{serial_number}/cfg/mennekes1"
-            self._topic_get_conf_conn2 = f"{topic_prefix}0{serial_number[-5:]}/set/0/{serial_number}/cfg/mennekes2"
-            self._topic_stat_conf_conn1 = f"{topic_prefix}0{serial_number[-5:]}/stat/0/{serial_number}/cfg/mennekes1"
-            self._topic_stat_conf_conn2 = f"{topic_prefix}0{serial_number[-5:]}/stat/0/{serial_number}/cfg/mennekes2"
-
-        # self._topic_evsm_schuko_pub = f"{topic_prefix}0{serial_number[-5:]}/get/0/{serial_number}/value/evsm/schuko"
-        # self._topic_evsm_schuko_subs = f"{topic_prefix}0{serial_number[-5:]}/stat/0/{serial_number}/evt/evsm/schuko"
-        # self._topic_evsm_schuko_value_subs = f"{topic_prefix}0{serial_number[-5:]}/stat/0/{serial_number}/value/evsm/schuko"
 
-        self._topic_boot_sys_pub = (
-            f"{topic_prefix}0{serial_number[-5:]}/get/0/{serial_number}/boot/sys"
-        )
-        self._topic_boot_sys_subs = (
-            f"{topic_prefix}0{serial_number[-5:]}/stat/0/{serial_number}/boot/sys"
-        )
-        self._topic_init_boot_sys_subs = (
-            f"{topic_prefix}0{serial_number[-5:]}/stat/0/{serial_number}/init_boot/sys"
-        )
-        self._topic_mqtt_pub = (
-            f"{topic_prefix}0{serial_number[-5:]}/get/0/{serial_number}/cfg/mqtt_user"
-        )
-        self._topic_mqtt_subs = (
-            f"{topic_prefix}0{serial_number[-5:]}/stat/0/{serial_number}/cfg/mqtt_user"
-        )
         if self._model == MODEL_COMBIPLUS:
             self._attr_device_info = DeviceInfo(
                 identifiers={(DOMAIN, serial_number)},
                 name=config_entry.title,
                 manufacturer=DEVICE_INFO_MANUFACTURER,
                 model=DEVICE_INFO_MODEL_COMBIPLUS,
+                **self.coordinator.device_info,
             )
         else:
             self._attr_device_info = DeviceInfo(
@@ -103,4 +52,5 @@ class ViarisEntity(Entity):
                 name=config_entry.title,
                 manufacturer=DEVICE_INFO_MANUFACTURER,
                 model=DEVICE_INFO_MODEL_UNI,
+                **self.coordinator.device_info,
             )
@@ -0,0 +1,149 @@
+"""Declarative field extraction for viaris frames."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """Where a value lives in a frame and how it is converted.
+
+    The path is relative to the ``data`` object of the frame, or to
+    ``data.elements[connector]`` when a connector index is given. Numbers
+    (or every item of a list of numbers) are multiplied by ``scale`` and
+    rounded to ``ndigits`` before ``convert`` is applied. Values that cannot
+    be converted, e.g. of a malformed or truncated frame, resolve to None.
+    """
+
+    path: tuple[str | int, ...]
+    connector: int | None = None
+    scale: float | None = None
+    ndigits: int | None = None
+    convert: Callable[[Any], Any] | None = None
+
+    @property
+    def full_path(self) -> tuple[str | int, ...]:
+        """Return the path from the root of the frame."""
+        if self.connector is None:
+            return ("data", *self.path)
+        return ("data", "elements", self.connector, *self.path)
+
+    def compile(self) -> Callable[[Any], Any]:
+        """Return a function converting a raw frame value."""
+        scale = self.scale
+        ndigits = self.ndigits
+        convert = self.convert
+
+        def number(value: Any) -> float:
+            value = float(value)
+            if scale is not None:
+                value *= scale
+            if ndigits is not None:
+                value = round(value, ndigits)
+            return value
+
+        def resolve(value: Any) -> Any:
+            if value is None:
+                return None
+            try:
+                if scale is not None or ndigits is not None:
+                    if type(value) is list:
+                        value = [number(item) for item in value]
+                    else:
+                        value = number(value)
+                if convert is not None:
+                    value = convert(value)
+            except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+                return None
+            return value
+
+        if scale is None and ndigits is None and convert is None:
+            return lambda value: value
+        return resolve
+
+
+def element_state(element: Any) -> int | None:
+    """Return the state code of an rt frame element, None when invalid."""
+    try:
+        return int(element["state"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class _PlanNode:
+    """One path segment of a compiled plan."""
+
+    __slots__ = ("fields", "children", "leaves", "keys", "indexes")
+
+    def __init__(self) -> None:
+        self.fields: list[tuple[str, Callable[[Any], Any]]] = []
+        self.children: dict[str | int, _PlanNode] = {}
+        # Filled by freeze(): children split by segment type, with the
+        # fields of childless children resolved directly by their parent.
+        self.leaves: tuple = ()
+        self.keys: tuple = ()
+        self.indexes: tuple = ()
+
+    def freeze(self) -> None:
+        """Prepare the node for extraction."""
+        leaves = []
+        keys = []
+        indexes = []
+        for segment, child in self.children.items():
+            child.freeze()
+            if not child.children and not isinstance(segment, int):
+                leaves.extend((segment, key, resolve) for key, resolve in child.fields)
+            elif isinstance(segment, int):
+                indexes.append((segment, child))
+            else:
+                keys.append((segment, child))
+        self.leaves = tuple(leaves)
+        self.keys = tuple(keys)
+        self.indexes = tuple(indexes)
+
+    def fill(self, obj: Any, values: dict[str, Any]) -> None:
+        """Resolve every field below this node from ``obj``."""
+        for key, resolve in self.fields:
+            values[key] = resolve(obj)
+        if type(obj) is dict:
+            get = obj.get
+            for segment, key, resolve in self.leaves:
+                values[key] = resolve(get(segment))
+            for segment, child in self.keys:
+                if (item := get(segment, _MISSING)) is not _MISSING:
+                    child.fill(item, values)
+        elif type(obj) is list:
+            for segment, child in self.indexes:
+                if segment < len(obj):
+                    child.fill(obj[segment], values)
+
+
+class ExtractionPlan:
+    """Fields of one frame type compiled into a single traversal.
+
+    Fields sharing a path prefix are resolved while walking the frame
+    once; fields that are missing from a frame are returned as ``None``.
+    """
+
+    def __init__(self, fields: Iterable[tuple[str, FieldSpec]]) -> None:
+        """Compile the plan."""
+        self._root = _PlanNode()
+        keys = []
+        for key, spec in fields:
+            node = self._root
+            for segment in spec.full_path:
+                node = node.children.setdefault(segment, _PlanNode())
+            node.fields.append((key, spec.compile()))
+            keys.append(key)
+        self._root.freeze()
+        self.keys = tuple(keys)
+
+    def extract(self, data: Any) -> dict[str, Any]:
+        """Return the value of every field of the plan."""
+        values = dict.fromkeys(self.keys)
+        self._root.fill(data, values)
+        return values
@@ -0,0 +1,317 @@
+"""Round-robin history of viaris rt samples."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+import hashlib
+import math
+import mmap
+import os
+from pathlib import Path
+import struct
+from typing import Any
+
+from .extract import ExtractionPlan, FieldSpec
+
+
+def _sum(values) -> float:
+    """Add up the values of every phase."""
+    return sum(values)
+
+
+# Column name, array type code and field of every sampled value. Energy
+# counters keep double precision; instantaneous values fit in a float.
+HISTORY_COLUMNS: tuple[tuple[str, str, FieldSpec], ...] = (
+    (
+        "active_power_conn1",
+        "f",
+        FieldSpec(("now", "aPow"), connector=0, scale=0.001, convert=_sum),
+    ),
+    (
+        "active_power_conn2",
+        "f",
+        FieldSpec(("now", "aPow"), connector=1, scale=0.001, convert=_sum),
+    ),
+    (
+        "active_energy_conn1",
+        "d",
+        FieldSpec(("now", "active"), connector=0, scale=0.001),
+    ),
+    (
+        "active_energy_conn2",
+        "d",
+        FieldSpec(("now", "active"), connector=1, scale=0.001),
+    ),
+    ("evse_power", "f", FieldSpec(("evsePower",), scale=0.001)),
+    ("home_power", "f", FieldSpec(("homePower",), scale=0.001)),
+    ("grid_power", "f", FieldSpec(("instPower",), scale=0.001)),
+    ("solar_power", "f", FieldSpec(("fvPower",), scale=0.001)),
+    ("total_power", "f", FieldSpec(("totalPower",), scale=0.001)),
+    ("current_l1", "f", FieldSpec(("totalCurrent", 0), scale=0.001)),
+    ("current_l2", "f", FieldSpec(("totalCurrent", 1), scale=0.001)),
+    ("current_l3", "f", FieldSpec(("totalCurrent", 2), scale=0.001)),
+)
+HISTORY_PLAN = ExtractionPlan((name, field) for name, _, field in HISTORY_COLUMNS)
+_NAMES = tuple(name for name, _, _ in HISTORY_COLUMNS)
+_AGGREGATES = ("min", "mean", "max")
+
+HISTORY_VERSION = 1
+_MAGIC = b"VIARISRH"
+# Magic, version and digest of the layout of every ring, in native byte
+# order like the rest of the buffer, padded to keep the rings aligned.
+_HEADER = struct.Struct("=8sI16s")
+_HEADER_SIZE = 32
+_STATE_SIZE = 8
+
+
+class _Ring:
+    """Rows of fixed-width columns in a circular buffer.
+
+    The ring is laid out in a slice of the history buffer: the index of the
+    next row and the number of rows held, then every column back to back,
+    widest first so every column is aligned. ``columns`` are memoryviews
+    over the buffer, in the order of the appended rows; the oldest row is
+    at ``start``.
+    """
+
+    __slots__ = ("columns", "layout", "rows", "_state")
+
+    def __init__(self, layout: Iterable[tuple[str, str]], rows: int) -> None:
+        """Initialize the ring, which is unusable until attached."""
+        self.layout = tuple(layout)
+        self.rows = rows
+        self.columns: dict[str, memoryview] = {}
+        self._state: memoryview | None = None
+
+    @property
+    def size(self) -> int:
+        """Return the bytes used by the ring."""
+        return _STATE_SIZE + self.rows * sum(
+            struct.calcsize(typecode) for _, typecode in self.layout
+        )
+
+    def attach(self, view: memoryview) -> list[memoryview]:
+        """Lay the ring out in a buffer and return the views created."""
+        self._state = view[:_STATE_SIZE].cast("I")
+        views = [self._state]
+        columns = {}
+        offset = _STATE_SIZE
+        widest_first = sorted(self.layout, key=lambda item: -struct.calcsize(item[1]))
+        for name, typecode in widest_first:
+            end = offset + self.rows * struct.calcsize(typecode)
+            columns[name] = view[offset:end].cast(typecode)
+            views.append(columns[name])
+            offset = end
+        self.columns = {name: columns[name] for name, _ in self.layout}
+        return views
+
+    def __len__(self) -> int:
+        """Return the number of rows held."""
+        return self._state[1]
+
+    @property
+    def start(self) -> int:
+        """Return the index of the oldest row."""
+        state = self._state
+        return (state[0] - state[1]) % self.rows
+
+    def append(self, row: Iterable[float]) -> None:
+        """Store a row, overwriting the oldest one when full."""
+        state = self._state
+        index = state[0]
+        for column, value in zip(self.columns.values(), row):
+            column[index] = value
+        state[0] = (index + 1) % self.rows
+        state[1] = min(state[1] + 1, self.rows)
+
+    def as_dict(self, since: float | None = None) -> dict[str, list[float | None]]:
+        """Return the rows since a time as lists, one per column."""
+        start = self.start
+        indexes = [(start + offset) % self.rows for offset in range(len(self))]
+        if since is not None:
+            timestamps = self.columns["timestamp"]
+            indexes = [index for index in indexes if timestamps[index] >= since]
+        return {
+            name: [
+                None if math.isnan(value := column[index]) else round(value, 3)
+                for index in indexes
+            ]
+            for name, column in self.columns.items()
+        }
+
+
+class _Tier:
+    """Minimum, mean and maximum of every column over fixed intervals.
+
+    Samples are accumulated until one falls in a later interval, then the
+    aggregates of the finished interval are appended to the ring, stamped
+    with the start of the interval.
+    """
+
+    __slots__ = ("ring", "step", "_count", "_max", "_min", "_slot", "_sum")
+
+    def __init__(self, step: int, rows: int) -> None:
+        """Allocate the tier."""
+        self.step = step
+        self.ring = _Ring(
+            (
+                ("timestamp", "d"),
+                *(
+                    (f"{name}_{aggregate}", "f")
+                    for name in _NAMES
+                    for aggregate in _AGGREGATES
+                ),
+            ),
+            rows,
+        )
+        self._slot: int | None = None
+        self._reset()
+
+    def _reset(self) -> None:
+        """Start a new interval."""
+        self._count = [0] * len(_NAMES)
+        self._sum = [0.0] * len(_NAMES)
+        self._min = [math.inf] * len(_NAMES)
+        self._max = [-math.inf] * len(_NAMES)
+
+    def add(self, timestamp: float, values: list[float]) -> None:
+        """Add the values of a sample, NaN when missing."""
+        if (slot := int(timestamp // self.step)) != self._slot:
+            if self._slot is not None:
+                self._flush()
+            self._slot = slot
+        count, total, low, high = self._count, self._sum, self._min, self._max
+        for index, value in enumerate(values):
+            if value != value:
+                continue
+            count[index] += 1
+            total[index] += value
+            if value < low[index]:
+                low[index] = value
+            if value > high[index]:
+                high[index] = value
+
+    def _flush(self) -> None:
+        """Append the aggregates of the finished interval."""
+        row = [self._slot * self.step]
+        for count, total, low, high in zip(
+            self._count, self._sum, self._min, self._max
+        ):
+            if count:
+                row += (low, total / count, high)
+            else:
+                row += (math.nan, math.nan, math.nan)
+        self.ring.append(row)
+        self._reset()
+
+
+def _map(path: Path, size: int, header: bytes) -> mmap.mmap:
+    """Map a history file, emptying it unless its header and size match."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size != size or os.pread(fd, len(header), 0) != header:
+            os.ftruncate(fd, 0)
+            os.ftruncate(fd, size)
+        return mmap.mmap(fd, size)
+    finally:
+        os.close(fd)
+
+
+class RtHistory:
+    """The rt samples of a charger and their aggregates over longer periods.
+
+    The latest ``samples`` samples are kept as received. Every tier keeps
+    the minimum, mean and maximum of each column over intervals of ``step``
+    seconds for its last ``rows`` intervals, updated as samples arrive. All
+    of them have a fixed size. Missing values are stored as NaN and
+    returned as None. Power is in kW, energy in kWh and current in A;
+    timestamps are in seconds since the epoch.
+
+    The rings share one zero-filled buffer behind a small header. With a
+    ``path`` the buffer is a memory-mapped file, so the history survives
+    restarts: a file whose header matches the layout is used as it is,
+    anything else is emptied. Only the interval being aggregated is lost.
+    Appending only writes to memory; ``flush`` and ``close`` write the file
+    to disk and must run in the executor.
+    """
+
+    __slots__ = ("path", "raw", "tiers", "_buffer", "_views")
+
+    def __init__(
+        self,
+        samples: int,
+        tiers: Iterable[tuple[int, int]],
+        path: Path | None = None,
+    ) -> None:
+        """Allocate or map the history."""
+        self.path = path
+        self.raw = _Ring(
+            (
+                ("timestamp", "d"),
+                *((name, typecode) for name, typecode, _ in HISTORY_COLUMNS),
+            ),
+            samples,
+        )
+        self.tiers = {step: _Tier(step, rows) for step, rows in tiers}
+        rings = (self.raw, *(tier.ring for tier in self.tiers.values()))
+        digest = hashlib.blake2b(
+            repr([(ring.layout, ring.rows) for ring in rings]).encode(),
+            digest_size=16,
+        ).digest()
+        header = _HEADER.pack(_MAGIC, HISTORY_VERSION, digest)
+        size = _HEADER_SIZE + sum(ring.size for ring in rings)
+        if path is None:
+            self._buffer: bytearray | mmap.mmap = bytearray(size)
+        else:
+            self._buffer = _map(path, size, header)
+        view = memoryview(self._buffer)
+        view[: len(header)] = header
+        self._views = [view]
+        offset = _HEADER_SIZE
+        for ring in rings:
+            ring_view = view[offset : offset + ring.size]
+            self._views += (ring_view, *ring.attach(ring_view))
+            offset += ring.size
+
+    @property
+    def memory(self) -> int:
+        """Return the size of the buffer in bytes."""
+        return len(self._buffer)
+
+    def ring(self, step: int = 0) -> _Ring:
+        """Return the ring of the raw samples, or of the tier of a step."""
+        if not step:
+            return self.raw
+        return self.tiers[step].ring
+
+    def append(self, timestamp: float, values: dict[str, Any]) -> None:
+        """Store a sample and update the aggregates."""
+        row = [
+            math.nan if (value := values[name]) is None else value for name in _NAMES
+        ]
+        self.raw.append((timestamp, *row))
+        for tier in self.tiers.values():
+            tier.add(timestamp, row)
+
+    def as_dict(
+        self, since: float | None = None, step: int = 0
+    ) -> dict[str, list[float | None]]:
+        """Return the samples, or the aggregates of a tier, since a time."""
+        return self.ring(step).as_dict(since)
+
+    def flush(self) -> None:
+        """Write the changes of a history file to disk."""
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.flush()
+
+    def close(self) -> None:
+        """Release the buffer; a history file is written and stays on disk.
+
+        Writing the file blocks, so this runs in the executor.
+        """
+        self.flush()
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
@@ -5,7 +5,6 @@ from dataclasses import dataclass
 import logging
 
 from homeassistant import config_entries
-from homeassistant.components import mqtt
 from homeassistant.components.number import (
     NumberDeviceClass,
     NumberEntity,
@@ -13,28 +12,22 @@ from homeassistant.components.number import (
     NumberMode,
 )
 from homeassistant.const import UnitOfElectricCurrent, UnitOfTime
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.json import json_dumps
-from homeassistant.util.json import json_loads
 
 from . import ViarisEntityDescription
 from .const import (
     CONF_SERIAL_NUMBER,
     CURRENT_LIMIT_CONN1_KEY,
     CURRENT_LIMIT_CONN2_KEY,
-    MODEL_COMBIPLUS,
+    PERIOD_RT_IDLE_KEY,
     PERIOD_RT_KEY,
     TIMEOUT_RT_KEY,
 )
 from .entity import ViarisEntity
-from .manage_yaml_file import ConfigurationManager
 
 _LOGGER = logging.getLogger(__name__)
 
-numbers_buffer = {}
-
-
 @dataclass
 class ViarisNumberEntityDescription(ViarisEntityDescription, NumberEntityDescription):
     """Number entity description for viaris."""
@@ -65,6 +58,7 @@ NUMBERS: tuple[ViarisNumberEntityDescription, ...] = (
         native_min_value=6,
         mode=NumberMode.SLIDER,
         native_step=0.1,
+        requires="mennekes2",
         translation_key="curr_lim_conn2",
     ),
     ViarisNumberEntityDescription(
@@ -91,6 +85,18 @@ NUMBERS: tuple[ViarisNumberEntityDescription, ...] = (
         native_step=1,
         translation_key="timeout_rt",
     ),
+    ViarisNumberEntityDescription(
+        key=PERIOD_RT_IDLE_KEY,
+        name="Rt frame idle period",
+        device_class=NumberDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        entity_registry_enabled_default=True,
+        disabled=False,
+        native_min_value=0,
+        mode=NumberMode.BOX,
+        native_step=1,
+        translation_key="period_rt_idle",
+    ),
 )
 
 
@@ -100,13 +106,12 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ):
     """Config entry setup."""
-    entities = []
-    for description in NUMBERS:
-        if not description.disabled:
-            entity = ViarisNumber(config_entry, description)
-            entities.append(entity)
-    async_add_entities(entities)
-    numbers_buffer[config_entry.data[CONF_SERIAL_NUMBER]] = entities
+    capabilities = config_entry.runtime_data.capabilities
+    async_add_entities(
+        ViarisNumber(config_entry, description)
+        for description in NUMBERS
+        if not description.disabled and capabilities.supports(description.requires)
+    )
 
 
 class ViarisNumber(ViarisEntity, NumberEntity):
@@ -130,8 +135,6 @@ class ViarisNumber(ViarisEntity, NumberEntity):
         self.max_value_lim = 32
         self.period_max = 1000
         self.timeout_max = 1000
-        self.period  = 3
-        self.timeout = -1
 
     @property
     def available(self) -> bool:
@@ -145,7 +148,7 @@ class ViarisNumber(ViarisEntity, NumberEntity):
     @property
     def native_max_value(self) -> int:
         """Set max value."""
-        if self.entity_description.key == PERIOD_RT_KEY:
+        if self.entity_description.key in (PERIOD_RT_KEY, PERIOD_RT_IDLE_KEY):
             return self.period_max
         if self.entity_description.key == TIMEOUT_RT_KEY:
             return self.timeout_max
@@ -159,59 +162,35 @@ class ViarisNumber(ViarisEntity, NumberEntity):
         if self.entity_description.key == CURRENT_LIMIT_CONN2_KEY:
             return self.current_value_conn2
         if self.entity_description.key == PERIOD_RT_KEY:
-            return self.period
+            return self.coordinator.rt_period
         if self.entity_description.key == TIMEOUT_RT_KEY:
-            return self.timeout
+            return self.coordinator.rt_timeout
+        if self.entity_description.key == PERIOD_RT_IDLE_KEY:
+            return self.coordinator.rt_idle_period
 
     async def async_set_native_value(self, value: int) -> None:
         """Update the current value."""
-        message = json_dumps(
-            {"idTrans": 1, "data": {"stat": {"ampacitySmCh": value * 1000}}}
-        )
+        message = {"data": {"stat": {"ampacitySmCh": value * 1000}}}
+        requests = self.coordinator.requests
         if self.entity_description.key == CURRENT_LIMIT_CONN1_KEY:
-            await mqtt.async_publish(
-                self.hass,
-                self._topic_set_current_conn1,
-                message,
-            )
+            await requests.async_send(self._topics.set_current_conn1, message)
             self.current_value_conn1 = value
         elif self.entity_description.key == CURRENT_LIMIT_CONN2_KEY:
-            if self._model == MODEL_COMBIPLUS:
-                await mqtt.async_publish(
-                    self.hass,
-                    self._topic_set_current_conn2,
-                    message,
-                )
+            await requests.async_send(self._topics.set_current_conn2, message)
             self.current_value_conn2 = value
         elif self.entity_description.key == PERIOD_RT_KEY:
-            self.period = value
+            self.coordinator.rt_period = int(value)
         elif self.entity_description.key == TIMEOUT_RT_KEY:
-            self.timeout = value
+            self.coordinator.rt_timeout = int(value)
+        elif self.entity_description.key == PERIOD_RT_IDLE_KEY:
+            self.coordinator.rt_idle_period = int(value)
+        self.async_write_ha_state()
 
     async def async_added_to_hass(self):
         """Add to hass."""
-        config_manager = ConfigurationManager(self.serial_number)
-        await config_manager.ensure_configuration_file()
-        configuration = await config_manager.load_configuration()
-        self.period = configuration["devices"][self.serial_number]["rt_frame"]["period"]
-        self.timeout = configuration["devices"][self.serial_number]["rt_frame"]["timeout"]
-        if self.entity_description.key in (PERIOD_RT_KEY, TIMEOUT_RT_KEY):
+        if self.entity_description.key in (
+            PERIOD_RT_KEY,
+            TIMEOUT_RT_KEY,
+            PERIOD_RT_IDLE_KEY,
+        ):
             self.set_available(True)
-
-        @callback
-        def mssg_received_rt(message):
-            data = json_loads(message.payload)
-            elements = data.get("data", {}).get("elements", [])
-            if len(elements) > 1:
-                type_connector = data["data"]["elements"][1]["connectorName"]
-                if type_connector in ("schuko", "schuko1", "schuko2"):
-                    if self.entity_description.key == CURRENT_LIMIT_CONN2_KEY:
-                        self.set_available(False)
-            elif self.entity_description.key == CURRENT_LIMIT_CONN2_KEY:
-                self.set_available(False)
-            self.async_write_ha_state()
-
-        await mqtt.async_subscribe(self.hass, self._topic_rt_subs, mssg_received_rt, 0)
-
-    async def async_will_remove_from_hass(self) -> None:
-        """Handle removal from Home Assistant."""
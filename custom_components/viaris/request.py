@@ -0,0 +1,268 @@
+"""Request client for viaris chargers."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from functools import partial
+import logging
+import random
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components import mqtt
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.json import json_dumps
+
+from .const import (
+    REQUEST_BACKOFF,
+    REQUEST_MAX_IN_FLIGHT,
+    REQUEST_RETRIES,
+    REQUEST_TIMEOUT,
+    REQUEST_WINDOW,
+)
+
+if TYPE_CHECKING:
+    from .dispatcher import ViarisDispatcher
+
+_LOGGER = logging.getLogger(__name__)
+
+ID_TRANS_MAX = 0xFFFF
+
+
+def stat_topic(topic: str) -> str:
+    """Return the stat topic a charger answers a get or set topic on."""
+    return topic.replace("/get/0/", "/stat/0/", 1).replace("/set/0/", "/stat/0/", 1)
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    """Mark the exception of a request nobody awaited as retrieved."""
+    if not future.cancelled():
+        future.exception()
+
+
+class _Request:
+    """A request waiting to be sent or answered."""
+
+    __slots__ = (
+        "attempts",
+        "future",
+        "id_trans",
+        "key",
+        "message",
+        "remove_listener",
+        "response_topic",
+        "timer",
+        "topic",
+    )
+
+    def __init__(
+        self,
+        key: tuple[str, str],
+        topic: str,
+        message: dict[str, Any],
+        response_topic: str,
+        future: asyncio.Future,
+    ) -> None:
+        """Initialize the request."""
+        self.key = key
+        self.topic = topic
+        self.message = message
+        self.response_topic = response_topic
+        self.future = future
+        self.attempts = 0
+        self.id_trans = 0
+        self.timer: CALLBACK_TYPE | None = None
+        self.remove_listener: CALLBACK_TYPE | None = None
+
+    def release(self) -> None:
+        """Drop the timer and the response listener."""
+        if self.timer is not None:
+            self.timer()
+            self.timer = None
+        if self.remove_listener is not None:
+            self.remove_listener()
+            self.remove_listener = None
+
+
+class ViarisRequester:
+    """Send requests and commands to one charger.
+
+    Get requests, made with ``async_request``, get their own ``idTrans``
+    and resolve with the first frame carrying that ``idTrans`` on their
+    response topic, by default the ``stat`` topic mirroring the request
+    topic. Frames without an ``idTrans`` are accepted too, as they cannot
+    belong to another request.
+
+    Requests are published after a short collection window; identical
+    requests made during the window, or while the request waits for its
+    reply, share the same future. Unanswered requests are published again
+    up to REQUEST_RETRIES times with an exponential backoff and then fail
+    with TimeoutError. At most REQUEST_MAX_IN_FLIGHT requests are sent at
+    once, the others wait in a queue.
+
+    Set commands, sent with ``async_send``, change the state of the charger
+    and not every firmware answers them, so they are published once, at
+    once, and no reply is awaited.
+    """
+
+    def __init__(self, hass: HomeAssistant, dispatcher: ViarisDispatcher) -> None:
+        """Initialize the requester."""
+        self.hass = hass
+        self.dispatcher = dispatcher
+        self._requests: dict[tuple[str, str], _Request] = {}
+        self._queue: deque[_Request] = deque()
+        self._in_flight = 0
+        self._id_trans = random.randint(1, ID_TRANS_MAX)
+        self._tasks: set[asyncio.Task] = set()
+
+    @callback
+    def async_request(
+        self,
+        topic: str,
+        message: dict[str, Any] | None = None,
+        response_topic: str | None = None,
+    ) -> asyncio.Future[dict[str, Any]]:
+        """Request a frame, joining an identical request in flight.
+
+        ``message`` is the frame to publish without its ``idTrans``.
+        """
+        message = message or {}
+        key = (topic, json_dumps(message))
+        if (request := self._requests.get(key)) is not None:
+            return request.future
+        future = self.hass.loop.create_future()
+        future.add_done_callback(_retrieve_exception)
+        request = _Request(
+            key, topic, message, response_topic or stat_topic(topic), future
+        )
+        self._requests[key] = request
+        request.timer = async_call_later(
+            self.hass, REQUEST_WINDOW, partial(self._async_enqueue, request)
+        )
+        return future
+
+    @callback
+    def async_send(
+        self, topic: str, message: dict[str, Any] | None = None
+    ) -> asyncio.Task[None]:
+        """Publish a command once in a task cancelled on shutdown.
+
+        ``message`` is the frame to publish without its ``idTrans``. The task
+        fails with HomeAssistantError when the command cannot be published.
+        """
+        self._id_trans = self._id_trans % ID_TRANS_MAX + 1
+        task = self.hass.async_create_task(
+            mqtt.async_publish(
+                self.hass,
+                topic,
+                json_dumps({"idTrans": self._id_trans, **(message or {})}),
+            )
+        )
+        task.add_done_callback(_retrieve_exception)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    @callback
+    def _async_enqueue(self, request: _Request, now=None) -> None:
+        """Queue a request once its collection window closed."""
+        request.timer = None
+        self._queue.append(request)
+        self._async_send_next()
+
+    @callback
+    def _async_send_next(self) -> None:
+        """Send queued requests while there is room in flight."""
+        while self._queue and self._in_flight < REQUEST_MAX_IN_FLIGHT:
+            request = self._queue.popleft()
+            if self._requests.get(request.key) is not request:
+                continue
+            self._in_flight += 1
+            self._id_trans = self._id_trans % ID_TRANS_MAX + 1
+            request.id_trans = self._id_trans
+            self._async_start_send(request)
+
+    @callback
+    def _async_start_send(self, request: _Request, now=None) -> None:
+        """Publish a request in a task cancelled on shutdown."""
+        task = self.hass.async_create_task(self._async_send(request))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _async_send(self, request: _Request) -> None:
+        """Publish a request and arm its reply timeout."""
+        request.timer = None
+        if self._requests.get(request.key) is not request:
+            return
+        if request.remove_listener is None:
+            request.remove_listener = self.dispatcher.async_add_listener(
+                request.response_topic,
+                partial(self._async_reply_received, request),
+                repeats=True,
+            )
+        request.attempts += 1
+        request.timer = async_call_later(
+            self.hass, REQUEST_TIMEOUT, partial(self._async_expire, request)
+        )
+        try:
+            await mqtt.async_publish(
+                self.hass,
+                request.topic,
+                json_dumps({"idTrans": request.id_trans, **request.message}),
+            )
+        except HomeAssistantError as err:
+            _LOGGER.debug("Unable to publish %s: %s", request.topic, err)
+            if self._finish(request):
+                request.future.set_exception(err)
+
+    @callback
+    def _async_reply_received(self, request: _Request, data) -> None:
+        """Resolve a request with its reply."""
+        if (
+            isinstance(data, dict)
+            and data.get("idTrans", request.id_trans) != request.id_trans
+        ):
+            return
+        if self._finish(request):
+            request.future.set_result(data)
+
+    @callback
+    def _async_expire(self, request: _Request, now) -> None:
+        """Retry an unanswered request or give up on it."""
+        request.timer = None
+        if request.attempts <= REQUEST_RETRIES:
+            delay = REQUEST_BACKOFF * 2 ** (request.attempts - 1)
+            _LOGGER.debug("No response to %s, retrying in %s s", request.topic, delay)
+            request.timer = async_call_later(
+                self.hass, delay, partial(self._async_start_send, request)
+            )
+            return
+        _LOGGER.debug("No response to %s", request.topic)
+        if self._finish(request):
+            request.future.set_exception(
+                TimeoutError(f"No response to {request.topic}")
+            )
+
+    def _finish(self, request: _Request) -> bool:
+        """Forget a sent request and free its slot."""
+        if self._requests.get(request.key) is not request:
+            return False
+        del self._requests[request.key]
+        request.release()
+        self._in_flight -= 1
+        self._async_send_next()
+        return not request.future.done()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel every pending request."""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        for request in self._requests.values():
+            request.release()
+            request.future.cancel()
+        self._requests.clear()
+        self._queue.clear()
+        self._in_flight = 0
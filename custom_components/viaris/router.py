@@ -0,0 +1,80 @@
+"""Route the MQTT messages of every viaris charger."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from homeassistant.components import mqtt
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DEFAULT_TOPIC_PREFIX
+from .dispatcher import ViarisDispatcher
+from .topics import parse_topic
+
+if TYPE_CHECKING:
+    from .traffic import TrafficCapture
+
+_LOGGER = logging.getLogger(__name__)
+
+STAT_TOPIC = f"{DEFAULT_TOPIC_PREFIX}+/stat/0/+/#"
+
+
+class ViarisRouter:
+    """Receive the stat messages of all chargers from one subscription.
+
+    Messages are routed on the serial number in their topic to the
+    dispatcher of that charger, which looks up the listeners of the topic.
+    The number of broker subscriptions does not grow with the fleet. While
+    a capture is running, routed messages are also appended to it.
+
+    Chargers set up concurrently share the subscription made by the first
+    one; it is dropped when the last charger is unloaded, which also ends
+    a running capture.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the router."""
+        self.hass = hass
+        self._dispatchers: dict[str, ViarisDispatcher] = {}
+        self._unsubscribe: CALLBACK_TYPE | None = None
+        self._subscribe_lock = asyncio.Lock()
+        self.capture: TrafficCapture | None = None
+
+    async def async_add_charger(
+        self, serial_number: str, dispatcher: ViarisDispatcher
+    ) -> CALLBACK_TYPE:
+        """Route the messages of a charger, subscribing on first use."""
+        async with self._subscribe_lock:
+            if self._unsubscribe is None:
+                self._unsubscribe = await mqtt.async_subscribe(
+                    self.hass, STAT_TOPIC, self.async_route, 0, encoding=None
+                )
+            self._dispatchers[serial_number] = dispatcher
+
+        @callback
+        def remove_charger() -> None:
+            """Stop routing the messages of the charger."""
+            if self._dispatchers.get(serial_number) is dispatcher:
+                del self._dispatchers[serial_number]
+            if self._dispatchers:
+                return
+            if self._unsubscribe is not None:
+                self._unsubscribe()
+                self._unsubscribe = None
+            if self.capture is not None:
+                self.capture.async_close()
+                self.capture = None
+
+        return remove_charger
+
+    @callback
+    def async_route(self, message) -> None:
+        """Hand a message over to the dispatcher of its charger."""
+        if (info := parse_topic(message.topic)) is None:
+            return
+        serial_number = info.serial_number
+        if self.capture is not None:
+            self.capture.async_record(serial_number, message)
+        if (dispatcher := self._dispatchers.get(serial_number)) is not None:
+            dispatcher.async_message_received(message)
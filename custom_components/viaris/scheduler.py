@@ -0,0 +1,242 @@
+"""Keep-alive scheduler for the viaris rt stream."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from functools import partial
+import logging
+import random
+import time
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+
+from .const import (
+    CHARGING_STATES,
+    RT_IDLE_HOLD,
+    RT_LEASE_MARGIN,
+    RT_REQUEST_JITTER,
+    RT_STALE_MARGIN,
+)
+from .coordinator import ViarisCoordinator
+from .extract import element_state
+
+_LOGGER = logging.getLogger(__name__)
+
+SCAN_INTERVAL = timedelta(seconds=1)
+
+
+class _RtStream:
+    """Keep-alive state of one charger."""
+
+    __slots__ = (
+        "coordinator",
+        "fast",
+        "jitter",
+        "last_charging",
+        "last_frame",
+        "last_request",
+        "lease_expiry",
+        "pending",
+    )
+
+    def __init__(self, coordinator: ViarisCoordinator) -> None:
+        """Initialize the stream."""
+        self.coordinator = coordinator
+        self.jitter = random.uniform(0, RT_REQUEST_JITTER)
+        self.last_frame = time.monotonic()
+        self.last_charging = self.last_frame
+        self.fast = True
+        self.last_request = 0.0
+        self.lease_expiry = 0.0
+        self.pending: CALLBACK_TYPE | None = None
+
+    @property
+    def consumers(self) -> int:
+        """Return the number of rt consumers.
+
+        A consumer is an enabled entity showing rt values, registered with
+        ``consumer=True``. The scheduler, the rt history and the capability
+        detection only follow the frames that arrive, so they do not keep
+        the stream alive. Disabling the rt entities of a charger therefore
+        stops its lease renewals.
+        """
+        coordinator = self.coordinator
+        return coordinator.dispatcher.consumer_count(coordinator.topics.rt_subs)
+
+    @property
+    def adaptive(self) -> bool:
+        """Return True when the period follows the connector states."""
+        return self.coordinator.rt_idle_period > self.coordinator.rt_period
+
+    @property
+    def period(self) -> int:
+        """Return the rt period to request."""
+        if self.fast or not self.adaptive:
+            return self.coordinator.rt_period
+        return self.coordinator.rt_idle_period
+
+    def update_charging(self, data, monotonic: float) -> bool:
+        """Track the connector states of a frame.
+
+        Return True when the stream must switch between the fast and the
+        idle period. Charging switches to the fast period at once, while
+        the idle period is only used again after no connector has been
+        charging for RT_IDLE_HOLD seconds.
+        """
+        frame = data.get("data") if isinstance(data, dict) else None
+        elements = frame.get("elements") if isinstance(frame, dict) else None
+        if isinstance(elements, list) and any(
+            element_state(element) in CHARGING_STATES for element in elements
+        ):
+            self.last_charging = monotonic
+            if not self.fast:
+                self.fast = True
+                return self.adaptive
+            return False
+        if self.fast and monotonic - self.last_charging > RT_IDLE_HOLD:
+            self.fast = False
+            return self.adaptive
+        return False
+
+    def needs_request(self, monotonic: float) -> bool:
+        """Return True when the charger must be asked to stream."""
+        period = self.period
+        timeout = self.coordinator.rt_timeout
+        last_seen = max(self.last_frame, self.last_request)
+        if monotonic - last_seen > period + RT_STALE_MARGIN:
+            return True
+        if timeout <= 0:
+            return False
+        return monotonic >= self.lease_expiry - min(RT_LEASE_MARGIN, timeout / 2)
+
+
+class ViarisRtScheduler:
+    """Keep the rt stream of every charger alive from a single timer.
+
+    With a positive rt timeout the stream is a lease: chargers are asked to
+    stream for ``timeout`` seconds and the lease is renewed shortly before it
+    expires, but only while some entity consumes the rt frames. Chargers
+    stop streaming on their own when Home Assistant goes away. A timeout of
+    -1 keeps the charger streaming forever, and it is only re-armed when no
+    rt frame arrived for longer than its period plus a margin.
+
+    When the idle period is longer than the rt period, chargers stream at
+    the rt period while a connector is charging and at the idle period
+    otherwise, reconfigured through the rt modulator topic.
+
+    Requests are delayed by a per-charger jitter so chargers due at the same
+    time, e.g. after a broker restart, are not asked in the same instant.
+    They are sent as commands by the request client of the charger, with
+    their own ``idTrans``, and the stream itself shows they were received.
+    Commands are published at once, so renewals never wait behind the get
+    requests in flight and always reach the charger within RT_LEASE_MARGIN.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._streams: dict[str, _RtStream] = {}
+        self._unsub_interval: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add_charger(self, coordinator: ViarisCoordinator) -> CALLBACK_TYPE:
+        """Start keeping the rt stream of a charger alive."""
+        serial_number = coordinator.serial_number
+        stream = _RtStream(coordinator)
+        remove_frame_listener = coordinator.dispatcher.async_add_listener(
+            coordinator.topics.rt_subs,
+            partial(self._async_frame_received, stream),
+            repeats=True,
+        )
+        remove_boot_listener = coordinator.dispatcher.async_add_listener(
+            coordinator.topics.init_boot_sys_subs,
+            partial(self._async_boot_received, stream),
+            repeats=True,
+        )
+        self._streams[serial_number] = stream
+        if self._unsub_interval is None:
+            self._unsub_interval = async_track_time_interval(
+                self.hass, self._async_scan, SCAN_INTERVAL
+            )
+
+        @callback
+        def remove_charger() -> None:
+            """Stop keeping the rt stream alive."""
+            remove_frame_listener()
+            remove_boot_listener()
+            if stream.pending is not None:
+                stream.pending()
+                stream.pending = None
+            self._streams.pop(serial_number, None)
+            if not self._streams and self._unsub_interval is not None:
+                self._unsub_interval()
+                self._unsub_interval = None
+
+        return remove_charger
+
+    @callback
+    def async_request_stream(self, serial_number: str) -> asyncio.Task[None] | None:
+        """Ask a charger to stream now, e.g. after it rebooted.
+
+        Return the task publishing the request, or None when the charger is
+        not set up.
+        """
+        if (stream := self._streams.get(serial_number)) is None:
+            return None
+        if stream.pending is not None:
+            stream.pending()
+            stream.pending = None
+        return self._async_request(stream)
+
+    @callback
+    def _async_frame_received(self, stream: _RtStream, data) -> None:
+        """Record the arrival of an rt frame and follow the connector states."""
+        stream.last_frame = time.monotonic()
+        if stream.update_charging(data, stream.last_frame) and stream.consumers > 0:
+            _LOGGER.debug(
+                "Switching rt period of %s to %s s",
+                stream.coordinator.serial_number,
+                stream.period,
+            )
+            self.async_request_stream(stream.coordinator.serial_number)
+
+    @callback
+    def _async_boot_received(self, stream: _RtStream, data) -> None:
+        """Restart the rt stream after a charger reboot."""
+        if stream.consumers > 0:
+            self.async_request_stream(stream.coordinator.serial_number)
+
+    @callback
+    def _async_scan(self, now=None) -> None:
+        """Schedule a request for every consumed charger that needs one."""
+        monotonic = time.monotonic()
+        for stream in self._streams.values():
+            if (
+                stream.pending is None
+                and stream.consumers > 0
+                and stream.needs_request(monotonic)
+            ):
+                stream.pending = async_call_later(
+                    self.hass, stream.jitter, partial(self._async_request, stream)
+                )
+
+    @callback
+    def _async_request(self, stream: _RtStream, now=None) -> asyncio.Task[None]:
+        """Ask a charger to stream rt frames."""
+        stream.pending = None
+        stream.last_request = time.monotonic()
+        timeout = stream.coordinator.rt_timeout
+        if timeout > 0:
+            stream.lease_expiry = stream.last_request + timeout
+        value = {
+            "data": {
+                "status": True,
+                "period": stream.period,
+                "timeout": timeout,
+            },
+        }
+        _LOGGER.debug("Requesting rt stream of %s", stream.coordinator.serial_number)
+        return stream.coordinator.requests.async_send(
+            stream.coordinator.topics.rt_pub, value
+        )
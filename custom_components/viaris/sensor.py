@@ -1,26 +1,26 @@
 """Platform for sensor integration."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import logging
-from operator import length_hint
-from threading import Event, Thread
-import time
 
 from homeassistant import config_entries
-from homeassistant.components import mqtt
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import UnitOfEnergy, UnitOfPower
+from homeassistant.const import (
+    Platform,
+    UnitOfElectricCurrent,
+    UnitOfEnergy,
+    UnitOfPower,
+)
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.json import json_dumps
-from homeassistant.util.json import json_loads
 
 from . import ViarisEntityDescription
 from .const import (
@@ -28,10 +28,10 @@ from .const import (
     ACTIVE_ENERGY_CONN2_KEY,
     ACTIVE_POWER_CONN1_KEY,
     ACTIVE_POWER_CONN2_KEY,
-    # KVAR_UNITS,
     CONF_SERIAL_NUMBER,
     CONTAX_D0613_KEY,
     CURRENT_MAX_POWER_KEY,
+    DOMAIN,
     GRID_POWER_KEY,
     ETHERNET_KEY,
     EVSE_POWER_KEY,
@@ -43,6 +43,7 @@ from .const import (
     HOME_POWER_KEY,
     HW_POT_VERSION_KEY,
     KEEP_ALIVE_KEY,
+    KVAR_UNITS,
     KVARH_UNITS,
     LIMIT_POWER_KEY,
     MAC_KEY,
@@ -78,233 +79,110 @@ from .const import (
     ChargerStatusCodes,
 )
 from .entity import ViarisEntity
-from .number import numbers_buffer
+from .extract import ExtractionPlan, FieldSpec, element_state
 
 _LOGGER = logging.getLogger(__name__)
 
-last_rt_frame = {}
-
 @dataclass
 class ViarisSensorEntityDescription(ViarisEntityDescription, SensorEntityDescription):
     """Describes Viaris sensor entity."""
 
     domain: str = "sensor"
     precision: int | None = None
-
-
-def get_state_conn1(value) -> str:
-    """Transform codes into a human readable string."""
-    data = json_loads(value)
-
-    if length_hint(data["data"]["elements"]) == 0:
+    deadband: int = 0
+    field: FieldSpec | None = None
+
+
+def value_changed(description: ViarisSensorEntityDescription, old, new) -> bool:
+    """Return True when a new value must be written to the state machine.
+
+    Numeric values of sensors with a precision are compared against a
+    deadband of ``deadband`` steps of the last displayed digit, so jitter
+    below it is not written. The deadband only applies between two
+    non-zero values of the same sign: reaching zero, e.g. when charging
+    stops, or changing sign is always written.
+    """
+    if (
+        description.precision is None
+        or not isinstance(old, (int, float))
+        or not isinstance(new, (int, float))
+        or not old
+        or not new
+        or (old > 0) != (new > 0)
+    ):
+        return new != old
+    step = 10**-description.precision
+    return abs(new - old) >= (description.deadband + 0.5) * step
+
+
+def _connector_status(elements, index) -> str:
+    """Transform the state code of a connector into a human readable string."""
+    if len(elements) <= index:
         return "Disabled"
-    type_connector = data["data"]["elements"][0]["connectorName"]
+    type_connector = elements[index].get("connectorName")
     if type_connector in ("mennekes", "mennekes1", "mennekes2"):
-        connector_name = "mennekes"
-    if type_connector in ("schuko", "schuko1", "schuko2"):
-        connector_name = "schuko"
-    try:
-        return getattr(
-            ChargerStatusCodes,
-            connector_name,
-        )[int(data["data"]["elements"][0]["state"])]
-    except KeyError:
+        codes = ChargerStatusCodes.mennekes
+    elif type_connector in ("schuko", "schuko1", "schuko2"):
+        codes = ChargerStatusCodes.schuko
+    else:
         return "Unknown"
+    return codes.get(element_state(elements[index]), "Unknown")
 
 
-def get_state_conn2(value) -> str:
-    """Transform codes into a human readable string."""
-    data = json_loads(value)
-    if length_hint(data["data"]["elements"]) > 1:
-        type_connector = data["data"]["elements"][1]["connectorName"]
-        if type_connector in ("mennekes", "mennekes1", "mennekes2"):
-            connector_name = "mennekes"
-        if type_connector in ("schuko", "schuko1", "schuko2"):
-            connector_name = "schuko"
-        try:
-            return getattr(
-                ChargerStatusCodes,
-                connector_name,
-            )[int(data["data"]["elements"][1]["state"])]
-        except KeyError:
-            return "Unknown"
-
-    return "Disabled"
-
-
-def get_evse_power(value) -> float:
-    """Extract Evse power."""
-    data = json_loads(value)
-    evse_power = round(float(data["data"]["evsePower"]) / 1000, 2)
-    return evse_power
-
-
-def get_total_power(value) -> float:
-    """Extract total power."""
-    data = json_loads(value)
-    total_power = round(float(data["data"]["totalPower"]) / 1000, 2)
-    return total_power
-
-
-def get_home_power(value) -> float:
-    """Extract home power."""
-    data = json_loads(value)
-    total_power = round(float(data["data"]["homePower"]) / 1000, 2)
-    return total_power
-
-
-def get_rel_overload(value) -> float:
-    """Extract rel overload."""
-    data = json_loads(value)
-    if "data" in data and "relOverload" in data["data"]:
-        rel_overload = round(float(data["data"]["relOverload"]), 2)
-        return rel_overload
-
-
-def get_total_current(value) -> list[str]:
-    """Extract total current."""
-    data = json_loads(value)
-    total_current = [x / 1000 for x in data["data"]["totalCurrent"]]
-    return "[{:.2f}, {:.2f}, {:.2f}] A".format(*total_current)
-
-
-def get_ctx_detected(value) -> str:
-    """Extract contax detected."""
-    data = json_loads(value)
-    if "data" in data and "ctxDetected" in data["data"]:
-        if data["data"]["ctxDetected"] is True:
-            return "enable"
-        return "disable"
-
-
-def get_tmc100_detected(value) -> str:
-    """Extract tmc100 detected."""
-    data = json_loads(value)
-    if "data" in data and "mbusDetected" in data["data"]:
-        if data["data"]["mbusDetected"] is True:
-            return "enable"
-        return "disable"
-
-
-def get_active_power_conn1(value) -> list[str]:
-    """Extract active power connector 1."""
-    # data = json_loads(value)
-    # active_power = round(float(data["data"]["elements"][0]["now"]["aPow"][0] / 1000), 2)
-    data = json_loads(value)
-    active_power = [x / 1000 for x in data["data"]["elements"][0]["now"]["aPow"]]
-    return "[{:.2f}, {:.2f}, {:.2f}] kW".format(*active_power)
-
-    # return active_power
-
-
-def get_active_power_conn2(value) -> list[str]:
-    """Extract active power connector 2."""
-    data = json_loads(value)
-    if length_hint(data["data"]["elements"]) > 1:
-        # active_power = round(
-        # float(data["data"]["elements"][1]["now"]["aPow"][0] / 1000), 2
-        # )
-        # return active_power
-        data = json_loads(value)
-        active_power = [x / 1000 for x in data["data"]["elements"][1]["now"]["aPow"]]
-        return "[{:.2f}, {:.2f}, {:.2f}] kW".format(*active_power)
-
-    # return "disable"
-
-
-def get_reactive_power_conn1(value) -> list[str]:
-    """Extract reactive power connector 1."""
-    # data = json_loads(value)
-    # reactive_power = round(
-    # float(data["data"]["elements"][0]["now"]["rPow"][0] / 1000), 2
-    # )
-    # return reactive_power
-    data = json_loads(value)
-    reactive_power = [x / 1000 for x in data["data"]["elements"][0]["now"]["rPow"]]
-    return "[{:.2f}, {:.2f}, {:.2f}] kVar".format(*reactive_power)
-
-
-def get_reactive_power_conn2(value) -> list[str]:
-    """Extract reactive power connector 2."""
-    data = json_loads(value)
-    if length_hint(data["data"]["elements"]) > 1:
-        # reactive_power = round(
-        # float(data["data"]["elements"][1]["now"]["rPow"][0] / 1000), 2
-        # )
-        # return reactive_power
-        data = json_loads(value)
-        reactive_power = [x / 1000 for x in data["data"]["elements"][0]["now"]["rPow"]]
-        return "[{:.2f}, {:.2f}, {:.2f}] kVar".format(*reactive_power)
-    # return "disable"
-
-
-def get_active_energy_conn1(value) -> float:
-    """Extract active energy connector 1."""
-    data = json_loads(value)
-    active_energy = round(float(data["data"]["elements"][0]["now"]["active"] / 1000), 2)
-    return active_energy
-
-
-def get_active_energy_conn2(value) -> float:
-    """Extract active energy connector 2."""
-    data = json_loads(value)
-    if length_hint(data["data"]["elements"]) > 1:
-        active_energy = round(
-            float(data["data"]["elements"][1]["now"]["active"] / 1000), 2
-        )
-        return active_energy
-    # return 0.0
-
+def get_state_conn1(elements) -> str:
+    """Transform codes of connector 1 into a human readable string."""
+    return _connector_status(elements, 0)
 
-def get_reactive_energy_conn1(value) -> float:
-    """Extract reactive energy connector 1."""
-    data = json_loads(value)
-    reactive_energy = round(
-        float(data["data"]["elements"][0]["now"]["reactive"] / 1000), 2
-    )
-    return reactive_energy
 
+def get_state_conn2(elements) -> str:
+    """Transform codes of connector 2 into a human readable string."""
+    return _connector_status(elements, 1)
 
-def get_reactive_energy_conn2(value) -> float:
-    """Extract reactive energy connector 2."""
-    data = json_loads(value)
-    if length_hint(data["data"]["elements"]) > 1:
-        reactive_energy = round(
-            float(data["data"]["elements"][1]["now"]["reactive"] / 1000), 2
-        )
-        return reactive_energy
 
-    # return 0.0
+def get_detected(value) -> str:
+    """Transform a meter detection flag."""
+    if value is True:
+        return "enable"
+    return "disable"
 
 
-def get_state_solar(value) -> float:
-    """Extract solar + battery power."""
+def sum_phases(values) -> float:
+    """Add up the values of every phase."""
+    return round(sum(values), 2)
 
-    data = json_loads(value)
-    if "fvPower" in value:
-        solar_pw = round(float(data["data"]["fvPower"] / 1000), 2)
-        return solar_pw
-    #return 0.0
 
+def with_phases(
+    description: ViarisSensorEntityDescription,
+) -> tuple[ViarisSensorEntityDescription, ...]:
+    """Return a sensor summing the phases of a value and one sensor per phase.
 
-def get_max_power(value) -> float:
-    """Extract max power."""
-    data = json_loads(value)
-    read_value = round(float(data["data"]["maxPower"] / 1000), 2)
-    return read_value
+    The field of ``description`` points at the list of per-phase values.
+    """
+    field = description.field
+    return (
+        description,
+        *(
+            replace(
+                description,
+                key=f"{description.key}_l{phase + 1}",
+                name=f"{description.name} L{phase + 1}",
+                translation_key=f"{description.translation_key}_l{phase + 1}",
+                field=FieldSpec(
+                    (*field.path, phase),
+                    connector=field.connector,
+                    scale=field.scale,
+                    ndigits=2,
+                ),
+            )
+            for phase in range(3)
+        ),
+    )
 
-def get_grid_power(value) -> float:
-    """Extract grid power."""
-    data = json_loads(value)
-    if "instPower" in value:
-        read_value = round(float(data["data"]["instPower"] / 1000), 2)
-        return read_value
-    #return 0.0
 
 SENSOR_TYPES_RT: tuple[ViarisSensorEntityDescription, ...] = (
     ViarisSensorEntityDescription(
         key=STATE_CONN1_KEY,
-        state=get_state_conn1,
+        field=FieldSpec(("elements",), convert=get_state_conn1),
         name="Status connector 1",
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=True,
@@ -313,11 +191,12 @@ SENSOR_TYPES_RT: tuple[ViarisSensorEntityDescription, ...] = (
     ),
     ViarisSensorEntityDescription(
         key=STATE_CONN2_KEY,
-        state=get_state_conn2,
+        field=FieldSpec(("elements",), convert=get_state_conn2),
         name="Status connector 2",
         entity_category=EntityCategory.DIAGNOSTIC,
         entity_registry_enabled_default=True,
         disabled=False,
+        requires="connector2",
         translation_key="status_con2",
     ),
     ViarisSensorEntityDescription(
@@ -329,7 +208,7 @@ SENSOR_TYPES_RT: tuple[ViarisSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL_INCREASING,
         entity_category=EntityCategory.DIAGNOSTIC,
-        state=get_active_energy_conn1,
+        field=FieldSpec(("now", "active"), connector=0, scale=0.001, ndigits=2),
         translation_key="active_en_con1",
     ),
     ViarisSensorEntityDescription(
@@ -341,7 +220,8 @@ SENSOR_TYPES_RT: tuple[ViarisSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL_INCREASING,
         entity_category=EntityCategory.DIAGNOSTIC,
-        state=get_active_energy_conn2,
+        field=FieldSpec(("now", "active"), connector=1, scale=0.001, ndigits=2),
+        requires="connector2",
         translation_key="active_en_con2",
     ),
     ViarisSensorEntityDescription(
@@ -353,7 +233,7 @@ SENSOR_TYPES_RT: tuple[ViarisSensorEntityDescription, ...] = (
         # device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL_INCREASING,
         entity_category=EntityCategory.DIAGNOSTIC,
-        state=get_reactive_energy_conn1,
+        field=FieldSpec(("now", "reactive"), connector=0, scale=0.001, ndigits=2),
         translation_key="reactive_en_con1",
     ),
     ViarisSensorEntityDescription(
@@ -365,59 +245,75 @@ SENSOR_TYPES_RT: tuple[ViarisSensorEntityDescription, ...] = (
         # device_class=SensorDeviceClass.REACTIVE_ENERGY,
         state_class=SensorStateClass.TOTAL_INCREASING,
         entity_category=EntityCategory.DIAGNOSTIC,
-        state=get_reactive_energy_conn2,
+        field=FieldSpec(("now", "reactive"), connector=1, scale=0.001, ndigits=2),
+        requires="connector2",
         translation_key="reactive_en_con2",
     ),
     ViarisSensorEntityDescription(
         key=EVSE_POWER_KEY,
         name="Evse power",
         precision=2,
+        deadband=1,
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
-        state=get_evse_power,
+        field=FieldSpec(("evsePower",), scale=0.001, ndigits=2),
         translation_key="evse_power",
     ),
-    ViarisSensorEntityDescription(
-        key=TOTAL_CURRENT_KEY,
-        name="Total current",
-        icon="mdi:current-ac",
-        # native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
-        # state_class=SensorStateClass.MEASUREMENT,
-        entity_category=EntityCategory.DIAGNOSTIC,
-        state=get_total_current,
-        translation_key="total_current",
+    *with_phases(
+        ViarisSensorEntityDescription(
+            key=TOTAL_CURRENT_KEY,
+            name="Total current",
+            icon="mdi:current-ac",
+            precision=2,
+            deadband=1,
+            native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+            device_class=SensorDeviceClass.CURRENT,
+            state_class=SensorStateClass.MEASUREMENT,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            field=FieldSpec(("totalCurrent",), scale=0.001, convert=sum_phases),
+            requires="main_meter",
+            translation_key="total_current",
+        )
     ),
     ViarisSensorEntityDescription(
         key=HOME_POWER_KEY,
         name="Home power",
+        precision=2,
+        deadband=1,
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
-        state=get_home_power,
+        field=FieldSpec(("homePower",), scale=0.001, ndigits=2),
+        requires="main_meter",
         translation_key="home_power",
     ),
     ViarisSensorEntityDescription(
         key=TOTAL_POWER_KEY,
         name="Total power",
+        precision=2,
+        deadband=1,
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
-        state=get_total_power,
+        field=FieldSpec(("totalPower",), scale=0.001, ndigits=2),
         translation_key="total_power",
     ),
     ViarisSensorEntityDescription(
         key=FV_POWER_KEY,
         icon="mdi:solar-power-variant",
         name="Solar and battery power",
+        precision=2,
+        deadband=1,
         entity_category=EntityCategory.DIAGNOSTIC,
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         entity_registry_enabled_default=True,
-        state=get_state_solar,
+        field=FieldSpec(("fvPower",), scale=0.001, ndigits=2),
         disabled=False,
+        requires="solar",
         translation_key="fv_power",
     ),
     ViarisSensorEntityDescription(
@@ -425,7 +321,7 @@ SENSOR_TYPES_RT: tuple[ViarisSensorEntityDescription, ...] = (
         name="Secondary meter",
         icon="mdi:meter-electric",
         entity_category=None,
-        state=get_tmc100_detected,
+        field=FieldSpec(("mbusDetected",), convert=get_detected),
         translation_key="secondary_meter",
     ),
     ViarisSensorEntityDescription(
@@ -433,7 +329,7 @@ SENSOR_TYPES_RT: tuple[ViarisSensorEntityDescription, ...] = (
         name="Main meter",
         icon="mdi:meter-electric-outline",
         entity_category=None,
-        state=get_ctx_detected,
+        field=FieldSpec(("ctxDetected",), convert=get_detected),
         translation_key="main_meter",
     ),
     ViarisSensorEntityDescription(
@@ -442,60 +338,98 @@ SENSOR_TYPES_RT: tuple[ViarisSensorEntityDescription, ...] = (
         icon="mdi:checkbox-blank-circle",
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
-        state=get_rel_overload,
+        field=FieldSpec(("relOverload",), ndigits=2),
         translation_key="overload",
     ),
-    ViarisSensorEntityDescription(
-        key=ACTIVE_POWER_CONN1_KEY,
-        name="Active power connector 1",
-        # native_unit_of_measurement=UnitOfPower.KILO_WATT,
-        # device_class=SensorDeviceClass.POWER,
-        icon="mdi:flash",
-        # state_class=SensorStateClass.MEASUREMENT,
-        entity_category=EntityCategory.DIAGNOSTIC,
-        state=get_active_power_conn1,
-        translation_key="active_pw_con1",
+    *with_phases(
+        ViarisSensorEntityDescription(
+            key=ACTIVE_POWER_CONN1_KEY,
+            name="Active power connector 1",
+            icon="mdi:flash",
+            precision=2,
+            deadband=1,
+            native_unit_of_measurement=UnitOfPower.KILO_WATT,
+            device_class=SensorDeviceClass.POWER,
+            state_class=SensorStateClass.MEASUREMENT,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            field=FieldSpec(
+                ("now", "aPow"),
+                connector=0,
+                scale=0.001,
+                convert=sum_phases,
+            ),
+            translation_key="active_pw_con1",
+        )
     ),
-    ViarisSensorEntityDescription(
-        key=ACTIVE_POWER_CONN2_KEY,
-        name="Active power connector 2",
-        # native_unit_of_measurement=UnitOfPower.KILO_WATT,
-        # device_class=SensorDeviceClass.POWER,
-        # state_class=SensorStateClass.MEASUREMENT,
-        icon="mdi:flash",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        state=get_active_power_conn2,
-        translation_key="active_pw_con2",
+    *with_phases(
+        ViarisSensorEntityDescription(
+            key=ACTIVE_POWER_CONN2_KEY,
+            name="Active power connector 2",
+            icon="mdi:flash",
+            precision=2,
+            deadband=1,
+            native_unit_of_measurement=UnitOfPower.KILO_WATT,
+            device_class=SensorDeviceClass.POWER,
+            state_class=SensorStateClass.MEASUREMENT,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            field=FieldSpec(
+                ("now", "aPow"),
+                connector=1,
+                scale=0.001,
+                convert=sum_phases,
+            ),
+            requires="connector2",
+            translation_key="active_pw_con2",
+        )
     ),
-    ViarisSensorEntityDescription(
-        key=REACTIVE_POWER_CONN2_KEY,
-        icon="mdi:flash",
-        name="Reactive power connector 2",
-        # native_unit_of_measurement=KVAR_UNITS,
-        # device_class=SensorDeviceClass.REACTIVE_POWER,
-        # state_class=SensorStateClass.MEASUREMENT,
-        entity_category=EntityCategory.DIAGNOSTIC,
-        state=get_reactive_power_conn2,
-        translation_key="reactive_pw_con2",
+    *with_phases(
+        ViarisSensorEntityDescription(
+            key=REACTIVE_POWER_CONN2_KEY,
+            name="Reactive power connector 2",
+            icon="mdi:flash",
+            precision=2,
+            deadband=1,
+            native_unit_of_measurement=KVAR_UNITS,
+            state_class=SensorStateClass.MEASUREMENT,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            field=FieldSpec(
+                ("now", "rPow"),
+                connector=1,
+                scale=0.001,
+                convert=sum_phases,
+            ),
+            requires="connector2",
+            translation_key="reactive_pw_con2",
+        )
     ),
-    ViarisSensorEntityDescription(
-        key=REACTIVE_POWER_CONN1_KEY,
-        icon="mdi:flash",
-        name="Reactive power connector 1",
-        # native_unit_of_measurement=KVAR_UNITS,
-        # device_class=SensorDeviceClass.REACTIVE_POWER,
-        # state_class=SensorStateClass.MEASUREMENT,
-        entity_category=EntityCategory.DIAGNOSTIC,
-        state=get_reactive_power_conn1,
-        translation_key="reactive_pw_con1",
+    *with_phases(
+        ViarisSensorEntityDescription(
+            key=REACTIVE_POWER_CONN1_KEY,
+            name="Reactive power connector 1",
+            icon="mdi:flash",
+            precision=2,
+            deadband=1,
+            native_unit_of_measurement=KVAR_UNITS,
+            state_class=SensorStateClass.MEASUREMENT,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            field=FieldSpec(
+                ("now", "rPow"),
+                connector=0,
+                scale=0.001,
+                convert=sum_phases,
+            ),
+            translation_key="reactive_pw_con1",
+        )
     ),
     ViarisSensorEntityDescription(
         key=CURRENT_MAX_POWER_KEY,
         name="Current max power",
+        precision=2,
+        deadband=1,
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
-        state=get_max_power,
+        field=FieldSpec(("maxPower",), scale=0.001, ndigits=2),
         entity_category=None,
         entity_registry_enabled_default=True,
         disabled=False,
@@ -504,32 +438,32 @@ SENSOR_TYPES_RT: tuple[ViarisSensorEntityDescription, ...] = (
     ViarisSensorEntityDescription(
         key=GRID_POWER_KEY,
         name="Grid power",
+        precision=2,
+        deadband=1,
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
-        state=get_grid_power,
+        field=FieldSpec(("instPower",), scale=0.001, ndigits=2),
         entity_category=None,
         entity_registry_enabled_default=True,
         disabled=False,
+        requires="main_meter",
         translation_key="grid_pw",
     ),
 )
 
-def get_user_connector1(value) -> str:
+
+def get_user_connector1(data) -> str:
     """Extract user connector1."""
-    data = json_loads(value)
-    if data["data"]["name"] == "mennekes" or data["data"]["name"] == "mennekes1":
-        read_value = data["data"]["stat"]["user"]
-        return read_value
+    if data.get("name") in ("mennekes", "mennekes1"):
+        return data.get("stat", {}).get("user")
     return "Unknown"
 
 
-def get_user_connector2(value) -> str:
+def get_user_connector2(data) -> str:
     """Extract user connector2."""
-    data = json_loads(value)
-    if data["data"]["name"] == "mennekes2":
-        read_value = data["data"]["stat"]["user"]
-        return read_value
+    if data.get("name") == "mennekes2":
+        return data.get("stat", {}).get("user")
     return "Unknown"
 
 
@@ -539,7 +473,7 @@ SENSOR_TYPES_MENNEKES1: tuple[ViarisSensorEntityDescription, ...] = (
         name="User connector 1",
         icon="mdi:account-card",
         entity_category=EntityCategory.DIAGNOSTIC,
-        state=get_user_connector1,
+        field=FieldSpec((), convert=get_user_connector1),
         translation_key="user_con1",
     ),
 )
@@ -549,215 +483,37 @@ SENSOR_TYPES_MENNEKES2: tuple[ViarisSensorEntityDescription, ...] = (
         name="User connector 2",
         icon="mdi:account-card",
         entity_category=EntityCategory.DIAGNOSTIC,
-        state=get_user_connector2,
+        field=FieldSpec((), convert=get_user_connector2),
+        requires="mennekes2",
         translation_key="user_con2",
     ),
 )
 
 
-def get_firmware_app(value) -> str:
-    """Extract firmware application."""
-    data = json_loads(value)
-    read_value = data["data"]["fwv"]
-    return read_value
-
-
-def get_hardware_version(value) -> str:
-    """Extract hardware version."""
-    data = json_loads(value)
-    read_value = data["data"]["hwv"]
-    return read_value
-
-
-def get_fw_pot_version(value) -> str:
-    """Extract fw power version."""
-    data = json_loads(value)
-    read_value = data["data"]["fwv_pot"]
-    return read_value
-
-
-def get_fw_cortex_version(value) -> str:
-    """Extract fw cortex version."""
-    data = json_loads(value)
-    read_value = data["data"]["fwv_cortex"]
-    return read_value
-
-
-def get_hw_pot_version(value) -> str:
-    """Extract hw power version."""
-    data = json_loads(value)
-    read_value = data["data"]["hwv_pot"]
-    return read_value
-
-
-def get_schuko_present(value) -> str:
+def get_schuko_present(data) -> str:
     """Extract schuko present."""
-    data = json_loads(value)
-    if data["data"]["model"] == "VIARIS COMBIPLUS":
+    if data.get("model") == "VIARIS COMBIPLUS":
         return "Unknown"
-    read_value = data["data"]["schuko"]
-    if read_value is True:
+    if data.get("schuko") is True:
         return "Yes"
-
     return "No"
 
 
-def get_rfid(value) -> str:
-    """Extract rfid enable."""
-    data = json_loads(value)
-    read_value = data["data"]["rfid"]
-    if read_value is True:
-        return "Enable"
-    return "Disable"
-
-
-def get_ethernet(value) -> str:
-    """Extract ethernet enable."""
-    data = json_loads(value)
-    read_value = data["data"]["ethernet"]
-    if read_value is True:
-        return "Enable"
-    return "Disable"
-
-
-def get_spl(value) -> str:
-    """Extract spl enable."""
-    data = json_loads(value)
-    read_value = data["data"]["spl"]
-    if read_value is True:
-        return "Enable"
-
-    return "Disable"
-
-
-def get_ocpp(value) -> str:
-    """Extract ocpp enable."""
-    data = json_loads(value)
-    read_value = data["data"]["ocpp"]
-    if read_value is True:
-        return "Enable"
-    return "Disable"
-
-
-def get_solar(value) -> str:
-    """Extract solar enable."""
-    data = json_loads(value)
-    read_value = data["data"]["solar"]
-    if read_value is True:
-        return "Enable"
-
-    return "Disable"
-
-
-def get_modbus(value) -> str:
-    """Extract modbus enable."""
-    data = json_loads(value)
-    read_value = data["data"]["modbus"]
-    if read_value is True:
+def get_enabled(value) -> str:
+    """Transform a feature flag."""
+    if value is True:
         return "Enable"
     return "Disable"
 
 
-def get_serial(value) -> str:
-    """Extract serial number."""
-    data = json_loads(value)
-    read_value = data["data"]["serial"]
-    return read_value
-
-
-def get_model(value) -> str:
-    """Extract model."""
-    data = json_loads(value)
-    read_value = data["data"]["model"]
-    return read_value
-
-
-def get_mac(value) -> str:
-    """Extract mac."""
-    data = json_loads(value)
-    read_value = data["data"]["mac"]
-    return read_value
-
-
-def get_max_power(value) -> float:
-    """Extract max power."""
-    data = json_loads(value)
-    read_value = round(float(data["data"]["maxPower"] / 1000), 2)
-    return read_value
-
-
-def get_limit_power(value) -> float:
-    """Extract max power."""
-    data = json_loads(value)
-    read_value = round(float(data["data"]["limitPower"] / 1000), 2)
-    return read_value
-
-
-def get_selector_power(value) -> float:
-    """Extract max power."""
-    data = json_loads(value)
-    read_value = round(float(data["data"]["selectorPower"] / 1000), 2)
-    return read_value
-
-
 SENSOR_TYPES_CONFIG: tuple[ViarisSensorEntityDescription, ...] = (
-    ViarisSensorEntityDescription(
-        key=FIRMWARE_APP_KEY,
-        icon="mdi:content-save",
-        name="Firmware application version",
-        entity_category=None,
-        entity_registry_enabled_default=True,
-        state=get_firmware_app,
-        disabled=False,
-        translation_key="fw_app",
-    ),
-    ViarisSensorEntityDescription(
-        key=HARDWARE_VERSION_KEY,
-        icon="mdi:select-inverse",
-        name="Hardware version",
-        entity_category=None,
-        entity_registry_enabled_default=True,
-        state=get_hardware_version,
-        disabled=False,
-        translation_key="hd_version",
-    ),
-    ViarisSensorEntityDescription(
-        key=FW_POT_VERSION_KEY,
-        icon="mdi:content-save",
-        name="Firmware power version",
-        entity_category=None,
-        entity_registry_enabled_default=True,
-        state=get_fw_pot_version,
-        disabled=False,
-        translation_key="fw_pw_version",
-    ),
-    ViarisSensorEntityDescription(
-        key=HW_POT_VERSION_KEY,
-        icon="mdi:select-inverse",
-        name="Hardware power version",
-        entity_category=None,
-        entity_registry_enabled_default=True,
-        state=get_hw_pot_version,
-        disabled=False,
-        translation_key="hd_pot_version",
-    ),
-    ViarisSensorEntityDescription(
-        key=FW_CORTEX_VERSION_KEY,
-        icon="mdi:content-save",
-        name="Firmware cortex version",
-        entity_category=None,
-        entity_registry_enabled_default=True,
-        state=get_fw_cortex_version,
-        disabled=False,
-        translation_key="fw_cortex_version",
-    ),
     ViarisSensorEntityDescription(
         key=SCHUKO_KEY,
         icon="mdi:power-socket-de",
         name="Schuko present",
         entity_category=None,
         entity_registry_enabled_default=True,
-        state=get_schuko_present,
+        field=FieldSpec((), convert=get_schuko_present),
         disabled=False,
         translation_key="schuko_present",
     ),
@@ -767,7 +523,7 @@ SENSOR_TYPES_CONFIG: tuple[ViarisSensorEntityDescription, ...] = (
         name="Rfid",
         entity_category=None,
         entity_registry_enabled_default=True,
-        state=get_rfid,
+        field=FieldSpec(("rfid",), convert=get_enabled),
         disabled=False,
         translation_key="rfid",
     ),
@@ -777,7 +533,7 @@ SENSOR_TYPES_CONFIG: tuple[ViarisSensorEntityDescription, ...] = (
         name="Ethernet",
         entity_category=None,
         entity_registry_enabled_default=True,
-        state=get_ethernet,
+        field=FieldSpec(("ethernet",), convert=get_enabled),
         disabled=False,
         translation_key="ethernet",
     ),
@@ -787,7 +543,7 @@ SENSOR_TYPES_CONFIG: tuple[ViarisSensorEntityDescription, ...] = (
         name="Spl",
         entity_category=None,
         entity_registry_enabled_default=True,
-        state=get_spl,
+        field=FieldSpec(("spl",), convert=get_enabled),
         disabled=False,
         translation_key="spl",
     ),
@@ -797,7 +553,7 @@ SENSOR_TYPES_CONFIG: tuple[ViarisSensorEntityDescription, ...] = (
         name="Ocpp",
         entity_category=None,
         entity_registry_enabled_default=True,
-        state=get_ocpp,
+        field=FieldSpec(("ocpp",), convert=get_enabled),
         disabled=False,
         translation_key="ocpp",
     ),
@@ -807,7 +563,7 @@ SENSOR_TYPES_CONFIG: tuple[ViarisSensorEntityDescription, ...] = (
         name="Modbus",
         entity_category=None,
         entity_registry_enabled_default=True,
-        state=get_modbus,
+        field=FieldSpec(("modbus",), convert=get_enabled),
         disabled=False,
         translation_key="modbus",
     ),
@@ -817,40 +573,10 @@ SENSOR_TYPES_CONFIG: tuple[ViarisSensorEntityDescription, ...] = (
         name="Solar",
         entity_category=None,
         entity_registry_enabled_default=True,
-        state=get_solar,
+        field=FieldSpec(("solar",), convert=get_enabled),
         disabled=False,
         translation_key="solar",
     ),
-    ViarisSensorEntityDescription(
-        key=SERIAL_KEY,
-        icon="mdi:ev-station",
-        name="Serial",
-        entity_category=None,
-        entity_registry_enabled_default=True,
-        state=get_serial,
-        disabled=False,
-        translation_key="serial_number",
-    ),
-    ViarisSensorEntityDescription(
-        key=MODEL_KEY,
-        icon="mdi:ev-station",
-        name="Model",
-        entity_category=None,
-        entity_registry_enabled_default=True,
-        state=get_model,
-        disabled=False,
-        translation_key="model",
-    ),
-    ViarisSensorEntityDescription(
-        key=MAC_KEY,
-        icon="mdi:checkbox-marked-outline",
-        name="Mac",
-        entity_category=None,
-        entity_registry_enabled_default=True,
-        state=get_mac,
-        disabled=False,
-        translation_key="mac",
-    ),
     ViarisSensorEntityDescription(
         key=MAX_POWER_KEY,
         name="Max power",
@@ -858,7 +584,7 @@ SENSOR_TYPES_CONFIG: tuple[ViarisSensorEntityDescription, ...] = (
         entity_category=None,
         entity_registry_enabled_default=True,
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
-        state=get_max_power,
+        field=FieldSpec(("maxPower",), scale=0.001, ndigits=2),
         disabled=False,
         translation_key="max_power",
     ),
@@ -869,7 +595,7 @@ SENSOR_TYPES_CONFIG: tuple[ViarisSensorEntityDescription, ...] = (
         entity_category=None,
         entity_registry_enabled_default=True,
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
-        state=get_limit_power,
+        field=FieldSpec(("limitPower",), scale=0.001, ndigits=2),
         disabled=False,
         translation_key="limit_power",
     ),
@@ -880,62 +606,13 @@ SENSOR_TYPES_CONFIG: tuple[ViarisSensorEntityDescription, ...] = (
         entity_category=None,
         entity_registry_enabled_default=True,
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
-        state=get_selector_power,
+        field=FieldSpec(("selectorPower",), scale=0.001, ndigits=2),
         disabled=False,
         translation_key="selector_power",
     ),
 )
 
 
-def get_mqtt_keep_alive(value) -> int:
-    """Extract keep alive."""
-    data = json_loads(value)
-    read_value = data["data"]["cfg"]["keepAlive"]
-    return read_value
-
-
-def get_mqtt_port(value) -> int:
-    """Extract mqtt port."""
-    data = json_loads(value)
-    read_value = data["data"]["cfg"]["mqttPort"]
-    return read_value
-
-
-def get_mqtt_client(value) -> str:
-    """Extract mqtt client."""
-    data = json_loads(value)
-    read_value = data["data"]["cfg"]["mqttClientId"]
-    return read_value
-
-
-def get_mqtt_qos(value) -> int:
-    """Extract qos."""
-    data = json_loads(value)
-    read_value = data["data"]["cfg"]["qos"]
-    return read_value
-
-
-def get_mqtt_user(value) -> str:
-    """Extract mqtt user."""
-    data = json_loads(value)
-    read_value = data["data"]["cfg"]["mqttUser"]
-    return read_value
-
-
-def get_mqtt_ping(value) -> int:
-    """Extract ping interval."""
-    data = json_loads(value)
-    read_value = data["data"]["cfg"]["pingInterval"]
-    return read_value
-
-
-def get_mqtt_url(value) -> str:
-    """Extract MQTT URL."""
-    data = json_loads(value)
-    read_value = data["data"]["cfg"]["mqttUrl"]
-    return read_value
-
-
 SENSOR_TYPES_MQTT: tuple[ViarisSensorEntityDescription, ...] = (
     ViarisSensorEntityDescription(
         key=KEEP_ALIVE_KEY,
@@ -943,7 +620,7 @@ SENSOR_TYPES_MQTT: tuple[ViarisSensorEntityDescription, ...] = (
         name="Mqtt keep alive",
         entity_category=None,
         entity_registry_enabled_default=True,
-        state=get_mqtt_keep_alive,
+        field=FieldSpec(("cfg", "keepAlive")),
         disabled=False,
         translation_key="keep_alive",
     ),
@@ -953,7 +630,7 @@ SENSOR_TYPES_MQTT: tuple[ViarisSensorEntityDescription, ...] = (
         name="Mqtt port",
         entity_category=None,
         entity_registry_enabled_default=True,
-        state=get_mqtt_port,
+        field=FieldSpec(("cfg", "mqttPort")),
         disabled=False,
         translation_key="port",
     ),
@@ -963,7 +640,7 @@ SENSOR_TYPES_MQTT: tuple[ViarisSensorEntityDescription, ...] = (
         name="Mqtt QoS",
         entity_category=None,
         entity_registry_enabled_default=True,
-        state=get_mqtt_qos,
+        field=FieldSpec(("cfg", "qos")),
         translation_key="QoS",
         disabled=False,
     ),
@@ -973,7 +650,7 @@ SENSOR_TYPES_MQTT: tuple[ViarisSensorEntityDescription, ...] = (
         name="Mqtt client Id",
         entity_category=None,
         entity_registry_enabled_default=True,
-        state=get_mqtt_client,
+        field=FieldSpec(("cfg", "mqttClientId")),
         translation_key="client",
         disabled=False,
     ),
@@ -983,7 +660,7 @@ SENSOR_TYPES_MQTT: tuple[ViarisSensorEntityDescription, ...] = (
         name="Mqtt user",
         entity_category=None,
         entity_registry_enabled_default=True,
-        state=get_mqtt_user,
+        field=FieldSpec(("cfg", "mqttUser")),
         translation_key="user",
         disabled=False,
     ),
@@ -993,7 +670,7 @@ SENSOR_TYPES_MQTT: tuple[ViarisSensorEntityDescription, ...] = (
         name="Mqtt ping interval",
         entity_category=None,
         entity_registry_enabled_default=True,
-        state=get_mqtt_ping,
+        field=FieldSpec(("cfg", "pingInterval")),
         translation_key="ping",
         disabled=False,
     ),
@@ -1003,43 +680,129 @@ SENSOR_TYPES_MQTT: tuple[ViarisSensorEntityDescription, ...] = (
         name="Mqtt URL",
         entity_category=None,
         entity_registry_enabled_default=True,
-        state=get_mqtt_url,
+        field=FieldSpec(("cfg", "mqttUrl")),
         translation_key="url",
         disabled=False,
     ),
 )
 
 
+def _compile_plan(
+    descriptions: tuple[ViarisSensorEntityDescription, ...]
+) -> ExtractionPlan:
+    """Compile the extraction plan of a frame type."""
+    return ExtractionPlan(
+        (description.key, description.field)
+        for description in descriptions
+        if description.field is not None
+    )
+
+
+# Sensors of older versions for values now shown on the device.
+DEVICE_INFO_KEYS = (
+    FIRMWARE_APP_KEY,
+    HARDWARE_VERSION_KEY,
+    FW_POT_VERSION_KEY,
+    HW_POT_VERSION_KEY,
+    FW_CORTEX_VERSION_KEY,
+    SERIAL_KEY,
+    MODEL_KEY,
+    MAC_KEY,
+)
+
+RT_PLAN = _compile_plan(SENSOR_TYPES_RT)
+MENNEKES1_PLAN = _compile_plan(SENSOR_TYPES_MENNEKES1)
+MENNEKES2_PLAN = _compile_plan(SENSOR_TYPES_MENNEKES2)
+CONFIG_PLAN = _compile_plan(SENSOR_TYPES_CONFIG)
+MQTT_PLAN = _compile_plan(SENSOR_TYPES_MQTT)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: config_entries.ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Viaris method."""
+    serial_number = entry.data[CONF_SERIAL_NUMBER]
+    capabilities = entry.runtime_data.capabilities
+    registry = er.async_get(hass)
+    for key in DEVICE_INFO_KEYS:
+        unique_id = f"{serial_number}-sensor-{key}-0".lower()
+        if entity_id := registry.async_get_entity_id(
+            Platform.SENSOR, DOMAIN, unique_id
+        ):
+            registry.async_remove(entity_id)
     async_add_entities(
-        ViarisSensorConfig(entry, description) for description in SENSOR_TYPES_CONFIG
+        ViarisSensorConfig(entry, description)
+        for description in SENSOR_TYPES_CONFIG
+        if capabilities.supports(description.requires)
     )
     async_add_entities(
         ViarisSensorMennekes(entry, description)
         for description in SENSOR_TYPES_MENNEKES1
+        if capabilities.supports(description.requires)
     )
     async_add_entities(
-        ViarisSensorMqttCfg(entry, description) for description in SENSOR_TYPES_MQTT
+        ViarisSensorMqttCfg(entry, description)
+        for description in SENSOR_TYPES_MQTT
+        if capabilities.supports(description.requires)
     )
     async_add_entities(
-        ViarisSensorRt(entry, description) for description in SENSOR_TYPES_RT
+        ViarisSensorRt(entry, description)
+        for description in SENSOR_TYPES_RT
+        if capabilities.supports(description.requires)
     )
     async_add_entities(
         ViarisSensorMennekes2(entry, description)
         for description in SENSOR_TYPES_MENNEKES2
+        if capabilities.supports(description.requires)
     )
 
 
-class ViarisSensorRt(ViarisEntity, SensorEntity):
+class ViarisSensor(ViarisEntity, SensorEntity):
+    """Common viaris sensor fed by extraction plan values."""
+
+    entity_description: ViarisSensorEntityDescription
+
+    @property
+    def available(self) -> bool:
+        """Return True if entity is available."""
+        return self._attr_native_value is not None
+
+    @callback
+    def _async_values_received(self, values) -> None:
+        """Handle the values extracted from a frame."""
+        self._async_set_native_value(values[self.entity_description.key])
+
+    @callback
+    def _async_listen(self, topic: str, plan: ExtractionPlan) -> None:
+        """Listen to the frames of a topic, starting from the latest one.
+
+        The latest frame may have been restored from the snapshot, in which
+        case the sensor has a value before the charger answers.
+        """
+        self.async_on_remove(
+            self.coordinator.dispatcher.async_add_listener(
+                topic, self._async_values_received, plan=plan, consumer=True
+            )
+        )
+        if (frame := self.coordinator.last_frame(topic)) is not None:
+            self._async_values_received(plan.extract(frame))
+
+    @callback
+    def _async_set_native_value(self, value) -> None:
+        """Write the state only when the value changed."""
+        if not value_changed(self.entity_description, self._attr_native_value, value):
+            self.coordinator.suppressed_writes += 1
+            return
+        self._attr_native_value = value
+        self.async_write_ha_state()
+
+
+class ViarisSensorRt(ViarisSensor):
     """Representation of the Viaris portal."""
 
     entity_description: ViarisSensorEntityDescription
-    thread_rt = {}
 
     def __init__(
         self,
@@ -1051,98 +814,36 @@ class ViarisSensorRt(ViarisEntity, SensorEntity):
 
         self.entity_description = description
         self.serial_number = config_entry.data[CONF_SERIAL_NUMBER]
-        self.stop_event = Event()
-        last_rt_frame[self.serial_number] = time.monotonic()
-
-    def send_rt_frame_periodically(self):
-        """Set rt frame."""
-        while not self.stop_event.is_set():
-            if self.serial_number in numbers_buffer:
-                period_value = 3
-                timeout_value = -1
-                for entity in numbers_buffer[self.serial_number]:
-                    if (
-                        entity.entity_id
-                        == f"number.{self.serial_number.lower()}_period_rt"
-                    ):
-                        period_value = entity.state
-                    elif (
-                        entity.entity_id
-                        == f"number.{self.serial_number.lower()}_timeout_rt"
-                    ):
-                        timeout_value = entity.state
-                value = {
-                    "idTrans": 0,
-                    "data": {
-                        "status": True,
-                        "period": period_value,
-                        "timeout": timeout_value,
-                    },
-                }
-                value_json = json_dumps(value)
-                if(time.monotonic() - last_rt_frame[self.serial_number]  > period_value + 2):
-                    mqtt.publish(self.hass, self._topic_rt_pub, value_json)
-                    last_rt_frame[self.serial_number] = time.monotonic()
-                time.sleep(1)
-        if self.stop_event.is_set():
-            del ViarisSensorRt.thread_rt[self.serial_number]
 
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self._attr_native_value is not None
-
-    def stop_thread(self):
-        """Stop thread."""
-        self.stop_event.set()
-
-    async def async_will_remove_from_hass(self) -> None:
-        """Handle removal from Home Assistant."""
-        if self.serial_number in ViarisSensorRt.thread_rt:
-            self.stop_thread()
+    @callback
+    def _async_rt_values_received(self, values) -> None:
+        """Handle the values extracted from an rt frame."""
+        value = values[self.entity_description.key]
+        if (
+            self.entity_description.key in (STATE_CONN1_KEY, STATE_CONN2_KEY)
+            and value is not None
+            and value != "Disabled"
+            and value != self._attr_native_value
+        ):
+            if value[0:6] != "Schuko":
+                self._attr_icon = "mdi:ev-plug-type2"
+            else:
+                self._attr_icon = "mdi:power-socket-de"
+        self._async_set_native_value(value)
 
     async def async_added_to_hass(self) -> None:
         """Publish start rt and subscribe MQTT events."""
-        if self.serial_number not in ViarisSensorRt.thread_rt:
-            ViarisSensorRt.thread_rt[self.serial_number] = Thread(
-                target=self.send_rt_frame_periodically
+        self.async_on_remove(
+            self.coordinator.dispatcher.async_add_listener(
+                self._topics.rt_subs,
+                self._async_rt_values_received,
+                plan=RT_PLAN,
+                consumer=True,
             )
-            ViarisSensorRt.thread_rt[self.serial_number].start()
-
-        @callback
-        def message_received_rt(message):
-            """Handle new MQTT messages."""
-
-            if self.entity_description.state is not None:
-                self._attr_native_value = self.entity_description.state(message.payload)
-            else:
-                self._attr_native_value = message.payload
-
-            if self.entity_description.key == STATE_CONN1_KEY:
-                if self._attr_native_value != "Disabled":
-                    if self._attr_native_value[0:6] != "Schuko":
-                        self._attr_icon = "mdi:ev-plug-type2"
-                    else:
-                        self._attr_icon = "mdi:power-socket-de"
-
-            if self.entity_description.key == STATE_CONN2_KEY:
-                if self._attr_native_value != "Disabled":
-                    if self._attr_native_value[0:6] != "Schuko":
-                        self._attr_icon = "mdi:ev-plug-type2"
-                    else:
-                        self._attr_icon = "mdi:power-socket-de"
-            last_rt_frame[self.serial_number] = time.monotonic()
-            self.async_write_ha_state()
-
-        await mqtt.async_subscribe(
-            self.hass, self._topic_rt_subs, message_received_rt, 0
         )
-        value = {"idTrans": 2}
-        value_json = json_dumps(value)
-        await mqtt.async_publish(self.hass, self._topic_boot_sys_pub, value_json)
 
 
-class ViarisSensorConfig(ViarisEntity, SensorEntity):
+class ViarisSensorConfig(ViarisSensor):
     """Representation of the Viaris portal."""
 
     entity_description: ViarisSensorEntityDescription
@@ -1158,58 +859,18 @@ class ViarisSensorConfig(ViarisEntity, SensorEntity):
         self.entity_description = description
         self.serial_number = config_entry.data[CONF_SERIAL_NUMBER]
 
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self._attr_native_value is not None
-
     async def async_added_to_hass(self) -> None:
-        """Publish boot sys and subscribe MQTT events."""
-
-        @callback
-        def message_received_boot_sys(message):
-            """Handle new MQTT messages."""
-            topic = message.topic.split("/")
-            if topic[6] == "init_boot":
-                if self.serial_number in numbers_buffer:
-                    period_value = 3
-                    timeout_value = -1
-                    value = {
-                        "idTrans": 0,
-                        "data": {
-                            "status": True,
-                            "period": period_value,
-                            "timeout": timeout_value,
-                        },
-                    }
-                    value_json = json_dumps(value)
-                    mqtt.publish(self.hass, self._topic_rt_pub, value_json)
-
-            if self.entity_description.state is not None:
-                self._attr_native_value = self.entity_description.state(message.payload)
+        """Subscribe MQTT events."""
 
-            else:
-                self._attr_native_value = message.payload
-
-            self.async_write_ha_state()
-
-        await mqtt.async_subscribe(
-            self.hass, self._topic_init_boot_sys_subs, message_received_boot_sys, 1
-        )
-        await mqtt.async_subscribe(
-            self.hass, self._topic_boot_sys_subs, message_received_boot_sys, 0
-        )
-
-        value = {"idTrans": 0}
-        value_json = json_dumps(value)
-        await mqtt.async_publish(self.hass, self._topic_evsm_mennekes_pub, value_json)
+        self._async_listen(self._topics.init_boot_sys_subs, CONFIG_PLAN)
+        self._async_listen(self._topics.boot_sys_subs, CONFIG_PLAN)
 
         # value = {"idTrans": 0}
         # value_json = json_dumps(value)
-        # await mqtt.async_publish(self.hass, self._topic_evsm_schuko_pub, value_json)
+        # await mqtt.async_publish(self.hass, self._topics.evsm_schuko_pub, value_json)
 
 
-class ViarisSensorMennekes(ViarisEntity, SensorEntity):
+class ViarisSensorMennekes(ViarisSensor):
     """Representation of the Viaris portal."""
 
     entity_description: ViarisSensorEntityDescription
@@ -1224,54 +885,17 @@ class ViarisSensorMennekes(ViarisEntity, SensorEntity):
 
         self.entity_description = description
 
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self._attr_native_value is not None
-
     async def async_added_to_hass(self) -> None:
-        """Publish mennekes and subscribe MQTT events."""
+        """Subscribe MQTT events."""
 
-        @callback
-        def message_received_mennekes_schuko(message):
-            """Handle new MQTT messages."""
-            if self.entity_description.state is not None:
-                self._attr_native_value = self.entity_description.state(message.payload)
-            else:
-                self._attr_native_value = message.payload
+        for topic in (
+            self._topics.evsm_mennekes_subs,
+            self._topics.evsm_menek_value_subs,
+        ):
+            self._async_listen(topic, MENNEKES1_PLAN)
 
-            self.async_write_ha_state()
 
-        await mqtt.async_subscribe(
-            self.hass,
-            self._topic_evsm_mennekes_subs,
-            message_received_mennekes_schuko,
-            0,
-        )
-        await mqtt.async_subscribe(
-            self.hass,
-            self._topic_evsm_menek_value_subs,
-            message_received_mennekes_schuko,
-            0,
-        )
-        # await mqtt.async_subscribe(
-        # self.hass, self._topic_evsm_schuko_subs, message_received_mennekes_schuko, 0
-        # )
-        # await mqtt.async_subscribe(
-        # self.hass,
-        # self._topic_evsm_schuko_value_subs,
-        # message_received_mennekes_schuko,
-        # 0,
-        # )
-        if self._model == MODEL_COMBIPLUS:
-            value = {"idTrans": 0}
-            value_json = json_dumps(value)
-            await mqtt.async_publish(
-                self.hass, self._topic_evsm_mennekes2_pub, value_json
-            )
-
-
-class ViarisSensorMennekes2(ViarisEntity, SensorEntity):
+class ViarisSensorMennekes2(ViarisSensor):
     """Representation of the Viaris portal."""
 
     entity_description: ViarisSensorEntityDescription
@@ -1286,46 +910,18 @@ class ViarisSensorMennekes2(ViarisEntity, SensorEntity):
 
         self.entity_description = description
 
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self._attr_native_value is not None
-
     async def async_added_to_hass(self) -> None:
-        """Publish mennekes and subscribe MQTT events."""
-
-        @callback
-        def message_received_mennekes2(message):
-            """Handle new MQTT messages."""
-            if self.entity_description.state is not None:
-                self._attr_native_value = self.entity_description.state(message.payload)
-
-            else:
-                self._attr_native_value = message.payload
-
-            self.async_write_ha_state()
+        """Subscribe MQTT events."""
 
         if self._model == MODEL_COMBIPLUS:
-            await mqtt.async_subscribe(
-                self.hass,
-                self._topic_evsm_mennekes2_subs,
-                message_received_mennekes2,
-                0,
-            )
-            await mqtt.async_subscribe(
-                self.hass,
-                self._topic_evsm_menek2_value_subs,
-                message_received_mennekes2,
-                0,
-            )
-            value = {"idTrans": 0}
-            value_json = json_dumps(value)
-            await mqtt.async_publish(
-                self.hass, self._topic_evsm_mennekes2_pub, value_json
-            )
+            for topic in (
+                self._topics.evsm_mennekes2_subs,
+                self._topics.evsm_menek2_value_subs,
+            ):
+                self._async_listen(topic, MENNEKES2_PLAN)
 
 
-class ViarisSensorMqttCfg(ViarisEntity, SensorEntity):
+class ViarisSensorMqttCfg(ViarisSensor):
     """Representation of the Viaris portal."""
 
     entity_description: ViarisSensorEntityDescription
@@ -1340,28 +936,7 @@ class ViarisSensorMqttCfg(ViarisEntity, SensorEntity):
 
         self.entity_description = description
 
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self._attr_native_value is not None
-
     async def async_added_to_hass(self) -> None:
-        """Publish mqtt config and subscribe MQTT events."""
-
-        @callback
-        def message_received_mqtt_cfg(message):
-            """Handle new MQTT messages."""
-            if self.entity_description.state is not None:
-                self._attr_native_value = self.entity_description.state(message.payload)
-
-            else:
-                self._attr_native_value = message.payload
-
-            self.async_write_ha_state()
+        """Subscribe MQTT events."""
 
-        await mqtt.async_subscribe(
-            self.hass, self._topic_mqtt_subs, message_received_mqtt_cfg, 0
-        )
-        value = {"idTrans": 0}
-        value_json = json_dumps(value)
-        await mqtt.async_publish(self.hass, self._topic_mqtt_pub, value_json)
+        self._async_listen(self._topics.mqtt_subs, MQTT_PLAN)
@@ -0,0 +1,167 @@
+"""Services of the viaris integration."""
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+import time
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+
+from .const import (
+    ATTR_FILENAME,
+    ATTR_MINUTES,
+    ATTR_SPEED,
+    ATTR_STEP,
+    CAPTURE_DIR,
+    CONF_SERIAL_NUMBER,
+    DATA_ROUTER,
+    DOMAIN,
+    HISTORY_MINUTES,
+    HISTORY_TIERS,
+    SERVICE_GET_RT_HISTORY,
+    SERVICE_REPLAY_CAPTURE,
+    SERVICE_START_CAPTURE,
+    SERVICE_STOP_CAPTURE,
+)
+from .coordinator import ViarisCoordinator
+from .router import ViarisRouter
+from .traffic import TrafficCapture, async_replay
+
+
+def _filename(value) -> str:
+    """Validate a capture file name, which must not contain a directory."""
+    value = cv.string(value)
+    if not value or Path(value).name != value:
+        raise vol.Invalid("Expected a file name without directory")
+    return value
+
+
+START_CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_SERIAL_NUMBER): cv.string,
+        vol.Optional(ATTR_FILENAME): _filename,
+    }
+)
+REPLAY_CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_FILENAME): _filename,
+        vol.Optional(ATTR_SPEED, default=1): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+    }
+)
+GET_RT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_SERIAL_NUMBER): cv.string,
+        vol.Optional(ATTR_MINUTES, default=HISTORY_MINUTES): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional(ATTR_STEP, default=0): vol.All(
+            vol.Coerce(int), vol.In([0, *(step for step, _ in HISTORY_TIERS)])
+        ),
+    }
+)
+
+
+def _router(hass: HomeAssistant) -> ViarisRouter:
+    """Return the router, which exists once a charger was set up."""
+    if (router := hass.data.get(DATA_ROUTER)) is None:
+        raise HomeAssistantError("No viaris charger is set up")
+    return router
+
+
+def _coordinator(hass: HomeAssistant, serial_number: str) -> ViarisCoordinator:
+    """Return the coordinator of a loaded charger."""
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if (
+            entry.data[CONF_SERIAL_NUMBER] == serial_number
+            and entry.state is ConfigEntryState.LOADED
+        ):
+            return entry.runtime_data
+    raise ServiceValidationError(f"Charger {serial_number} is not set up")
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def async_start_capture(call: ServiceCall) -> ServiceResponse:
+        """Start appending the charger traffic to a capture."""
+        router = _router(hass)
+        if router.capture is not None:
+            raise ServiceValidationError(
+                f"A capture is already running: {router.capture.path.name}"
+            )
+        filename = call.data.get(
+            ATTR_FILENAME, f"{datetime.now():%Y%m%d-%H%M%S}.vcap"
+        )
+        path = Path(hass.config.path(CAPTURE_DIR, filename))
+        capture = TrafficCapture(hass, path, call.data.get(CONF_SERIAL_NUMBER))
+        capture.async_start()
+        router.capture = capture
+        return {"path": str(path)}
+
+    async def async_stop_capture(call: ServiceCall) -> ServiceResponse:
+        """Stop the running capture."""
+        router = _router(hass)
+        if (capture := router.capture) is None:
+            raise ServiceValidationError("No capture is running")
+        router.capture = None
+        await capture.async_stop()
+        return {"path": str(capture.path), "messages": capture.messages}
+
+    async def async_replay_capture(call: ServiceCall) -> ServiceResponse:
+        """Replay a capture into the integration."""
+        path = Path(hass.config.path(CAPTURE_DIR, call.data[ATTR_FILENAME]))
+        try:
+            messages = await async_replay(
+                hass, _router(hass), path, call.data[ATTR_SPEED]
+            )
+        except (OSError, ValueError) as err:
+            raise HomeAssistantError(f"Unable to replay {path}: {err}") from err
+        return {"messages": messages}
+
+    async def async_get_rt_history(call: ServiceCall) -> ServiceResponse:
+        """Return the latest rt samples or aggregates of a charger."""
+        coordinator = _coordinator(hass, call.data[CONF_SERIAL_NUMBER])
+        since = time.time() - call.data[ATTR_MINUTES] * 60
+        return coordinator.history.as_dict(since, call.data[ATTR_STEP])
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_CAPTURE,
+        async_start_capture,
+        schema=START_CAPTURE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_CAPTURE,
+        async_stop_capture,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REPLAY_CAPTURE,
+        async_replay_capture,
+        schema=REPLAY_CAPTURE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_RT_HISTORY,
+        async_get_rt_history,
+        schema=GET_RT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,234 @@
+"""Persistent settings of viaris chargers."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DATA_STORE,
+    DEFAULT_RT_IDLE_PERIOD,
+    DEFAULT_RT_PERIOD,
+    DEFAULT_RT_TIMEOUT,
+    DOMAIN,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+LEGACY_YAML_NAME = "configuration_viaris.yaml"
+
+RT_FRAME_DEFAULTS = {
+    "period": DEFAULT_RT_PERIOD,
+    "timeout": DEFAULT_RT_TIMEOUT,
+    "idle_period": DEFAULT_RT_IDLE_PERIOD,
+}
+
+
+def _rt_frame(values: Any) -> dict[str, int]:
+    """Return valid rt frame settings, falling back to the defaults."""
+    rt_frame = dict(RT_FRAME_DEFAULTS)
+    if not isinstance(values, dict):
+        return rt_frame
+    for key in rt_frame:
+        try:
+            rt_frame[key] = int(float(values[key]))
+        except (KeyError, TypeError, ValueError):
+            pass
+    return rt_frame
+
+
+def _snapshot(values: Any) -> dict[str, dict[str, Any]]:
+    """Return the valid frames of a snapshot."""
+    if not isinstance(values, dict):
+        return {}
+    return {
+        name: frame
+        for name, frame in values.items()
+        if isinstance(frame, dict) and {"time", "hash", "data"} <= frame.keys()
+    }
+
+
+def _capabilities(values: Any) -> dict[str, bool] | None:
+    """Return the valid capabilities, None when unknown."""
+    if not isinstance(values, dict):
+        return None
+    return {name: value for name, value in values.items() if isinstance(value, bool)}
+
+
+def _load_legacy_yaml(path: Path) -> dict[str, Any] | None:
+    """Read the settings written by older versions, if any."""
+    import yaml  # pylint: disable=import-outside-toplevel
+
+    if not path.exists():
+        return None
+    try:
+        with path.open(encoding="utf-8") as file:
+            legacy = yaml.safe_load(file)
+    except (OSError, yaml.YAMLError) as err:
+        _LOGGER.warning("Unable to migrate %s: %s", path, err)
+        return None
+    if not isinstance(legacy, dict):
+        _LOGGER.warning("Unable to migrate %s: not a mapping", path)
+        return None
+    return legacy
+
+
+def _retire_legacy_yaml(path: Path) -> None:
+    """Rename a migrated legacy file so it is not migrated again."""
+    try:
+        path.replace(path.with_name(f"{path.name}.migrated"))
+    except OSError as err:
+        _LOGGER.warning("Unable to rename %s: %s", path, err)
+
+
+class ViarisStore:
+    """Settings of every charger, kept in memory and saved in the background.
+
+    The store is read once, when the first charger is set up, and changes
+    are written with a delay through a Home Assistant JSON store, which
+    replaces the file atomically. The settings of older versions are
+    migrated from their YAML file, which was written relative to the
+    working directory, i.e. usually in the configuration directory. The
+    file is read at every load until it was migrated, then renamed.
+    Settings already in the store win over the migrated ones.
+
+    Besides the rt frame settings, the store keeps a snapshot of the latest
+    configuration and status frames of each charger, so their values are
+    known as soon as Home Assistant starts, and the capabilities detected
+    from them, so the entities of a charger are created without waiting.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, DOMAIN)
+        self._devices: dict[str, dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load the settings, migrating the legacy YAML file once."""
+        async with self._lock:
+            if self._loaded:
+                return
+            data = await self._store.async_load() or {"devices": {}}
+            migrated = []
+            for path in self._legacy_yaml_paths():
+                legacy = await self.hass.async_add_executor_job(
+                    _load_legacy_yaml, path
+                )
+                if legacy is None:
+                    continue
+                _LOGGER.info("Migrating %s", path)
+                if isinstance(devices := legacy.get("devices"), dict):
+                    for serial_number, device in devices.items():
+                        data["devices"].setdefault(serial_number, device)
+                migrated.append(path)
+            self._devices = {
+                serial_number: {
+                    "rt_frame": _rt_frame(device.get("rt_frame")),
+                    "snapshot": _snapshot(device.get("snapshot")),
+                    "capabilities": _capabilities(device.get("capabilities")),
+                }
+                for serial_number, device in data["devices"].items()
+                if isinstance(device, dict)
+            }
+            if migrated:
+                await self._store.async_save(self._data_to_save())
+                for path in migrated:
+                    await self.hass.async_add_executor_job(_retire_legacy_yaml, path)
+            self._loaded = True
+
+    def _legacy_yaml_paths(self) -> list[Path]:
+        """Return where older versions may have written their settings."""
+        paths = [
+            Path(self.hass.config.path("custom_components", DOMAIN, LEGACY_YAML_NAME)),
+            Path(__file__).parent / LEGACY_YAML_NAME,
+        ]
+        return list(dict.fromkeys(paths))
+
+    @callback
+    def rt_frame(self, serial_number: str) -> dict[str, int]:
+        """Return the rt frame settings of a charger."""
+        if (device := self._devices.get(serial_number)) is None:
+            return dict(RT_FRAME_DEFAULTS)
+        return dict(device["rt_frame"])
+
+    @callback
+    def snapshot(self, serial_number: str) -> dict[str, dict[str, Any]]:
+        """Return the snapshot of the frames of a charger."""
+        if (device := self._devices.get(serial_number)) is None:
+            return {}
+        return dict(device["snapshot"])
+
+    @callback
+    def capabilities(self, serial_number: str) -> dict[str, bool] | None:
+        """Return the capabilities of a charger, None when not detected yet."""
+        if (device := self._devices.get(serial_number)) is None:
+            return None
+        return device["capabilities"]
+
+    @callback
+    def _device(self, serial_number: str) -> dict[str, Any]:
+        """Return the settings of a charger, creating them when needed."""
+        return self._devices.setdefault(
+            serial_number,
+            {"rt_frame": dict(RT_FRAME_DEFAULTS), "snapshot": {}, "capabilities": None},
+        )
+
+    @callback
+    def async_set_rt_frame(self, serial_number: str, **values: int) -> None:
+        """Update the rt frame settings of a charger."""
+        device = self._device(serial_number)
+        rt_frame = _rt_frame({**device["rt_frame"], **values})
+        if rt_frame != device["rt_frame"]:
+            device["rt_frame"] = rt_frame
+            self._async_schedule_save()
+
+    @callback
+    def async_set_snapshot_frame(
+        self, serial_number: str, name: str, frame: dict[str, Any]
+    ) -> None:
+        """Update a frame of the snapshot of a charger."""
+        self._device(serial_number)["snapshot"][name] = frame
+        self._async_schedule_save()
+
+    @callback
+    def async_set_capabilities(
+        self, serial_number: str, capabilities: dict[str, bool]
+    ) -> None:
+        """Update the capabilities of a charger."""
+        device = self._device(serial_number)
+        if capabilities != device["capabilities"]:
+            device["capabilities"] = dict(capabilities)
+            self._async_schedule_save()
+
+    @callback
+    def async_remove_device(self, serial_number: str) -> None:
+        """Forget the settings of a charger."""
+        if self._devices.pop(serial_number, None) is not None:
+            self._async_schedule_save()
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Save the settings once changes settled."""
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to save."""
+        return {"devices": self._devices}
+
+
+async def async_get_store(hass: HomeAssistant) -> ViarisStore:
+    """Return the loaded store shared by every charger."""
+    if (store := hass.data.get(DATA_STORE)) is None:
+        store = hass.data[DATA_STORE] = ViarisStore(hass)
+    await store.async_load()
+    return store
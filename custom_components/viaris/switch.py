@@ -5,11 +5,9 @@ from dataclasses import dataclass
 import logging
 
 from homeassistant import config_entries
-from homeassistant.components import mqtt
 from homeassistant.components.switch import SwitchEntity, SwitchEntityDescription
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import EntityCategory
-from homeassistant.helpers.json import json_dumps
 
 from . import ViarisEntityDescription
 from .const import CONF_SERIAL_NUMBER, START_STOP_CONN1_KEY, START_STOP_CONN2_KEY
@@ -45,6 +43,7 @@ SWITCHES: tuple[ViarisSwitchEntityDescription, ...] = (
         entity_registry_enabled_default=True,
         icon="mdi:flash",
         disabled=False,
+        requires="connector2",
         translation_key="start_stop_con2",
     ),
 )
@@ -56,10 +55,11 @@ async def async_setup_entry(
     async_add_entities,
 ):
     """Config entry setup."""
+    capabilities = config_entry.runtime_data.capabilities
     async_add_entities(
         ViarisSwitch(config_entry, description)
         for description in SWITCHES
-        if not description.disabled
+        if not description.disabled and capabilities.supports(description.requires)
     )
 
 
@@ -67,7 +67,6 @@ class ViarisSwitch(ViarisEntity, SwitchEntity):
     """Representation of a Viaris switch."""
 
     entity_description: ViarisSwitchEntityDescription
-    sensor_thread = None
 
     def __init__(
         self,
@@ -97,83 +96,36 @@ class ViarisSwitch(ViarisEntity, SwitchEntity):
         """Return true if we do optimistic updates."""
         return self._optimistic
 
+    async def _async_send_action(self, action: int) -> None:
+        """Ask the charger to start or stop charging."""
+        if self.entity_description.key == START_STOP_CONN1_KEY:
+            topic = self._topics.startstop_conn1_pub
+        else:
+            topic = self._topics.startstop_conn2_pub
+        message = {
+            "header": {"timestamp": 1665381726837, "heapFree": 0},
+            "data": {
+                "uid": 1,
+                "source": "app",
+                "priority": 0,
+                "action": action,
+                "user": "",
+                "group": 0,
+            },
+        }
+        await self.coordinator.requests.async_send(topic, message)
+        if self._optimistic:
+            # Optimistically assume that switch has changed state.
+            self._attr_is_on = bool(action)
+        self.async_write_ha_state()
+
     async def async_turn_on(self, **kwargs):
         """Turn the switch on."""
-        self.entity_description.payload_on = json_dumps(
-            {
-                "idTrans": 49685,
-                "header": {"timestamp": 1665381726837, "heapFree": 0},
-                "data": {
-                    "uid": 1,
-                    "source": "app",
-                    "priority": 0,
-                    "action": 1,
-                    "user": "",
-                    "group": 0,
-                },
-            }
-        )
-        if self.entity_description.key == START_STOP_CONN1_KEY:
-            await mqtt.async_publish(
-                self.hass,
-                self._topic_startstop_conn1_pub,
-                self.entity_description.payload_on,
-            )
-
-            if self._optimistic:
-                # Optimistically assume that switch has changed state.
-                self._attr_is_on = True
-            self.async_write_ha_state()
-        elif self.entity_description.key == START_STOP_CONN2_KEY:
-            await mqtt.async_publish(
-                self.hass,
-                self._topic_startstop_conn2_pub,
-                self.entity_description.payload_on,
-            )
-
-            if self._optimistic:
-                # Optimistically assume that switch has changed state.
-                self._attr_is_on = True
-            self.async_write_ha_state()
+        await self._async_send_action(1)
 
     async def async_turn_off(self, **kwargs):
         """Turn the switch off."""
-        self.entity_description.payload_off = json_dumps(
-            {
-                "idTrans": 49685,
-                "header": {"timestamp": 1665381726837, "heapFree": 0},
-                "data": {
-                    "uid": 1,
-                    "source": "app",
-                    "priority": 0,
-                    "action": 0,
-                    "user": "",
-                    "group": 0,
-                },
-            }
-        )
-        if self.entity_description.key == START_STOP_CONN1_KEY:
-            await mqtt.async_publish(
-                self.hass,
-                self._topic_startstop_conn1_pub,
-                self.entity_description.payload_off,
-            )
-
-            if self._optimistic:
-                # Optimistically assume that switch has changed state.
-                self._attr_is_on = False
-            self.async_write_ha_state()
-        elif self.entity_description.key == START_STOP_CONN2_KEY:
-            await mqtt.async_publish(
-                self.hass,
-                self._topic_startstop_conn2_pub,
-                self.entity_description.payload_off,
-            )
-
-            if self._optimistic:
-                # Optimistically assume that switch has changed state.
-                self._attr_is_on = False
-            self.async_write_ha_state()
+        await self._async_send_action(0)
 
     async def async_added_to_hass(self):
         """Add to hass."""
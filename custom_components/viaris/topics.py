@@ -0,0 +1,155 @@
+"""MQTT topics of viaris chargers."""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, NamedTuple
+
+from .const import (
+    DEFAULT_TOPIC_PREFIX,
+    MODEL_COMBIPLUS,
+    MODEL_UNI,
+    SERIAL_PREFIX_UNI,
+)
+
+# Connector a topic suffix refers to, per connector name.
+CONNECTORS = {
+    "mennekes": 1,
+    "mennekes1": 1,
+    "mennekes2": 2,
+    "schuko": 2,
+}
+# Parsed topics kept; a fleet has a few dozen topics per charger.
+PARSED_TOPICS = 8192
+
+
+def model_from_serial(serial_number: str) -> str:
+    """Return the model of a charger from its serial number."""
+    if serial_number[0:5] == SERIAL_PREFIX_UNI:
+        return MODEL_UNI
+    return MODEL_COMBIPLUS
+
+
+class TopicInfo(NamedTuple):
+    """What an incoming topic refers to."""
+
+    serial_number: str
+    family: str
+    connector: int | None
+
+
+@lru_cache(maxsize=PARSED_TOPICS)
+def parse_topic(topic: str) -> TopicInfo | None:
+    """Map a charger topic back to its serial number, family and connector.
+
+    The family is the part of the topic after the serial number, without
+    the connector name, e.g. ``value/evsm`` for ``.../value/evsm/mennekes2``.
+    Return None for topics that do not belong to a charger. Results are
+    cached, as every message of a topic is parsed.
+    """
+    if not topic.startswith(DEFAULT_TOPIC_PREFIX):
+        return None
+    parts = topic[len(DEFAULT_TOPIC_PREFIX) :].split("/")
+    if len(parts) < 5:
+        return None
+    serial_number = parts[3]
+    suffix = parts[4:]
+    if (connector := CONNECTORS.get(suffix[-1])) is not None:
+        suffix = suffix[:-1]
+    return TopicInfo(serial_number, "/".join(suffix), connector)
+
+
+class ViarisTopics:
+    """Immutable table of the topics of one charger.
+
+    Built once per charger and shared by its coordinator and entities.
+    Topics of the second mennekes connector are None on UNI chargers.
+    """
+
+    __slots__ = (
+        "boot_sys_pub",
+        "boot_sys_subs",
+        "evsm_menek2_value_subs",
+        "evsm_menek_value_subs",
+        "evsm_mennekes2_pub",
+        "evsm_mennekes2_subs",
+        "evsm_mennekes_pub",
+        "evsm_mennekes_subs",
+        "get_conf_conn1",
+        "get_conf_conn2",
+        "init_boot_sys_subs",
+        "model",
+        "mqtt_pub",
+        "mqtt_subs",
+        "rt_pub",
+        "rt_subs",
+        "serial_number",
+        "set_current_conn1",
+        "set_current_conn2",
+        "startstop_conn1_pub",
+        "startstop_conn2_pub",
+        "stat_conf_conn1",
+        "stat_conf_conn2",
+    )
+
+    def __init__(self, serial_number: str) -> None:
+        """Build the topics of a charger."""
+        model = model_from_serial(serial_number)
+        base = f"{DEFAULT_TOPIC_PREFIX}0{serial_number[-5:]}"
+        get = f"{base}/get/0/{serial_number}/"
+        set_ = f"{base}/set/0/{serial_number}/"
+        stat = f"{base}/stat/0/{serial_number}/"
+        if model == MODEL_UNI:
+            conn1, conn2 = "mennekes", "schuko"
+        else:
+            conn1, conn2 = "mennekes1", "mennekes2"
+        combiplus = model == MODEL_COMBIPLUS
+        init = object.__setattr__
+        init(self, "serial_number", serial_number)
+        init(self, "model", model)
+        init(self, "rt_pub", f"{set_}rt/modulator")
+        init(self, "rt_subs", f"{stat}streamrt/modulator")
+        init(self, "boot_sys_pub", f"{get}boot/sys")
+        init(self, "boot_sys_subs", f"{stat}boot/sys")
+        init(self, "init_boot_sys_subs", f"{stat}init_boot/sys")
+        init(self, "mqtt_pub", f"{get}cfg/mqtt_user")
+        init(self, "mqtt_subs", f"{stat}cfg/mqtt_user")
+        init(self, "evsm_mennekes_pub", f"{get}value/evsm/{conn1}")
+        init(self, "evsm_mennekes_subs", f"{stat}evt/evsm/{conn1}")
+        init(self, "evsm_menek_value_subs", f"{stat}value/evsm/{conn1}")
+        init(
+            self,
+            "evsm_mennekes2_pub",
+            f"{get}value/evsm/{conn2}" if combiplus else None,
+        )
+        init(
+            self,
+            "evsm_mennekes2_subs",
+            f"{stat}evt/evsm/{conn2}" if combiplus else None,
+        )
+        init(
+            self,
+            "evsm_menek2_value_subs",
+            f"{stat}value/evsm/{conn2}" if combiplus else None,
+        )
+        init(self, "startstop_conn1_pub", f"{set_}request/reqman/{conn1}")
+        init(self, "startstop_conn2_pub", f"{set_}request/reqman/{conn2}")
+        init(self, "set_current_conn1", f"{set_}value/{conn1}")
+        init(self, "set_current_conn2", f"{set_}value/{conn2}" if combiplus else None)
+        init(self, "get_conf_conn1", f"{set_}cfg/{conn1}")
+        init(self, "get_conf_conn2", f"{set_}cfg/{conn2}" if combiplus else None)
+        init(self, "stat_conf_conn1", f"{stat}cfg/{conn1}")
+        init(self, "stat_conf_conn2", f"{stat}cfg/{conn2}" if combiplus else None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Refuse to change a topic."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        """Refuse to remove a topic."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+
+@lru_cache(maxsize=None)
+def get_topics(serial_number: str) -> ViarisTopics:
+    """Return the shared topic table of a charger."""
+    return ViarisTopics(serial_number)
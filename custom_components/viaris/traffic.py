@@ -0,0 +1,142 @@
+"""Record and replay the MQTT traffic of viaris chargers."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+from datetime import timedelta
+from itertools import islice
+import logging
+from pathlib import Path
+import time
+from typing import NamedTuple
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .capture import CapturedMessage, append_records, encode_record, read_capture
+from .const import CAPTURE_FLUSH_INTERVAL, CAPTURE_FLUSH_RECORDS
+from .router import ViarisRouter
+
+_LOGGER = logging.getLogger(__name__)
+
+# Messages read from a capture at a time while replaying it.
+REPLAY_BATCH = 100
+
+
+class ReplayedMessage(NamedTuple):
+    """A message fed to the router from a capture."""
+
+    topic: str
+    payload: bytes
+
+
+class TrafficCapture:
+    """Append the messages routed to one or every charger to a capture.
+
+    Records are buffered on the event loop and written by the executor
+    every few seconds, or as soon as enough of them are waiting. Each write
+    waits for the previous one, so records reach the file in order.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, path: Path, serial_number: str | None = None
+    ) -> None:
+        """Initialize the capture."""
+        self.hass = hass
+        self.path = path
+        self.serial_number = serial_number
+        self.messages = 0
+        self._buffer: list[bytes] = []
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        self._write: asyncio.Task | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start flushing the buffer periodically."""
+        self._unsub_flush = async_track_time_interval(
+            self.hass,
+            self._async_flush,
+            timedelta(seconds=CAPTURE_FLUSH_INTERVAL),
+        )
+
+    @callback
+    def async_record(self, serial_number: str, message) -> None:
+        """Buffer a routed message."""
+        if self.serial_number is not None and serial_number != self.serial_number:
+            return
+        self._buffer.append(
+            encode_record(time.time(), message.topic, message.payload)
+        )
+        self.messages += 1
+        if len(self._buffer) >= CAPTURE_FLUSH_RECORDS:
+            self._async_flush()
+
+    @callback
+    def _async_flush(self, now=None) -> None:
+        """Hand the buffered records over to the executor."""
+        if not self._buffer:
+            return
+        records, self._buffer = self._buffer, []
+        self._write = self.hass.async_create_background_task(
+            self._async_write(self._write, records), f"viaris capture {self.path.name}"
+        )
+
+    async def _async_write(
+        self, previous: asyncio.Task | None, records: list[bytes]
+    ) -> None:
+        """Append records once the previous write finished."""
+        if previous is not None:
+            await previous
+        try:
+            await self.hass.async_add_executor_job(append_records, self.path, records)
+        except OSError as err:
+            _LOGGER.error("Unable to write %s: %s", self.path, err)
+
+    @callback
+    def async_close(self) -> None:
+        """Stop flushing periodically and write the remaining records."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        self._async_flush()
+
+    async def async_stop(self) -> None:
+        """Write the remaining records and stop."""
+        self.async_close()
+        if self._write is not None:
+            await self._write
+
+
+async def async_replay(
+    hass: HomeAssistant, router: ViarisRouter, path: Path, speed: float
+) -> int:
+    """Feed the messages of a capture to the router.
+
+    Messages keep their original spacing divided by ``speed``; a speed of 0
+    replays them as fast as possible. Return the number of messages.
+    """
+    reader = read_capture(path)
+    loop = asyncio.get_running_loop()
+    first: float | None = None
+    start = loop.time()
+    count = 0
+    try:
+        while batch := await hass.async_add_executor_job(_read_batch, reader):
+            for message in batch:
+                if first is None:
+                    first = message.timestamp
+                if speed > 0:
+                    delay = (message.timestamp - first) / speed - (loop.time() - start)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                router.async_route(ReplayedMessage(message.topic, message.payload))
+            count += len(batch)
+    finally:
+        await hass.async_add_executor_job(reader.close)
+    _LOGGER.debug("Replayed %s messages from %s", count, path)
+    return count
+
+
+def _read_batch(reader: Iterator[CapturedMessage]) -> list[CapturedMessage]:
+    """Read the next messages of a capture."""
+    return list(islice(reader, REPLAY_BATCH))
@@ -0,0 +1,98 @@
+"""Fixtures for the viaris tests."""
+from __future__ import annotations
+
+from collections.abc import Generator
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.viaris.const import (
+    CONF_SERIAL_NUMBER,
+    DOMAIN,
+    STORAGE_VERSION,
+)
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+SERIAL_NUMBER = "EVVC4TEST00001"
+
+
+class MqttStandIn:
+    """Record the MQTT subscriptions and publications of the integration."""
+
+    def __init__(self) -> None:
+        """Initialize the stand-in."""
+        self.subscriptions = 0
+        self.published: list[tuple[str, Any]] = []
+
+    async def async_subscribe(
+        self, hass, topic, msg_callback, qos=0, encoding="utf-8"
+    ):
+        """Count a subscription until it is removed."""
+        self.subscriptions += 1
+
+        def remove() -> None:
+            self.subscriptions -= 1
+
+        return remove
+
+    async def async_publish(
+        self, hass, topic, payload, qos=0, retain=False, encoding="utf-8"
+    ) -> None:
+        """Record a publication."""
+        self.published.append((topic, payload))
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Enable the integration in every test."""
+
+
+@pytest.fixture
+def mqtt(hass: HomeAssistant) -> Generator[MqttStandIn]:
+    """Replace the MQTT integration by a stand-in."""
+    stand_in = MqttStandIn()
+    hass.config.components.add("mqtt")
+    with (
+        patch(
+            "homeassistant.components.mqtt.async_subscribe",
+            stand_in.async_subscribe,
+        ),
+        patch(
+            "homeassistant.components.mqtt.async_publish",
+            stand_in.async_publish,
+        ),
+    ):
+        yield stand_in
+
+
+@pytest.fixture
+def config_entry(hass: HomeAssistant, hass_storage: dict[str, Any]) -> MockConfigEntry:
+    """Return the entry of a charger whose capabilities were detected."""
+    hass_storage[DOMAIN] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": DOMAIN,
+        "data": {
+            "devices": {
+                SERIAL_NUMBER: {
+                    "capabilities": {
+                        "connector2": True,
+                        "mennekes2": True,
+                        "main_meter": True,
+                        "solar": False,
+                    }
+                }
+            }
+        },
+    }
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=f"Viaris {SERIAL_NUMBER}",
+        data={CONF_SERIAL_NUMBER: SERIAL_NUMBER},
+        unique_id=SERIAL_NUMBER,
+    )
+    entry.add_to_hass(hass)
+    return entry
@@ -0,0 +1,74 @@
+"""Tests for the capabilities of viaris chargers."""
+from __future__ import annotations
+
+from custom_components.viaris.capabilities import Capabilities, detect_capabilities
+from custom_components.viaris.const import MODEL_COMBIPLUS, MODEL_UNI
+
+BOOT = {"schuko": False, "solar": False}
+RT = {"ctxDetected": False, "mbusDetected": False}
+
+
+def test_unknown_is_present() -> None:
+    """Test a charger that never answered gets every capability."""
+    assert detect_capabilities(MODEL_UNI, None, None) == Capabilities(mennekes2=False)
+    assert detect_capabilities(MODEL_COMBIPLUS, None, None) == Capabilities()
+
+
+def test_detect_uni() -> None:
+    """Test a bare UNI has no optional capability."""
+    assert detect_capabilities(MODEL_UNI, BOOT, RT) == Capabilities(
+        connector2=False, mennekes2=False, main_meter=False, solar=False
+    )
+    assert detect_capabilities(
+        MODEL_UNI,
+        {"schuko": True, "solar": False},
+        {"ctxDetected": True, "mbusDetected": False},
+    ) == Capabilities(mennekes2=False, solar=False)
+
+
+def test_detect_combiplus() -> None:
+    """Test a COMBIPLUS always has its second connector."""
+    assert detect_capabilities(MODEL_COMBIPLUS, BOOT, RT) == Capabilities(
+        main_meter=False, solar=False
+    )
+
+
+def test_detect_solar() -> None:
+    """Test solar is configured or measured, and absent only when both say so."""
+    configured = {"schuko": False, "solar": True}
+    measured = {"ctxDetected": False, "mbusDetected": True}
+    assert detect_capabilities(MODEL_UNI, configured, RT).solar
+    assert detect_capabilities(MODEL_UNI, BOOT, measured).solar
+    assert detect_capabilities(MODEL_UNI, BOOT, None).solar
+    assert detect_capabilities(MODEL_UNI, None, RT).solar
+    assert not detect_capabilities(MODEL_UNI, BOOT, RT).solar
+
+
+def test_missing_fields_are_present() -> None:
+    """Test fields a firmware does not report keep their capability."""
+    capabilities = detect_capabilities(
+        MODEL_UNI,
+        {"schuko": None, "solar": None},
+        {"ctxDetected": None, "mbusDetected": None},
+    )
+    assert capabilities == Capabilities(mennekes2=False)
+
+
+def test_exceeds() -> None:
+    """Test only capabilities that appear count as more."""
+    bare = Capabilities(main_meter=False, solar=False)
+    assert Capabilities().exceeds(bare)
+    assert not bare.exceeds(Capabilities())
+    assert not bare.exceeds(bare)
+    assert Capabilities(main_meter=False).exceeds(Capabilities(solar=False))
+
+
+def test_from_dict() -> None:
+    """Test stored capabilities ignore unknown and invalid values."""
+    stored = {"connector2": False, "solar": "yes", "turbo": True}
+    capabilities = Capabilities.from_dict(stored)
+    assert capabilities == Capabilities(connector2=False)
+    assert Capabilities.from_dict(capabilities.as_dict()) == capabilities
+    assert capabilities.supports(None)
+    assert not capabilities.supports("connector2")
+    assert capabilities.supports("solar")
@@ -0,0 +1,57 @@
+"""Tests for the viaris capture file format."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from custom_components.viaris.capture import (
+    MAGIC,
+    CapturedMessage,
+    append_records,
+    encode_record,
+    read_capture,
+)
+
+MESSAGES = [
+    CapturedMessage(1700000000.25, "XEO/VIARIS/EVVC4TEST00001/stat/0/rt", b"{}"),
+    CapturedMessage(1700000001.5, "XEO/VIARIS/EVVC4TEST00001/stat/0/ñ", b""),
+    CapturedMessage(1700000002.0, "t", bytes(range(256)) * 4),
+]
+
+
+def test_record_format() -> None:
+    """Test a record is its header, topic and payload."""
+    record = encode_record(1.5, "a/b", b"xyz")
+    assert record == (
+        b"\x00\x00\x00\x00\x00\x00\xf8\x3f"
+        b"\x03\x00"
+        b"\x03\x00\x00\x00"
+        b"a/bxyz"
+    )
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    """Test the messages appended to a capture are read back in order."""
+    path = tmp_path / "captures" / "test.vcap"
+    append_records(path, [encode_record(*message) for message in MESSAGES[:2]])
+    append_records(path, [encode_record(*MESSAGES[2])])
+    assert path.read_bytes().count(MAGIC) == 1
+    assert list(read_capture(path)) == MESSAGES
+
+
+def test_truncated_record(tmp_path: Path) -> None:
+    """Test a truncated last record is ignored."""
+    path = tmp_path / "test.vcap"
+    append_records(path, [encode_record(*message) for message in MESSAGES])
+    with path.open("r+b") as file:
+        file.truncate(path.stat().st_size - 1)
+    assert list(read_capture(path)) == MESSAGES[:2]
+
+
+def test_not_a_capture(tmp_path: Path) -> None:
+    """Test a file without the magic is rejected."""
+    path = tmp_path / "test.vcap"
+    path.write_bytes(b"not a capture")
+    with pytest.raises(ValueError):
+        list(read_capture(path))
@@ -0,0 +1,109 @@
+"""Tests for the extraction plans of viaris frames."""
+from __future__ import annotations
+
+from custom_components.viaris.extract import ExtractionPlan, FieldSpec, element_state
+
+FRAME = {
+    "data": {
+        "evsePower": 1500,
+        "totalCurrent": [1000, 2000, 3000],
+        "elements": [
+            {"state": "3", "now": {"aPow": [1000, 2000, 500], "active": 12345}},
+            {"state": 0, "now": {"aPow": [0, 0, 0], "active": 0}},
+        ],
+    }
+}
+
+PLAN = ExtractionPlan(
+    (
+        ("evse_power", FieldSpec(("evsePower",), scale=0.001)),
+        ("current_l2", FieldSpec(("totalCurrent", 1), scale=0.001)),
+        ("current_l4", FieldSpec(("totalCurrent", 3), scale=0.001)),
+        (
+            "power_conn1",
+            FieldSpec(("now", "aPow"), connector=0, scale=0.001, convert=sum),
+        ),
+        ("energy_conn2", FieldSpec(("now", "active"), connector=1, ndigits=1)),
+        ("energy_conn3", FieldSpec(("now", "active"), connector=2)),
+        ("grid_power", FieldSpec(("instPower",))),
+    )
+)
+
+
+def test_extract_resolves_every_field() -> None:
+    """Test a plan resolves nested, indexed and connector fields at once."""
+    assert PLAN.extract(FRAME) == {
+        "evse_power": 1.5,
+        "current_l2": 2.0,
+        "current_l4": None,
+        "power_conn1": 3.5,
+        "energy_conn2": 0.0,
+        "energy_conn3": None,
+        "grid_power": None,
+    }
+
+
+def test_extract_missing_frame_parts() -> None:
+    """Test every field of a frame without data is None."""
+    expected = dict.fromkeys(PLAN.keys)
+    assert PLAN.extract({}) == expected
+    assert PLAN.extract({"data": None}) == expected
+    assert PLAN.extract({"data": {"elements": "none"}}) == expected
+    assert PLAN.extract([]) == expected
+
+
+def test_extract_malformed_values() -> None:
+    """Test values that cannot be converted resolve to None."""
+    frame = {
+        "data": {
+            "evsePower": "n/a",
+            "totalCurrent": [1000, None, 3000],
+            "elements": [{"now": {"aPow": [100, "x"], "active": {}}}],
+        }
+    }
+    values = PLAN.extract(frame)
+    assert values["evse_power"] is None
+    assert values["current_l2"] is None
+    assert values["power_conn1"] is None
+
+
+def test_extract_converter_errors() -> None:
+    """Test a converter raising on a malformed value resolves to None."""
+    plan = ExtractionPlan(
+        (
+            ("first", FieldSpec(("items",), convert=lambda value: value[0])),
+            ("name", FieldSpec(("item",), convert=lambda value: value["name"])),
+            ("upper", FieldSpec(("item",), convert=lambda value: value.upper())),
+        )
+    )
+    assert plan.extract({"data": {"items": [], "item": {}}}) == {
+        "first": None,
+        "name": None,
+        "upper": None,
+    }
+    assert plan.extract({"data": {"items": [1], "item": {"name": "a"}}}) == {
+        "first": 1,
+        "name": "a",
+        "upper": None,
+    }
+
+
+def test_fields_share_a_path() -> None:
+    """Test several fields can read the same value."""
+    plan = ExtractionPlan(
+        (
+            ("watts", FieldSpec(("evsePower",))),
+            ("kilowatts", FieldSpec(("evsePower",), scale=0.001)),
+        )
+    )
+    assert plan.extract(FRAME) == {"watts": 1500, "kilowatts": 1.5}
+
+
+def test_element_state() -> None:
+    """Test the state code of rt frame elements."""
+    elements = FRAME["data"]["elements"]
+    assert element_state(elements[0]) == 3
+    assert element_state(elements[1]) == 0
+    assert element_state({}) is None
+    assert element_state({"state": "charging"}) is None
+    assert element_state(None) is None
@@ -0,0 +1,74 @@
+"""Tests for the rt history of viaris chargers."""
+from __future__ import annotations
+
+from pathlib import Path
+
+from custom_components.viaris.history import HISTORY_PLAN, RtHistory
+
+T0 = 1_700_000_040.0
+
+
+def _values(**values: float) -> dict[str, float | None]:
+    """Return the values of an rt sample, None unless given."""
+    return {**dict.fromkeys(HISTORY_PLAN.keys), **values}
+
+
+def test_raw_ring_wraps() -> None:
+    """Test the raw ring keeps the latest samples, oldest first."""
+    history = RtHistory(3, ())
+    for second in range(5):
+        history.append(T0 + second, _values(evse_power=second))
+    samples = history.as_dict()
+    assert samples["timestamp"] == [T0 + 2, T0 + 3, T0 + 4]
+    assert samples["evse_power"] == [2.0, 3.0, 4.0]
+    assert samples["grid_power"] == [None, None, None]
+    assert history.as_dict(since=T0 + 4)["evse_power"] == [4.0]
+    history.close()
+
+
+def test_tier_aggregates() -> None:
+    """Test a tier appends the aggregates of each finished interval."""
+    history = RtHistory(10, ((60, 2),))
+    history.append(T0, _values(evse_power=1.0))
+    history.append(T0 + 20, _values(evse_power=2.0, grid_power=5.0))
+    history.append(T0 + 40, _values(evse_power=6.0))
+    assert history.as_dict(step=60)["timestamp"] == []
+
+    history.append(T0 + 60, _values(evse_power=0.0))
+    tier = history.as_dict(step=60)
+    assert tier["timestamp"] == [T0]
+    assert tier["evse_power_min"] == [1.0]
+    assert tier["evse_power_mean"] == [3.0]
+    assert tier["evse_power_max"] == [6.0]
+    assert tier["grid_power_mean"] == [5.0]
+    assert tier["home_power_mean"] == [None]
+
+    # A gap of several intervals only appends the interval of samples.
+    history.append(T0 + 300, _values())
+    history.append(T0 + 360, _values())
+    tier = history.as_dict(step=60)
+    assert tier["timestamp"] == [T0 + 60, T0 + 300]
+    assert tier["evse_power_mean"] == [0.0, None]
+    assert history.as_dict(since=T0 + 120, step=60)["timestamp"] == [T0 + 300]
+    history.close()
+
+
+def test_history_file_survives(tmp_path: Path) -> None:
+    """Test a history file is used again, unless its layout changed."""
+    path = tmp_path / "history" / "charger.bin"
+    history = RtHistory(4, ((60, 2),), path)
+    for second in range(0, 120, 30):
+        history.append(T0 + second, _values(evse_power=second))
+    history.close()
+    size = path.stat().st_size
+
+    history = RtHistory(4, ((60, 2),), path)
+    assert history.memory == size
+    assert history.as_dict()["evse_power"] == [0.0, 30.0, 60.0, 90.0]
+    assert history.as_dict(step=60)["evse_power_mean"] == [15.0]
+    history.close()
+
+    history = RtHistory(5, ((60, 2),), path)
+    assert history.as_dict()["timestamp"] == []
+    assert history.as_dict(step=60)["timestamp"] == []
+    history.close()
@@ -0,0 +1,64 @@
+"""Tests for the setup and reload of viaris chargers."""
+from __future__ import annotations
+
+import gc
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+
+from custom_components.viaris.const import DATA_ROUTER, DOMAIN
+from custom_components.viaris.coordinator import ViarisCoordinator
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from .conftest import MqttStandIn
+
+RELOADS = 10
+
+
+def _live_coordinators() -> int:
+    """Return the number of coordinators left in memory."""
+    gc.collect()
+    return sum(isinstance(obj, ViarisCoordinator) for obj in gc.get_objects())
+
+
+async def test_reload_releases_everything(
+    hass: HomeAssistant, mqtt: MqttStandIn, config_entry: MockConfigEntry
+) -> None:
+    """Test repeated reloads leave listeners, subscriptions and memory flat."""
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert config_entry.state is ConfigEntryState.LOADED
+    listeners = config_entry.runtime_data.dispatcher.listener_count()
+    assert listeners > 0
+    assert mqtt.subscriptions == 1
+    assert _live_coordinators() == 1
+
+    for _ in range(RELOADS):
+        assert await hass.config_entries.async_reload(config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert config_entry.state is ConfigEntryState.LOADED
+    assert config_entry.runtime_data.dispatcher.listener_count() == listeners
+    assert mqtt.subscriptions == 1
+    assert _live_coordinators() == 1
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert mqtt.subscriptions == 0
+    assert _live_coordinators() == 0
+
+
+async def test_unload_ends_capture(
+    hass: HomeAssistant, mqtt: MqttStandIn, config_entry: MockConfigEntry
+) -> None:
+    """Test unloading the last charger ends a running capture."""
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    await hass.services.async_call(
+        DOMAIN, "start_capture", {"filename": "test.vcap"}, blocking=True
+    )
+    assert hass.data[DATA_ROUTER].capture is not None
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass.data[DATA_ROUTER].capture is None
@@ -0,0 +1,155 @@
+"""Tests for the requests sent to viaris chargers."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Generator
+from datetime import timedelta
+import json
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from custom_components.viaris.const import (
+    REQUEST_BACKOFF,
+    REQUEST_RETRIES,
+    REQUEST_TIMEOUT,
+    REQUEST_WINDOW,
+)
+from custom_components.viaris.dispatcher import ViarisDispatcher
+from custom_components.viaris.request import ViarisRequester
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from .conftest import SERIAL_NUMBER, MqttStandIn
+
+GET_TOPIC = f"XEO/VIARIS/{SERIAL_NUMBER}/get/0/boot_sys"
+STAT_TOPIC = f"XEO/VIARIS/{SERIAL_NUMBER}/stat/0/boot_sys"
+SET_TOPIC = f"XEO/VIARIS/{SERIAL_NUMBER}/set/0/mennekes/ctrl/pause"
+
+
+@pytest.fixture
+def requester(hass: HomeAssistant, mqtt: MqttStandIn) -> Generator[ViarisRequester]:
+    """Return a requester of a charger."""
+    requester = ViarisRequester(hass, ViarisDispatcher(hass))
+    yield requester
+    requester.async_shutdown()
+
+
+async def _async_advance(hass: HomeAssistant, seconds: float) -> None:
+    """Move the clock forward and run what became due."""
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=seconds))
+    await hass.async_block_till_done()
+
+
+def _published(mqtt: MqttStandIn) -> list[tuple[str, dict[str, Any]]]:
+    """Return the frames published so far."""
+    return [(topic, json.loads(payload)) for topic, payload in mqtt.published]
+
+
+def _reply(requester: ViarisRequester, topic: str, frame: Any) -> None:
+    """Deliver a frame of the charger."""
+    requester.dispatcher.async_message_received(
+        SimpleNamespace(topic=topic, payload=json.dumps(frame).encode())
+    )
+
+
+async def test_reply_correlation(
+    hass: HomeAssistant, mqtt: MqttStandIn, requester: ViarisRequester
+) -> None:
+    """Test identical requests are sent once and resolved by their idTrans."""
+    future = requester.async_request(GET_TOPIC)
+    assert requester.async_request(GET_TOPIC) is future
+    assert mqtt.published == []
+
+    await _async_advance(hass, REQUEST_WINDOW)
+    [(topic, message)] = _published(mqtt)
+    assert topic == GET_TOPIC
+    id_trans = message["idTrans"]
+
+    _reply(requester, STAT_TOPIC, {"idTrans": id_trans + 1, "data": {}})
+    assert not future.done()
+    _reply(requester, STAT_TOPIC, {"idTrans": id_trans, "data": {"fw": 1}})
+    assert await future == {"idTrans": id_trans, "data": {"fw": 1}}
+    assert requester.dispatcher.listener_count() == 0
+
+
+async def test_reply_without_id_trans(
+    hass: HomeAssistant, mqtt: MqttStandIn, requester: ViarisRequester
+) -> None:
+    """Test frames without idTrans, even not objects, answer a request."""
+    future = requester.async_request(GET_TOPIC, {"data": {"x": 1}})
+    await _async_advance(hass, REQUEST_WINDOW)
+    [(_, message)] = _published(mqtt)
+    assert message["data"] == {"x": 1}
+
+    _reply(requester, STAT_TOPIC, [1, 2])
+    assert await future == [1, 2]
+
+
+async def test_retry_and_timeout(
+    hass: HomeAssistant, mqtt: MqttStandIn, requester: ViarisRequester
+) -> None:
+    """Test an unanswered request is sent again, then fails."""
+    future = requester.async_request(GET_TOPIC)
+    await _async_advance(hass, REQUEST_WINDOW)
+    for attempt in range(REQUEST_RETRIES):
+        assert len(mqtt.published) == attempt + 1
+        await _async_advance(hass, REQUEST_TIMEOUT)
+        assert not future.done()
+        await _async_advance(hass, REQUEST_BACKOFF * 2**attempt)
+    assert len(mqtt.published) == REQUEST_RETRIES + 1
+    id_trans = {message["idTrans"] for _, message in _published(mqtt)}
+    assert len(id_trans) == 1
+
+    await _async_advance(hass, REQUEST_TIMEOUT)
+    with pytest.raises(TimeoutError):
+        await future
+    assert requester.dispatcher.listener_count() == 0
+
+
+async def test_publish_error(
+    hass: HomeAssistant, mqtt: MqttStandIn, requester: ViarisRequester
+) -> None:
+    """Test a request fails at once when it cannot be published."""
+    future = requester.async_request(GET_TOPIC)
+    with patch(
+        "homeassistant.components.mqtt.async_publish",
+        side_effect=HomeAssistantError("not connected"),
+    ):
+        await _async_advance(hass, REQUEST_WINDOW)
+    with pytest.raises(HomeAssistantError):
+        await future
+    assert requester.dispatcher.listener_count() == 0
+
+
+async def test_send_command(
+    hass: HomeAssistant, mqtt: MqttStandIn, requester: ViarisRequester
+) -> None:
+    """Test a command is published once, without waiting for a reply."""
+    await requester.async_send(SET_TOPIC, {"data": {"pause": True}})
+    await requester.async_send(SET_TOPIC, {"data": {"pause": True}})
+    first, second = _published(mqtt)
+    assert first[0] == SET_TOPIC
+    assert first[1]["data"] == {"pause": True}
+    assert first[1]["idTrans"] != second[1]["idTrans"]
+    assert requester.dispatcher.listener_count() == 0
+
+    await _async_advance(hass, REQUEST_TIMEOUT * 10)
+    assert len(mqtt.published) == 2
+
+
+async def test_shutdown_cancels_requests(
+    hass: HomeAssistant, mqtt: MqttStandIn, requester: ViarisRequester
+) -> None:
+    """Test pending requests are cancelled on shutdown."""
+    future = requester.async_request(GET_TOPIC)
+    requester.async_shutdown()
+    with pytest.raises(asyncio.CancelledError):
+        await future
+    await _async_advance(hass, REQUEST_WINDOW)
+    assert mqtt.published == []
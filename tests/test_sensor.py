@@ -0,0 +1,48 @@
+"""Tests for the state updates of viaris sensors."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.viaris.sensor import (
+    ViarisSensorEntityDescription,
+    value_changed,
+)
+
+POWER = ViarisSensorEntityDescription(key="power", precision=2, deadband=1)
+ENERGY = ViarisSensorEntityDescription(key="energy", precision=2)
+STATUS = ViarisSensorEntityDescription(key="status")
+
+
+@pytest.mark.parametrize(
+    ("description", "old", "new", "changed"),
+    [
+        # Jitter within the deadband is not written.
+        (POWER, 1.5, 1.51, False),
+        (POWER, 1.5, 1.514, False),
+        (POWER, 1.5, 1.49, False),
+        (POWER, 1.5, 1.52, True),
+        (POWER, 1.5, 1.48, True),
+        (POWER, 1.5, 1.6, True),
+        # Reaching or leaving zero and changing sign are always written.
+        (POWER, 0.01, 0, True),
+        (POWER, 0.01, 0.0, True),
+        (POWER, 0, 0.01, True),
+        (POWER, 0.005, -0.005, True),
+        (POWER, 0.0, 0, False),
+        # Without a deadband, only changes of the displayed value count.
+        (ENERGY, 10.0, 10.004, False),
+        (ENERGY, 10.0, 10.01, True),
+        # Unknown and non-numeric values are compared as they are.
+        (POWER, None, 1.5, True),
+        (POWER, 1.5, None, True),
+        (POWER, None, None, False),
+        (STATUS, "Charging", "Charging", False),
+        (STATUS, "Charging", "Paused", True),
+        (STATUS, 1.5, 1.5000001, True),
+    ],
+)
+def test_value_changed(
+    description: ViarisSensorEntityDescription, old, new, changed: bool
+) -> None:
+    """Test which values are written to the state machine."""
+    assert value_changed(description, old, new) is changed
@@ -0,0 +1,118 @@
+"""Tests for the persistent settings of viaris chargers."""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.viaris.const import DOMAIN, STORAGE_VERSION
+from custom_components.viaris.store import (
+    LEGACY_YAML_NAME,
+    RT_FRAME_DEFAULTS,
+    ViarisStore,
+)
+
+from .conftest import SERIAL_NUMBER
+
+LEGACY_YAML = f"""
+devices:
+  {SERIAL_NUMBER}:
+    rt_frame:
+      period: 10
+      timeout: "60"
+      idle_period: bad
+  EVVC4TEST00002:
+    rt_frame:
+      period: 5
+"""
+
+
+def _legacy_yaml(hass: HomeAssistant, content: str) -> Path:
+    """Write a legacy YAML file where older versions wrote it."""
+    path = Path(hass.config.path("custom_components", DOMAIN, LEGACY_YAML_NAME))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+async def _async_load(hass: HomeAssistant) -> ViarisStore:
+    """Return a loaded store looking for the legacy file in the config dir."""
+    store = ViarisStore(hass)
+    path = Path(hass.config.path("custom_components", DOMAIN, LEGACY_YAML_NAME))
+    with patch.object(ViarisStore, "_legacy_yaml_paths", return_value=[path]):
+        await store.async_load()
+    return store
+
+
+async def test_migrate_legacy_yaml(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test the legacy YAML file is migrated once, then renamed."""
+    hass_storage[DOMAIN] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": DOMAIN,
+        "data": {"devices": {"EVVC4TEST00002": {"rt_frame": {"period": 2}}}},
+    }
+    path = _legacy_yaml(hass, LEGACY_YAML)
+
+    store = await _async_load(hass)
+
+    assert store.rt_frame(SERIAL_NUMBER) == {
+        "period": 10,
+        "timeout": 60,
+        "idle_period": RT_FRAME_DEFAULTS["idle_period"],
+    }
+    # Settings already in the store win over the migrated ones.
+    assert store.rt_frame("EVVC4TEST00002")["period"] == 2
+    assert store.capabilities(SERIAL_NUMBER) is None
+    assert not path.exists()
+    assert path.with_name(f"{LEGACY_YAML_NAME}.migrated").exists()
+    saved = hass_storage[DOMAIN]["data"]["devices"]
+    assert saved[SERIAL_NUMBER]["rt_frame"]["period"] == 10
+
+    store = await _async_load(hass)
+    assert store.rt_frame(SERIAL_NUMBER)["period"] == 10
+
+
+async def test_invalid_legacy_yaml(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test a legacy YAML file that is not a mapping is left alone."""
+    path = _legacy_yaml(hass, "- not\n- a mapping\n")
+
+    store = await _async_load(hass)
+
+    assert store.rt_frame(SERIAL_NUMBER) == RT_FRAME_DEFAULTS
+    assert path.exists()
+    assert DOMAIN not in hass_storage
+
+
+async def test_invalid_stored_settings(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test invalid stored settings fall back to their defaults."""
+    hass_storage[DOMAIN] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": DOMAIN,
+        "data": {
+            "devices": {
+                SERIAL_NUMBER: {
+                    "rt_frame": None,
+                    "snapshot": {"boot_sys": {"data": {}}},
+                    "capabilities": {"solar": False, "main_meter": "no"},
+                },
+                "EVVC4TEST00002": "invalid",
+            }
+        },
+    }
+
+    store = await _async_load(hass)
+
+    assert store.rt_frame(SERIAL_NUMBER) == RT_FRAME_DEFAULTS
+    assert store.snapshot(SERIAL_NUMBER) == {}
+    assert store.capabilities(SERIAL_NUMBER) == {"solar": False}
+    assert store.capabilities("EVVC4TEST00002") is None